@@ -1,7 +1,7 @@
 import logging
 import socket
 
-from routes import app
+from routes import app, logconfig
 
 logger = logging.getLogger(__name__)
 
@@ -11,13 +11,7 @@ def default_route():
     return 'Python Template'
 
 
-logger = logging.getLogger()
-handler = logging.StreamHandler()
-formatter = logging.Formatter(
-    '%(asctime)s %(name)-12s %(levelname)-8s %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
-logger.setLevel(logging.INFO)
+logconfig.setup()
 
 if __name__ == "__main__":
     logging.info("Starting application ...")
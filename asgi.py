@@ -0,0 +1,236 @@
+"""
+ASGI entry point: `uvicorn asgi:app` (or any ASGI server).
+
+Same URLs and payloads as the WSGI app. Interactive game endpoints
+(ASYNC_ROUTES) are read, parsed and answered on the event loop itself,
+without going through Flask, so one worker can keep thousands of sessions
+in flight. The turn itself runs on a small pool of its own: a Fog of Wall
+turn takes about 1-4 ms on a 20-50 grid but about 25 ms on a 200 grid,
+which is too long to block every other session. Every other route is
+handed to the Flask app on a thread pool, where the CPU-heavy solvers are in turn pushed to
+the process pool (routes/executor.py). Request bodies are fed to those
+threads as they arrive, so streaming ingestion keeps working.
+
+Game state lives in the worker process: run one worker per box, or route
+each game_id to a fixed worker.
+
+ASGI_THREADS        threads serving the Flask routes per process (default 32)
+ASGI_TURN_THREADS   threads running game turns per process (default 4)
+"""
+import asyncio
+import io
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app as flask_app
+from routes import executor, fogofwall, ingest, metrics
+from routes.codec import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+THREADS = int(os.environ.get("ASGI_THREADS", "32"))
+TURN_THREADS = int(os.environ.get("ASGI_TURN_THREADS", "4"))
+
+# turns are CPU-bound Python, so a few threads are enough; keeping them off
+# the Flask pool stops slow routes from holding up games
+_turns = ThreadPoolExecutor(max_workers=max(1, TURN_THREADS), thread_name_prefix="asgi-turn")
+
+
+class _TooLarge(Exception):
+    pass
+
+
+async def _read_body(receive, limit):
+    chunks, total = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        body = message.get("body", b"")
+        total += len(body)
+        if total > limit:
+            raise _TooLarge()
+        chunks.append(body)
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+async def _send_json(send, status, body):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def fog_of_wall(scope, receive):
+    try:
+        data = loads(await _read_body(receive, ingest.limit_for("fog_of_wall")))
+    except _TooLarge:
+        return 413, dumps({"error": "request body too large"})
+    except Exception as e:
+        logger.exception("Could not read Fog of Wall request")
+        return 500, dumps({"error": str(e)})
+    # play_turn serializes turns of one game itself
+    loop = asyncio.get_running_loop()
+    body, status = await loop.run_in_executor(_turns, fogofwall.play_turn, data)
+    return status, dumps(body)
+
+
+# path -> (methods, handler) served natively on the event loop; a handler
+# takes (scope, receive) and returns (status, JSON body bytes)
+ASYNC_ROUTES = {
+    "/fog-of-wall": (("POST",), fog_of_wall),
+}
+
+
+class _RequestBody(io.RawIOBase):
+    """wsgi.input for a worker thread, pulling body chunks from the event loop."""
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buf = b""
+        self._more = True
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf and self._more:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message["type"] == "http.disconnect":
+                self._more = False
+                break
+            self._buf = message.get("body", b"")
+            self._more = message.get("more_body", False)
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+def _environ(scope, body):
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", ""),
+        "PATH_INFO": scope["path"],
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1] if server[1] is not None else 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BufferedReader(body),
+        # lets werkzeug read bodies sent without Content-Length
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        key = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = "HTTP_" + key
+        if key in environ:
+            value = environ[key] + "," + value
+        environ[key] = value
+    return environ
+
+
+def _call_wsgi(environ, send_threadsafe):
+    """Run the Flask app in this (worker) thread, sending the response as it is produced."""
+    state = {"start": None, "sent": False}
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info is not None and state["sent"]:
+            raise exc_info[1].with_traceback(exc_info[2])
+        state["start"] = {
+            "type": "http.response.start",
+            "status": int(status.split(" ", 1)[0]),
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers],
+        }
+
+    def flush_start():
+        if not state["sent"]:
+            send_threadsafe(state["start"])
+            state["sent"] = True
+
+    result = flask_app(environ, start_response)
+    try:
+        for chunk in result:
+            if chunk:
+                flush_start()
+                send_threadsafe({"type": "http.response.body", "body": chunk, "more_body": True})
+    finally:
+        close = getattr(result, "close", None)
+        if close is not None:
+            close()
+    flush_start()
+    send_threadsafe({"type": "http.response.body", "body": b""})
+
+
+class App:
+    def __init__(self):
+        self._threads = ThreadPoolExecutor(max_workers=THREADS, thread_name_prefix="asgi")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            route = ASYNC_ROUTES.get(scope["path"])
+            if route is not None and scope["method"] in route[0]:
+                await self._serve_async(route[1], scope, receive, send)
+            else:
+                await self._serve_wsgi(scope, receive, send)
+        else:
+            raise RuntimeError(f"unsupported ASGI scope {scope['type']!r}")
+
+    async def _serve_async(self, handler, scope, receive, send):
+        start = time.perf_counter()
+        status, body = await handler(scope, receive)
+        await _send_json(send, status, body)
+        request_bytes = 0
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit():
+                request_bytes = int(value)
+        metrics.observe(scope["path"], status, time.perf_counter() - start, request_bytes, len(body))
+
+    async def _serve_wsgi(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        environ = _environ(scope, _RequestBody(receive, loop))
+
+        def send_threadsafe(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        await loop.run_in_executor(self._threads, _call_wsgi, environ, send_threadsafe)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                loop = asyncio.get_running_loop()
+                try:
+                    await loop.run_in_executor(None, executor.warm)
+                except Exception as e:
+                    logger.exception("ASGI startup failed")
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._threads.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+app = App()
@@ -0,0 +1,7 @@
+"""
+Benchmarks for every endpoint.
+
+    python -m benchmarks --scale realistic            # run and compare to baseline.json
+    python -m benchmarks --scale small --save-baseline
+    python -m benchmarks --route /slsm --scale extreme
+"""
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+
+from benchmarks import harness
+from benchmarks.payloads import PAYLOADS, SCALES
+from routes import logconfig
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark every endpoint.")
+    parser.add_argument("--scale", choices=SCALES, default="realistic")
+    parser.add_argument("--route", action="append", choices=sorted(PAYLOADS),
+                        help="route to run (repeatable; default: all)")
+    parser.add_argument("--iterations", type=int, help="timed requests per route")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="run the suite this many times and keep the median of each stat (default 1)")
+    parser.add_argument("--baseline", default=harness.BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown before a run fails (default 0.25)")
+    parser.add_argument("--slack-ms", type=float, default=1.0,
+                        help="allowed absolute slowdown on top of --tolerance, for sub-ms timer noise (default 1)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--no-import", action="store_true", help="skip the app import-time benchmark")
+    args = parser.parse_args(argv)
+
+    # before the harness imports app, whose own setup() call is then a no-op
+    logconfig.setup(os.environ.get("LOG_LEVEL", "WARNING").upper())
+    runs = [harness.run_suite(args.scale, args.route, args.iterations, args.seed,
+                              imports=not args.no_import)
+            for _ in range(max(1, args.repeat))]
+    results = harness.median_results(runs)
+    print(harness.format_table(results))
+
+    if args.save_baseline:
+        harness.save_baseline(results, args.baseline)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    try:
+        baseline = harness.load_baseline(args.baseline)
+    except FileNotFoundError:
+        print(f"no baseline at {args.baseline}; record one with --save-baseline", file=sys.stderr)
+        return 2
+    missing = [key for key in results if key not in baseline]
+    if missing:
+        print(f"not in the baseline, not compared: {', '.join(missing)}", file=sys.stderr)
+
+    failures = harness.regressions(results, baseline, args.tolerance, args.slack_ms / 1e3)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
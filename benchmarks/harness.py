@@ -0,0 +1,153 @@
+"""
+Drive the app through Flask's test client and report latency percentiles.
+
+Every request is sent with an empty response cache (routes/cache.py), so
+the cached routes are timed through their solvers rather than as cache
+hits on the repeated body.
+
+Results are keyed by "<route>@<scale>". A stored baseline (JSON written by
+--save-baseline) lets a run fail when p50 or p99 grows by more than the
+allowed tolerance. Timings on one machine vary from run to run, so a
+baseline is best recorded as the median of a few runs (--repeat).
+"""
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.payloads import PAYLOADS, generate
+
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ITERATIONS = {"small": 200, "realistic": 10, "extreme": 3}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(samples, errors):
+    total = sum(samples)
+    return {
+        "iterations": len(samples),
+        "errors": errors,
+        "p50": percentile(samples, 50),
+        "p99": percentile(samples, 99),
+        "mean": total / len(samples),
+        "throughput": len(samples) / total if total > 0 else float("inf"),
+    }
+
+
+def probe_import(env=None):
+    """(seconds, sorted names in sys.modules) after `import app` in a fresh interpreter."""
+    code = ("import json, sys, time; t = time.perf_counter(); import app; "
+            "print(json.dumps([time.perf_counter() - t, sorted(sys.modules)]))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                         capture_output=True, text=True, env=env)
+    seconds, modules = json.loads(out.stdout.strip().splitlines()[-1])
+    return seconds, modules
+
+
+def measure_import():
+    """Seconds to `import app` in a fresh interpreter."""
+    return probe_import()[0]
+
+
+def run_route(client, route, scale, iterations, seed=0, warmup=1):
+    from routes import cache
+    from routes.codec import dumps
+
+    method, body = generate(route, scale, seed)
+    data = None if body is None else dumps(body)
+    samples, errors = [], 0
+    for i in range(warmup + iterations):
+        cache.clear()
+        start = time.perf_counter()
+        resp = client.open(route, method=method, data=data, content_type="application/json")
+        resp.get_data()  # drain streamed bodies
+        elapsed = time.perf_counter() - start
+        if i < warmup:
+            continue
+        samples.append(elapsed)
+        if resp.status_code >= 400:
+            errors += 1
+    return summarize(samples, errors)
+
+
+def run_suite(scale="realistic", routes=None, iterations=None, seed=0, imports=True):
+    from app import app
+
+    client = app.test_client()
+    iterations = iterations or ITERATIONS[scale]
+    results = {}
+    if imports:
+        samples = [measure_import() for _ in range(3)]
+        results["import@app"] = summarize(samples, 0)
+    for route in routes or PAYLOADS:
+        key = f"{route}@{scale}"
+        results[key] = run_route(client, route, scale, iterations, seed)
+        logger.info("%s p50=%.4fs p99=%.4fs", key, results[key]["p50"], results[key]["p99"])
+    return results
+
+
+def median_results(runs):
+    """Combine several run_suite() results: the median of each stat, errors summed."""
+    combined = {}
+    for key in runs[0]:
+        values = [run[key] for run in runs if key in run]
+        res = {stat: statistics.median(v[stat] for v in values)
+               for stat in ("p50", "p99", "mean", "throughput")}
+        res["iterations"] = sum(v["iterations"] for v in values)
+        res["errors"] = sum(v["errors"] for v in values)
+        combined[key] = res
+    return combined
+
+
+def load_baseline(path=BASELINE_PATH):
+    """Stored results by benchmark key; raises FileNotFoundError if there are none."""
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    baseline = load_baseline(path) if os.path.exists(path) else {}
+    baseline.update(results)
+    with open(path, "w") as fh:
+        json.dump(baseline, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def regressions(results, baseline, tolerance=0.25, slack=0.0):
+    """
+    Return human-readable failures: errors, or p50/p99 past
+    baseline * (1 + tolerance) + slack seconds.
+    """
+    failures = []
+    for key, res in results.items():
+        if res["errors"]:
+            failures.append(f"{key}: {res['errors']} error responses")
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for stat in ("p50", "p99"):
+            limit = base[stat] * (1 + tolerance) + slack
+            if res[stat] > limit:
+                failures.append(f"{key}: {stat} {res[stat]:.4f}s > {limit:.4f}s (baseline {base[stat]:.4f}s)")
+    return failures
+
+
+def format_table(results):
+    lines = [f"{'benchmark':<40} {'p50 ms':>10} {'p99 ms':>10} {'req/s':>10} {'errors':>7}"]
+    for key, res in results.items():
+        lines.append(f"{key:<40} {res['p50'] * 1e3:>10.2f} {res['p99'] * 1e3:>10.2f} "
+                     f"{res['throughput']:>10.1f} {res['errors']:>7}")
+    return "\n".join(lines)
@@ -0,0 +1,262 @@
+"""
+Seeded synthetic request bodies for every endpoint.
+
+Each generator takes a `random.Random` and a size (its meaning is given in
+the generator's docstring) and returns the JSON body to send. PAYLOADS maps
+each route to its method, generator and small / realistic / extreme sizes.
+"""
+import math
+import random
+
+SCALES = ("small", "realistic", "extreme")
+
+_ROMAN = [(1000, "M"), (900, "CM"), (500, "D"), (400, "CD"), (100, "C"), (90, "XC"),
+          (50, "L"), (40, "XL"), (10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]
+_EN = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+_DE = ["null", "eins", "zwei", "drei", "vier", "fünf", "sechs", "sieben", "acht", "neun"]
+_ZH = "零一二三四五六七八九"
+
+
+def _roman(n):
+    out = []
+    for value, sym in _ROMAN:
+        while n >= value:
+            out.append(sym)
+            n -= value
+    return "".join(out)
+
+
+def square(rng, size):
+    """size: ignored."""
+    return {"input": rng.randint(-10**6, 10**6)}
+
+
+def ticketing_agent(rng, size):
+    """size: number of customers (concerts = size // 10)."""
+    n_concerts = max(1, size // 10)
+    concerts = [{"name": f"CONCERT{i}",
+                 "booking_center_location": [rng.randint(0, 1000), rng.randint(0, 1000)]}
+                for i in range(n_concerts)]
+    cards = [f"CARD{i}" for i in range(max(1, n_concerts))]
+    customers = [{"name": f"CUSTOMER{i}",
+                  "vip_status": rng.random() < 0.2,
+                  "location": [rng.randint(0, 1000), rng.randint(0, 1000)],
+                  "credit_card": rng.choice(cards)}
+                 for i in range(size)]
+    priority = {card: rng.choice(concerts)["name"] for card in cards if rng.random() < 0.5}
+    return {"customers": customers, "concerts": concerts, "priority": priority}
+
+
+def princess_diaries(rng, size):
+    """size: number of tasks (stations = max(10, size // 50))."""
+    n_stations = max(10, size // 50)
+    subway = []
+    for v in range(1, n_stations):
+        subway.append({"connection": [rng.randrange(v), v], "fee": rng.randint(1, 100)})
+    for _ in range(n_stations):
+        u, v = rng.randrange(n_stations), rng.randrange(n_stations)
+        if u != v:
+            subway.append({"connection": [u, v], "fee": rng.randint(1, 100)})
+    horizon = max(100, size * 5)
+    tasks = []
+    for i in range(size):
+        start = rng.randrange(horizon)
+        tasks.append({"name": f"T{i}", "start": start, "end": start + rng.randint(1, 60),
+                      "station": rng.randrange(n_stations), "score": rng.randint(1, 10)})
+    return {"tasks": tasks, "subway": subway, "starting_station": 0}
+
+
+_FORMULAS = [
+    (r"Fee = \frac{A}{B} + C \times D", "ABCD"),
+    (r"$$Risk = \max(A, B) \cdot e^{C}$$", "ABC"),
+    (r"Value = \log(A) + B^{2} - \frac{C}{D}", "ABCD"),
+    (r"Z = \text{Trade Amount} \times \sigma", ("Trade_Amount", "sigma")),
+]
+
+
+def trading_formula(rng, size):
+    """size: number of formulas."""
+    cases = []
+    for i in range(size):
+        formula, names = rng.choice(_FORMULAS)
+        cases.append({"name": f"test{i}", "formula": formula, "type": "compute",
+                      "variables": {name: round(rng.uniform(0.5, 20), 4) for name in names}})
+    return cases
+
+
+def investigate(rng, size):
+    """size: total number of edges, split over up to 10 networks."""
+    n_networks = min(10, max(1, size // 1000))
+    networks = []
+    for k in range(n_networks):
+        n_edges = size // n_networks
+        n_spies = max(2, n_edges // 2)
+        edges = []
+        for v in range(1, n_spies):
+            edges.append({"spy1": f"S{rng.randrange(v)}", "spy2": f"S{v}"})
+        while len(edges) < n_edges:
+            edges.append({"spy1": f"S{rng.randrange(n_spies)}", "spy2": f"S{rng.randrange(n_spies)}"})
+        networks.append({"networkId": f"network{k}", "network": edges[:n_edges]})
+    return {"networks": networks}
+
+
+def the_ink_archive(rng, size):
+    """size: number of goods in a single market (out-degree capped at 32)."""
+    prices = [math.exp(rng.uniform(-2, 2)) for _ in range(size)]
+    degree = min(size - 1, 32)
+    ratios = []
+    for u in range(size):
+        for v in rng.sample([x for x in range(size) if x != u], degree):
+            rate = prices[u] / prices[v] * math.exp(rng.gauss(0, 0.01))
+            ratios.append([u, v, round(rate, 6)])
+    return [{"goods": [f"Good{i}" for i in range(size)], "ratios": ratios}]
+
+
+def operation_safeguard(rng, size):
+    """size: number of coordinates in challenge two."""
+    word = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(12))
+    return {
+        "challenge_one": {
+            "transformations": "[encode_mirror_alphabet(x), double_consonants(x), mirror_words(x), swap_pairs(x)]",
+            "transformed_encrypted_word": word,
+        },
+        "challenge_two": [[str(rng.gauss(1.35, 0.01)), str(rng.gauss(103.8, 0.01))] for _ in range(size)],
+        "challenge_three": "PRIORITY: HIGH | CIPHER_TYPE: ROTATION_CIPHER | ENCRYPTED_PAYLOAD: SVERJNYY",
+    }
+
+
+def blankety(rng, size):
+    """size: (rows, cols); roughly 20% of values are null."""
+    rows, cols = size
+    series = []
+    for _ in range(rows):
+        level = rng.uniform(-100, 100)
+        row = []
+        for _ in range(cols):
+            level += rng.gauss(0, 1)
+            row.append(None if rng.random() < 0.2 else round(level, 6))
+        series.append(row)
+    return {"series": series}
+
+
+def blankety_stream(rng, size):
+    """size: (rows, max_cols); row lengths vary from 1 to max_cols."""
+    rows, max_cols = size
+    series = blankety(rng, (rows, max_cols))["series"]
+    return {"series": [row[:rng.randint(1, max_cols)] for row in series]}
+
+
+def fog_of_wall(rng, size):
+    """size: grid length (walls = size, crows = 3)."""
+    game_id = f"bench-{rng.getrandbits(32)}"
+    crows = [{"id": str(i + 1), "x": rng.randrange(size), "y": rng.randrange(size)} for i in range(3)]
+    return {"challenger_id": "bench", "game_id": game_id,
+            "test_case": {"game_id": game_id, "length_of_grid": size, "num_of_walls": size, "crows": crows}}
+
+
+def _number_word(rng, n):
+    lang = rng.randrange(5)
+    if lang == 0:
+        return _roman(n)
+    if lang == 1:
+        return str(n)
+    if lang == 2:
+        return _EN[n % 10]
+    if lang == 3:
+        return _DE[n % 10]
+    return _ZH[n % 10]
+
+
+def duolingo_sort(rng, size):
+    """size: list length (part TWO, mixed languages)."""
+    return {"part": "TWO",
+            "challengeInput": {"unsortedList": [_number_word(rng, rng.randint(1, 3999)) for _ in range(size)]}}
+
+
+def sailing_club(rng, size):
+    """size: (cases, bookings per case)."""
+    n_cases, n_bookings = size
+    cases = []
+    for k in range(n_cases):
+        bookings = []
+        for _ in range(n_bookings):
+            start = rng.randrange(0, 10 * n_bookings)
+            bookings.append([start, start + rng.randint(1, 48)])
+        cases.append({"id": f"case{k}", "input": bookings})
+    return {"testCases": cases}
+
+
+def the_mages_gambit(rng, size):
+    """size: number of intel entries in each of 10 items."""
+    items = []
+    for _ in range(10):
+        fronts, reserve = 10, 100
+        intel = [[rng.randint(1, fronts), rng.randint(1, reserve)] for _ in range(size)]
+        items.append({"intel": intel, "reserve": reserve, "fronts": fronts, "stamina": rng.randint(1, 10)})
+    return items
+
+
+def slsm(rng, size):
+    """size: board squares; about 5% of squares start a jump."""
+    jumps, used = [], {1, size}
+    for _ in range(size // 20):
+        a, b = rng.randrange(2, size), rng.randrange(2, size)
+        if a in used or b in used or a == b:
+            continue
+        used.add(a)
+        kind = rng.random()
+        if kind < 0.1:
+            jumps.append(f"{a}:0")  # smoke
+        elif kind < 0.2:
+            jumps.append(f"0:{a}")  # mirror
+        else:
+            jumps.append(f"{a}:{b}")
+    return {"boardSize": size, "players": 2, "jumps": jumps}
+
+
+def trading_bot(rng, size):
+    """size: number of news events, each with 3 one-minute candles."""
+    events = []
+    for i in range(size):
+        price = rng.uniform(100, 1000)
+        candles = []
+        for t in range(3):
+            o = price
+            c = o * math.exp(rng.gauss(0, 0.002))
+            candles.append({"timestamp": t * 60000, "open": o, "high": max(o, c), "low": min(o, c),
+                            "close": c, "volume": rng.uniform(1, 100)})
+            price = c
+        events.append({"id": i + 1, "title": f"headline {i}", "source": "bench",
+                       "observation_candles": candles, "previous_candles": candles})
+    return events
+
+
+# route -> (method, generator, {scale: size}); extreme bodies stay under the
+# default 64 MiB MAX_BODY_BYTES (routes/ingest.py), which answers 413 past it
+PAYLOADS = {
+    "/square": ("POST", square, {"small": 1, "realistic": 1, "extreme": 1}),
+    "/trivia": ("GET", None, {"small": None, "realistic": None, "extreme": None}),
+    "/ticketing-agent": ("POST", ticketing_agent, {"small": 100, "realistic": 5000, "extreme": 100000}),
+    "/princess-diaries": ("POST", princess_diaries, {"small": 100, "realistic": 1000, "extreme": 10000}),
+    "/trading-formula": ("POST", trading_formula, {"small": 10, "realistic": 100, "extreme": 1000}),
+    "/investigate": ("POST", investigate, {"small": 200, "realistic": 10000, "extreme": 100000}),
+    "/The-Ink-Archive": ("POST", the_ink_archive, {"small": 10, "realistic": 100, "extreme": 500}),
+    "/operation-safeguard": ("POST", operation_safeguard, {"small": 20, "realistic": 1000, "extreme": 100000}),
+    # /blankety only accepts exactly 100 series of 1000 values
+    "/blankety": ("POST", blankety, {"small": (100, 1000), "realistic": (100, 1000), "extreme": (100, 1000)}),
+    "/blankety/stream": ("POST", blankety_stream, {"small": (100, 100), "realistic": (2000, 1000), "extreme": (6000, 2000)}),
+    "/fog-of-wall": ("POST", fog_of_wall, {"small": 10, "realistic": 50, "extreme": 200}),
+    "/duolingo-sort": ("POST", duolingo_sort, {"small": 10, "realistic": 1000, "extreme": 50000}),
+    "/sailing-club/submission": ("POST", sailing_club, {"small": (10, 20), "realistic": (200, 1000), "extreme": (1000, 4000)}),
+    "/the-mages-gambit": ("POST", the_mages_gambit, {"small": 10, "realistic": 1000, "extreme": 100000}),
+    "/slsm": ("POST", slsm, {"small": 100, "realistic": 1000, "extreme": 10000}),
+    "/trading-bot": ("POST", trading_bot, {"small": 50, "realistic": 1000, "extreme": 10000}),
+}
+
+
+def generate(route, scale="realistic", seed=0):
+    """Return (method, body) for `route` at `scale`; body is None for GET routes."""
+    method, gen, sizes = PAYLOADS[route]
+    if gen is None:
+        return method, None
+    return method, gen(random.Random(f"{seed}:{route}:{scale}"), sizes[scale])
@@ -0,0 +1,10 @@
+# Picked up automatically by `gunicorn app:app`.
+import os
+
+preload_app = os.environ.get("PRELOAD_ROUTES", "").lower() in ("1", "true", "yes")
+
+
+def post_fork(server, worker):
+    # Each worker owns its solver pool; start it before the first request arrives
+    from routes import executor
+    executor.warm()
@@ -1,24 +1,104 @@
+import logging
+import os
+
 from flask import Flask
+from werkzeug.utils import cached_property, import_string
+
+from routes import ingest, metrics
+from routes.codec import jsonify
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-import routes.square
-import routes.trivia    
-import routes.ticketingagent
-import routes.princessdiaries
-import routes.trivia
-import routes.tradingformula
-import routes.spy_network
-import routes.theinkarchive
-import routes.operationsafeguard
-import routes.blanketyblanks
-import routes.fogofwall
-import routes.duolingosort
-import routes.sailingclub
-import routes.themagesgambit
-import routes.slsm
-import routes.tradingbot
-import routes.slpu
-import os
+app.config["MAX_CONTENT_LENGTH"] = ingest.MAX_BODY_BYTES
+
+
+class LazyView:
+    """
+    Stand-in view that imports its module on the first request it serves,
+    so a worker can start answering without loading every solver up front.
+    """
+
+    def __init__(self, import_name):
+        self.__module__, self.__name__ = import_name.rsplit(".", 1)
+        self.import_name = import_name
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+# (rule, dotted path of the view function, url rule options)
+ROUTES = [
+    ("/square", "routes.square.evaluate", {"methods": ["POST"]}),
+    ("/trivia", "routes.trivia.trivia", {"methods": ["GET"]}),
+    ("/ticketing-agent", "routes.ticketingagent.ticketing_agent", {"methods": ["POST"]}),
+    ("/princess-diaries", "routes.princessdiaries.princess_diaries", {"methods": ["POST"]}),
+    ("/trading-formula", "routes.tradingformula.trading_formula", {"methods": ["POST"]}),
+    ("/investigate", "routes.spy_network.investigate", {"methods": ["POST"]}),
+    ("/investigate/networks", "routes.spyregistry.create_network", {"methods": ["POST"]}),
+    ("/investigate/networks/<network_id>", "routes.spyregistry.network", {"methods": ["GET", "DELETE"]}),
+    ("/investigate/networks/<network_id>/channels", "routes.spyregistry.update_channels", {"methods": ["POST"]}),
+    ("/The-Ink-Archive", "routes.theinkarchive.the_ink_archive", {"methods": ["POST"]}),
+    ("/The-Ink-Archive/markets", "routes.inkmarket.create_market", {"methods": ["POST"]}),
+    ("/The-Ink-Archive/markets/<market_id>", "routes.inkmarket.market", {"methods": ["GET", "DELETE"]}),
+    ("/The-Ink-Archive/markets/<market_id>/rates", "routes.inkmarket.update_rates", {"methods": ["POST"]}),
+    ("/operation-safeguard", "routes.operationsafeguard.operation_safeguard", {"methods": ["POST"]}),
+    ("/blankety", "routes.blanketyblanks.blankety", {"methods": ["POST"]}),
+    ("/blankety/stream", "routes.blanketyblanks.blankety_stream", {"methods": ["POST"]}),
+    ("/fog-of-wall", "routes.fogofwall.fog_of_wall", {"methods": ["POST"]}),
+    ("/duolingo-sort", "routes.duolingosort.duolingo_sort_handler", {"methods": ["POST"]}),
+    ("/sailing-club/submission", "routes.sailingclub.sailing_club_submission",
+     {"methods": ["POST"], "strict_slashes": False}),
+    ("/sailing-club/calendars", "routes.sailingcalendar.create_calendar", {"methods": ["POST"]}),
+    ("/sailing-club/calendars/<calendar_id>", "routes.sailingcalendar.calendar", {"methods": ["GET", "DELETE"]}),
+    ("/sailing-club/calendars/<calendar_id>/bookings", "routes.sailingcalendar.update_bookings", {"methods": ["POST"]}),
+    ("/the-mages-gambit", "routes.themagesgambit.the_mages_gambit", {"methods": ["POST"]}),
+    ("/slsm", "routes.slsm.slsm_solver", {"methods": ["POST"]}),
+    ("/trading-bot", "routes.tradingbot.trading_bot", {"methods": ["POST"]}),
+    ("/batch", "routes.batch.batch", {"methods": ["POST"]}),
+]
+
+_views = {}
+
+
+def lazy_route(rule, import_name, **options):
+    view = _views.get(import_name)
+    if view is None:
+        view = _views[import_name] = LazyView(import_name)
+    options.setdefault("endpoint", view.__name__)
+    app.add_url_rule(rule, view_func=view, **options)
+
+
+def preload_routes():
+    """Import every route module now (for `gunicorn --preload` / forked workers)."""
+    for view in _views.values():
+        view.view
+    logger.info("Preloaded %d route views", len(_views))
+
+
+for _rule, _import_name, _options in ROUTES:
+    lazy_route(_rule, _import_name, **_options)
+
+metrics.init_app(app)
+
+
+# JSON-only error pages (avoid <!doctype html> issues)
+@app.errorhandler(404)
+def _nf(_e): return jsonify({"error": "not found"}), 404
+
+@app.errorhandler(405)
+def _nm(_e): return jsonify({"error": "method not allowed"}), 405
+
+@app.errorhandler(413)
+def _tl(_e): return jsonify({"error": "request body too large"}), 413
 
+@app.errorhandler(500)
+def _ie(_e): return jsonify({"error": "internal error"}), 500
 
 
+if os.environ.get("PRELOAD_ROUTES", "").lower() in ("1", "true", "yes"):
+    preload_routes()
@@ -0,0 +1,246 @@
+"""
+Bounded-length max-gain cycle search for /The-Ink-Archive.
+
+`best_cycle` works in the max-plus semiring over the log-rate matrix W:
+after k products, D_k[s, j] is the best log-gain of a k-step walk s -> j
+that does not pass back through s, so D_k[s, s] bounds every simple
+k-cycle through s from above. The search then runs in two steps:
+
+1. Every closed walk D_k[s, s] with a positive gain is rebuilt from the
+   argmax tables and split into the simple cycles it is made of. Usually
+   the best of these is already the answer.
+2. To make sure, cycles are grown backwards from their smallest node s,
+   and a partial path j -> ... -> s is dropped as soon as its gain plus
+   the best D_r[s, j] still allowed cannot beat the best cycle so far.
+
+The products cost O(max_len * n^3) whatever the number of edges. Step 2
+usually prunes almost everything; it stops after SEARCH_BUDGET expanded
+paths and then keeps the best cycle found up to that point.
+
+NumPy is optional; without it `available` is False and callers use the
+Bellman-Ford search.
+"""
+import logging
+import os
+
+try:
+    import numpy as np
+except ImportError:  # optional speedup
+    np = None
+
+logger = logging.getLogger(__name__)
+
+available = np is not None
+
+# max-plus products are done on blocks of rows of about this many cells
+BLOCK_CELLS = 1 << 18
+# max partial paths expanded by the exact search (step 2) per market
+SEARCH_BUDGET = int(os.environ.get("INK_ARCHIVE_SEARCH_BUDGET", "100000"))
+# log-gain margin below which a path cannot improve on the best cycle
+_EPS = 1e-12
+
+
+def _log_matrix(n, rate_map):
+    weights = np.full((n, n), -np.inf)
+    for (u, v), r in rate_map.items():
+        if u != v:
+            weights[u, v] = np.log(r)
+    return weights
+
+
+def _maxplus(dist, weights_t):
+    """(max_m dist[i, m] + W[m, j], argmax m) for every i, j; weights_t is W transposed."""
+    n = weights_t.shape[0]
+    out = np.empty_like(dist)
+    arg = np.empty(dist.shape, dtype=np.intp)
+    block = max(1, BLOCK_CELLS // (n * n))
+    for lo in range(0, n, block):
+        cand = dist[lo:lo + block, None, :] + weights_t[None, :, :]
+        best = cand.argmax(axis=2)
+        arg[lo:lo + block] = best
+        out[lo:lo + block] = np.take_along_axis(cand, best[:, :, None], axis=2)[:, :, 0]
+    return out, arg
+
+
+def _walk(preds, s, k):
+    """Nodes of the recorded k-step closed walk s -> ... -> s (s once)."""
+    nodes = []
+    j = s
+    for t in range(k, 0, -1):
+        j = int(preds[t - 1][s, j])
+        nodes.append(j)
+    nodes.reverse()
+    return nodes
+
+
+def _simple_cycles(walk):
+    """Split a closed walk [w0, ..., wk-1] into the simple cycles it traverses."""
+    cycles, stack, pos = [], [], {}
+    for node in walk + walk[:1]:
+        if node in pos:
+            i = pos[node]
+            cycle = stack[i:]
+            for x in cycle:
+                del pos[x]
+            del stack[i:]
+            if len(cycle) >= 2:
+                cycles.append(cycle)
+        pos[node] = len(stack)
+        stack.append(node)
+    return cycles
+
+
+def _log_gain(cycle, weights):
+    return float(sum(weights[a, b] for a, b in zip(cycle, cycle[1:] + cycle[:1])))
+
+
+def best_cycle(n, rate_map, max_len):
+    """
+    Highest-gain simple cycle of 2..max_len goods as a list of node indices
+    in edge order, or None when no such cycle is profitable.
+    """
+    max_len = min(max_len, n)
+    if max_len < 2:
+        return None
+    weights = _log_matrix(n, rate_map)
+    weights_t = np.ascontiguousarray(weights.T)
+    diag = np.arange(n)
+
+    # step 1: closed walks of each length, split into simple cycles
+    dist = weights.copy()
+    preds = [np.broadcast_to(diag[:, None], (n, n))]
+    reach = [None, weights]  # reach[r][s, j]: best D_1..D_r[s, j], j != s
+    best, best_gain = None, 0.0
+    for k in range(2, max_len + 1):
+        dist[diag, diag] = -np.inf  # walks may not pass back through their start
+        dist, arg = _maxplus(dist, weights_t)
+        preds.append(arg)
+        for s in np.flatnonzero(dist[diag, diag] > best_gain + _EPS):
+            for cycle in _simple_cycles(_walk(preds, int(s), k)):
+                gain = _log_gain(cycle, weights)
+                if gain > best_gain + _EPS:
+                    best, best_gain = cycle, gain
+        reach.append(np.maximum(reach[-1], dist))
+
+    # step 2: exact search, pruned by the reach bounds
+    budget = SEARCH_BUDGET
+    for s in range(n):
+        if reach[-1][s, s] <= best_gain + _EPS:
+            continue
+        # (path from some node back to s, reversed; its log-gain)
+        stack = [([s], 0.0)]
+        while stack:
+            if budget <= 0:
+                logger.warning("Ink Archive cycle search hit its budget on %d goods; "
+                               "answer may not be the best cycle", n)
+                return best
+            budget -= 1
+            path, gain = stack.pop()
+            cur = path[-1]
+            if len(path) >= 2 and gain + weights[s, cur] > best_gain + _EPS:
+                best, best_gain = [s] + path[:0:-1], gain + weights[s, cur]
+            left = max_len - len(path)
+            if left <= 0:
+                continue
+            # predecessors i of cur: the cycle s -> ... -> i -> cur -> ... -> s
+            # still needs a walk s -> i of at most `left` steps
+            bound = gain + weights_t[cur] + reach[left][s]
+            bound[:s + 1] = -np.inf
+            bound[path] = -np.inf
+            for i in np.flatnonzero(bound > best_gain + _EPS):
+                stack.append((path + [int(i)], gain + weights[i, cur]))
+    return best
+
+
+class Market:
+    """
+    Log-rate matrix of one market kept across rate updates, with its best
+    cycle of at most `max_len` goods (`best`, None when none is profitable).
+
+    After an update only cycles through an edge whose rate went up can have
+    overtaken the best one, so `update` searches just those, each with
+    O(max_len * n^2) bound vectors. The market is solved again in full only
+    when an edge of the best cycle got worse.
+    """
+
+    def __init__(self, n, rate_map, max_len):
+        self.n = n
+        self.max_len = min(max_len, n)
+        self.rate_map = dict(rate_map)
+        self.weights = _log_matrix(n, rate_map)
+        self._solve()
+
+    def _solve(self):
+        self.best = best_cycle(self.n, self.rate_map, self.max_len)
+        self.best_gain = _log_gain(self.best, self.weights) if self.best else 0.0
+
+    def update(self, rates):
+        """
+        Apply {(u, v): rate} (a rate <= 0 removes the edge). Returns True when
+        the market had to be solved again in full.
+        """
+        best = self.best or []
+        on_best = set(zip(best, best[1:] + best[:1]))
+        raised, stale = [], False
+        for (u, v), r in rates.items():
+            if r > 0.0:
+                self.rate_map[(u, v)] = r
+            else:
+                self.rate_map.pop((u, v), None)
+            if u == v:
+                continue
+            old = self.weights[u, v]
+            new = self.weights[u, v] = np.log(r) if r > 0.0 else -np.inf
+            if new > old:
+                raised.append((u, v))
+            elif new < old and (u, v) in on_best:
+                stale = True
+
+        if stale:
+            self._solve()
+            return True
+        if self.best:
+            self.best_gain = _log_gain(self.best, self.weights)
+        for u, v in raised:
+            cycle, gain = self._best_through(u, v)
+            if cycle is not None and gain > self.best_gain + _EPS:
+                self.best, self.best_gain = cycle, gain
+        return False
+
+    def _best_through(self, u, v):
+        """Best cycle u -> v -> ... -> u beating best_gain, as (cycle, log-gain)."""
+        max_len = self.max_len
+        if max_len < 2:
+            return None, 0.0
+        weights = self.weights
+        # reach[r][x]: best walk x -> u of at most r steps that only ends at u
+        step = weights[:, u].copy()
+        reach = [None, step.copy()]
+        for _ in range(2, max_len):
+            step[u] = -np.inf
+            step = (weights + step[None, :]).max(axis=1)
+            reach.append(np.maximum(reach[-1], step))
+
+        found, found_gain = None, self.best_gain
+        if weights[u, v] + reach[max_len - 1][v] <= found_gain + _EPS:
+            return None, 0.0
+        budget = SEARCH_BUDGET
+        stack = [([u, v], float(weights[u, v]))]
+        while stack:
+            if budget <= 0:
+                logger.warning("Ink Archive market search hit its budget on %d goods; "
+                               "best cycle may be stale", self.n)
+                break
+            budget -= 1
+            path, gain = stack.pop()
+            cur = path[-1]
+            if gain + weights[cur, u] > found_gain + _EPS:
+                found, found_gain = path[:], float(gain + weights[cur, u])
+            left = max_len - len(path)
+            if left <= 0:
+                continue
+            bound = gain + weights[cur] + reach[left]
+            bound[path] = -np.inf
+            for x in np.flatnonzero(bound > found_gain + _EPS):
+                stack.append((path + [int(x)], gain + weights[cur, x]))
+        return found, found_gain
@@ -0,0 +1,104 @@
+"""
+/batch: run many small sub-requests in one HTTP round trip.
+
+The body is a list of `{"path": ..., "body": ..., "method": "POST"}` items
+(or `{"requests": [...]}`). Each item is dispatched through the app exactly
+as if it had been sent on its own, on a bounded thread pool shared by all
+batch requests, and the response is
+`{"results": [{"status": <code>, "body": <json>}, ...]}` in request order.
+A failing item gets its own status and error body; the rest still run.
+
+BATCH_WORKERS       threads serving sub-requests per process (default 8)
+BATCH_MAX_ITEMS     max sub-requests in one batch (default 1000)
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Response, current_app
+from werkzeug.test import EnvironBuilder
+
+from routes.codec import MIMETYPE, dumps, get_json, jsonify
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.environ.get("BATCH_WORKERS", "8"))
+MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "1000"))
+
+_lock = threading.Lock()
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max(1, WORKERS), thread_name_prefix="batch")
+        return _pool
+
+
+def _error(status, message):
+    # same shape as a sub-request that failed inside its view
+    return dumps({"body": {"error": message}, "status": status})
+
+
+def _dispatch(app, item):
+    """Serve one sub-request; returns the encoded result object."""
+    if not isinstance(item, dict) or not isinstance(item.get("path"), str) \
+            or not item["path"].startswith("/"):
+        return _error(400, "each item needs a 'path' starting with '/'")
+    path = item["path"]
+    if path.split("?", 1)[0].rstrip("/") == "/batch":
+        return _error(400, "nested /batch is not supported")
+    method = str(item.get("method", "POST")).upper()
+
+    kwargs = {}
+    if "body" in item and method not in ("GET", "HEAD"):
+        kwargs = {"data": dumps(item["body"]), "content_type": MIMETYPE}
+    builder = EnvironBuilder(path=path, method=method, **kwargs)
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+
+    try:
+        # a fresh app context, so the item has its own `g` even when it runs
+        # in the thread serving the /batch request
+        with app.app_context(), app.request_context(environ):
+            try:
+                response = app.full_dispatch_request()
+            except Exception as e:
+                # what wsgi_app does: log it and answer 500 through finalize_request
+                response = app.handle_exception(e)
+            data = response.get_data()
+            response.close()
+    except Exception:
+        logger.exception("Batch item %s %s failed", method, path)
+        return _error(500, "internal error")
+
+    status = str(response.status_code).encode()
+    if response.mimetype != MIMETYPE:
+        data = dumps(data.decode("utf-8", "replace"))
+    elif not data:
+        data = b"null"
+    # keys in sorted order, like every other response; the body is spliced in as is
+    return b'{"body":' + data + b',"status":' + status + b"}"
+
+
+def batch():
+    data = get_json(force=True, silent=True)
+    if isinstance(data, dict):
+        data = data.get("requests")
+    if not isinstance(data, list):
+        return jsonify({"error": "Body must be a list of {path, body} objects or {\"requests\": [...]}"}), 400
+    if len(data) > MAX_ITEMS:
+        return jsonify({"error": f"at most {MAX_ITEMS} items per batch"}), 400
+
+    app = current_app._get_current_object()
+    if len(data) <= 1:
+        results = [_dispatch(app, item) for item in data]
+    else:
+        results = list(_get_pool().map(lambda item: _dispatch(app, item), data))
+    logger.info("Batch of %d sub-requests served", len(results))
+    return Response(b'{"results":[' + b",".join(results) + b"]}", mimetype=MIMETYPE)
@@ -1,15 +1,23 @@
 # routes/blankety.py
 import math
 import logging
-from flask import request, jsonify
-from routes import app
+import os
+from flask import stream_with_context
+from routes import imputation, ingest, npy
+from routes.codec import jsonify, jsonify_stream
 
 logger = logging.getLogger(__name__)
 
+# "numpy" (vectorized, default when NumPy is installed) or "python" (reference)
+ENGINE = os.environ.get("BLANKETY_ENGINE", "numpy" if imputation.available else "python")
+# /blankety/stream imputes this many values (summed over rows) at a time
+STREAM_CHUNK_VALUES = int(os.environ.get("BLANKETY_STREAM_CHUNK_VALUES", str(1 << 16)))
+
 def _impute_one(row):
     """
     Fill nulls by linear interpolation, extending edges.
     Preserve known values exactly.
+    Reference implementation; imputation.impute_rows must match it bit for bit.
     """
     n = len(row)
     out = [None] * n
@@ -45,28 +53,126 @@ def _impute_one(row):
     # sanity: fill any stragglers with 0
     return [0.0 if v is None or not math.isfinite(v) else v for v in out]
 
-@app.route("/blankety", methods=["POST"])
+def _impute_row(idx, row):
+    try:
+        return _impute_one(row)
+    except Exception:
+        logger.exception("Imputation failed at series[%d]", idx)
+        return [0.0] * len(row)
+
+def _blankety_npy():
+    if not npy.available:
+        return npy.unsupported()
+    try:
+        values = npy.load_array()
+    except npy.NpyError as e:
+        return jsonify({"error": f"Invalid .npy body: {e}"}), 400
+    if values.shape != (100, 1000):
+        return jsonify({"error": "Expected a 100x1000 float array"}), 400
+
+    if ENGINE == "numpy":
+        answer = imputation.impute_array(values)
+    else:
+        answer = [_impute_row(idx, [None if math.isnan(v) else v for v in row])
+                  for idx, row in enumerate(values.tolist())]
+
+    if npy.wanted():
+        return npy.respond(answer)
+    if not isinstance(answer, list):
+        answer = answer.tolist()
+    return jsonify_stream(answer, key="answer", chunk_items=4, min_items=0)
+
 def blankety():
     """
     Input:  { "series": [ [float|null]*1000 ]*100 }
+            or a 100x1000 float .npy array (NaN = null), Content-Type: application/x-npy
     Output: { "answer": [ [float]*1000 ]*100 }
+            or a 100x1000 float64 .npy array when the client Accepts application/x-npy
     """
-    data = request.get_json(silent=True)
+    if npy.is_request():
+        return _blankety_npy()
+
+    data = ingest.load("series", silent=True)
     if not isinstance(data, dict) or "series" not in data:
         return jsonify({"error": "Expected JSON with key 'series'"}), 400
 
     series = data["series"]
-    if not isinstance(series, list) or len(series) != 100:
+    if not ingest.is_array(series) or (isinstance(series, list) and len(series) != 100):
         return jsonify({"error": "Expected 100 lists in 'series'"}), 400
 
-    answer = []
-    for idx, row in enumerate(series):
-        if not isinstance(row, list) or len(row) != 1000:
-            return jsonify({"error": f"series[{idx}] must be length-1000 list"}), 400
-        try:
-            answer.append(_impute_one(row))
-        except Exception:
-            logger.exception("Imputation failed at series[%d]", idx)
-            answer.append([0.0] * len(row))
-
-    return jsonify({"answer": answer})
+    vectorized = ENGINE == "numpy" and imputation.available
+
+    # rows may still be arriving; with the reference engine each one is
+    # imputed as soon as it is parsed, otherwise the matrix is filled at once
+    rows, answer = [], []
+    try:
+        for idx, row in enumerate(series):
+            if idx >= 100:
+                return jsonify({"error": "Expected 100 lists in 'series'"}), 400
+            if not isinstance(row, list) or len(row) != 1000:
+                return jsonify({"error": f"series[{idx}] must be length-1000 list"}), 400
+            if vectorized:
+                rows.append(row)
+            else:
+                answer.append(_impute_row(idx, row))
+    except ingest.IngestError:
+        return jsonify({"error": "Expected JSON with key 'series'"}), 400
+
+    if vectorized:
+        answer = imputation.impute_rows(rows)
+        for idx, filled in enumerate(answer):
+            if filled is None:
+                answer[idx] = _impute_row(idx, rows[idx])
+
+    if len(answer) != 100:
+        return jsonify({"error": "Expected 100 lists in 'series'"}), 400
+
+    if npy.wanted():
+        return npy.respond(answer)
+    return jsonify_stream(answer, key="answer", chunk_items=4, min_items=0)
+
+def _impute_chunk(start, rows):
+    if ENGINE == "numpy" and imputation.available:
+        lists = [row for row in rows if row is not None]
+        filled = iter(imputation.impute_rows(lists))
+        out = [None if row is None else next(filled) for row in rows]
+    else:
+        out = [None if row is None else _impute_row(start + i, row) for i, row in enumerate(rows)]
+    for i, row in enumerate(rows):
+        if row is not None and out[i] is None:
+            out[i] = _impute_row(start + i, row)
+    return out
+
+def _stream_rows(series):
+    chunk, values, start = [], 0, 0
+    try:
+        for idx, row in enumerate(series):
+            if not isinstance(row, list):
+                logger.warning("series[%d] is not a list; answering null", idx)
+                row = None
+            chunk.append(row)
+            values += len(row) if row is not None else 1
+            if values >= STREAM_CHUNK_VALUES:
+                yield from _impute_chunk(start, chunk)
+                start += len(chunk)
+                chunk, values = [], 0
+    except ingest.IngestError:
+        # the status line is gone; cut the response short so the client sees invalid JSON
+        logger.warning("Invalid JSON in /blankety/stream body after %d rows", start + len(chunk))
+        raise
+    yield from _impute_chunk(start, chunk)
+
+def blankety_stream():
+    """
+    Input:  { "series": [ [float|null]* ]* }   (any number of rows, any lengths)
+    Output: { "answer": [ [float]* ]* }        (null for a row that is not a list)
+
+    Rows are read, imputed and written STREAM_CHUNK_VALUES values at a time,
+    so memory stays flat however large the body is.
+    """
+    data = ingest.load("series", silent=True)
+    if not isinstance(data, dict) or "series" not in data or not ingest.is_array(data["series"]):
+        return jsonify({"error": "Expected JSON with list 'series'"}), 400
+
+    rows = stream_with_context(_stream_rows(data["series"]))
+    return jsonify_stream(rows, key="answer", chunk_items=16, min_items=0)
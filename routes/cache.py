@@ -0,0 +1,173 @@
+"""
+Response cache for endpoints whose answer is a pure function of the JSON body.
+
+Responses are keyed by the endpoint and a hash of the canonical encoding of
+the parsed payload (sorted keys, compact separators), so resent test cases
+are answered without re-running the solver. One LRU with a TTL is shared by
+all cached endpoints; hits and misses are counted per endpoint and exported
+through /metrics.
+
+RESPONSE_CACHE_SIZE       max cached responses (0 disables caching)
+RESPONSE_CACHE_TTL        seconds an entry stays valid (0 = no expiry)
+RESPONSE_CACHE_<ENDPOINT> 0/1 to switch a single endpoint off or on
+"""
+import functools
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, make_response, request
+
+from routes import metrics
+from routes.codec import dumps, get_json
+
+logger = logging.getLogger(__name__)
+
+SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "1024"))
+TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "300"))
+# Bodies and responses larger than this are neither hashed nor stored
+MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(1 << 20)))
+
+# Endpoints cached by default; RESPONSE_CACHE_<ENDPOINT> overrides
+ENABLED = {
+    "investigate": True,
+    "the_ink_archive": True,
+    "princess_diaries": True,
+    "sailing_club_submission": True,
+    "duolingo_sort_handler": True,
+    "trading_formula": True,
+    "slsm_solver": True,
+}
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with an optional per-entry time to live."""
+
+    def __init__(self, maxsize, ttl=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires, value = entry
+            if expires and expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_responses = LRUCache(SIZE, TTL)
+_counts_lock = threading.Lock()
+_hits = {}
+_misses = {}
+
+
+def clear():
+    """Drop every cached response; hit and miss counts are kept."""
+    _responses.clear()
+
+
+def enabled(endpoint):
+    env = os.environ.get(f"RESPONSE_CACHE_{endpoint.upper()}")
+    if env is not None:
+        return env.lower() in ("1", "true", "yes")
+    return SIZE > 0 and ENABLED.get(endpoint, False)
+
+
+def payload_key(endpoint, payload):
+    digest = hashlib.blake2b(dumps(payload), digest_size=16).hexdigest()
+    return f"{endpoint}:{digest}"
+
+
+def _count(table, endpoint):
+    with _counts_lock:
+        table[endpoint] = table.get(endpoint, 0) + 1
+
+
+def cached(view):
+    """Serve repeated identical JSON bodies for `view` from the response cache."""
+    endpoint = view.__name__
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        length = request.content_length
+        # chunked bodies have no length and are left to stream into the view
+        if not enabled(endpoint) or length is None or length > MAX_BYTES:
+            return view(*args, **kwargs)
+        payload = get_json(silent=True)
+        if payload is None:
+            return view(*args, **kwargs)
+
+        key = payload_key(endpoint, payload)
+        hit = _responses.get(key)
+        if hit is not None:
+            _count(_hits, endpoint)
+            body, status, mimetype = hit
+            return Response(body, status=status, mimetype=mimetype)
+
+        _count(_misses, endpoint)
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            body = response.get_data()
+            if len(body) <= MAX_BYTES:
+                _responses.set(key, (body, response.status_code, response.mimetype))
+        return response
+
+    return wrapper
+
+
+def _render():
+    with _counts_lock:
+        hits, misses = dict(_hits), dict(_misses)
+    lines = [
+        "# HELP response_cache_hits_total Responses served from the cache, by endpoint.",
+        "# TYPE response_cache_hits_total counter",
+    ]
+    lines += [f'response_cache_hits_total{{endpoint="{e}"}} {n}' for e, n in sorted(hits.items())]
+    lines += [
+        "# HELP response_cache_misses_total Cacheable requests that ran the view, by endpoint.",
+        "# TYPE response_cache_misses_total counter",
+    ]
+    lines += [f'response_cache_misses_total{{endpoint="{e}"}} {n}' for e, n in sorted(misses.items())]
+    lines += [
+        "# HELP response_cache_entries Responses currently cached.",
+        "# TYPE response_cache_entries gauge",
+        f"response_cache_entries {len(_responses)}",
+    ]
+    return lines
+
+
+metrics.add_collector(_render)
@@ -0,0 +1,121 @@
+"""
+JSON codec shared by every route.
+
+Uses orjson when it is installed and the stdlib `json` module otherwise
+(set JSON_CODEC=stdlib to force the fallback). Output matches what
+`flask.jsonify` produced before: compact separators and sorted keys.
+"""
+import json
+import logging
+import os
+from itertools import islice
+
+from flask import Response, request
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+if os.environ.get("JSON_CODEC", "").lower() == "stdlib":
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "stdlib"
+MIMETYPE = "application/json"
+
+# Arrays at least this long are streamed in chunks of STREAM_CHUNK_ITEMS items
+STREAM_MIN_ITEMS = int(os.environ.get("JSON_STREAM_MIN_ITEMS", "256"))
+STREAM_CHUNK_ITEMS = int(os.environ.get("JSON_STREAM_CHUNK_ITEMS", "64"))
+
+_REQUEST_CACHE_KEY = "routes.codec.json"
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def dumps(obj):
+    """Serialize `obj` to compact JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTS)
+        except TypeError:
+            # ints beyond 64 bits and other types orjson refuses
+            pass
+    return _stdlib_dumps(obj)
+
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity literals and huge ints are only accepted by the stdlib
+            pass
+    return json.loads(data)
+
+
+def get_json(force=False, silent=False):
+    """
+    Drop-in for `request.get_json()` that decodes with the fast backend.
+    The parsed body is cached for the rest of the request.
+    """
+    environ = request.environ
+    if _REQUEST_CACHE_KEY in environ:
+        return environ[_REQUEST_CACHE_KEY]
+
+    if not (force or request.is_json):
+        if silent:
+            return None
+        return request.on_json_loading_failed(None)
+
+    try:
+        data = loads(request.get_data())
+    except ValueError as e:
+        if silent:
+            return None
+        return request.on_json_loading_failed(e)
+
+    environ[_REQUEST_CACHE_KEY] = data
+    return data
+
+
+def jsonify(obj):
+    """Drop-in for `flask.jsonify(obj)`."""
+    return Response(dumps(obj), mimetype=MIMETYPE)
+
+
+def _iter_array(items, prefix, suffix, chunk_items):
+    yield prefix + b"["
+    it = iter(items)
+    first = True
+    while True:
+        chunk = list(islice(it, chunk_items))
+        if not chunk:
+            break
+        body = dumps(chunk)[1:-1]
+        yield body if first else b"," + body
+        first = False
+    yield b"]" + suffix
+
+
+def jsonify_stream(items, key=None, chunk_items=STREAM_CHUNK_ITEMS, min_items=STREAM_MIN_ITEMS):
+    """
+    Respond with a JSON array (or `{key: array}`), encoding it `chunk_items`
+    elements at a time instead of building the whole document in memory.
+    Lists shorter than `min_items` are sent as a regular response.
+    """
+    if isinstance(items, list) and len(items) < min_items:
+        return jsonify(items if key is None else {key: items})
+
+    if key is None:
+        prefix, suffix = b"", b""
+    else:
+        prefix, suffix = b"{" + dumps(key) + b":", b"}"
+    return Response(_iter_array(items, prefix, suffix, chunk_items), mimetype=MIMETYPE)
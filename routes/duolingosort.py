@@ -1,9 +1,9 @@
 import json
 import logging
-from routes import app
 import re
 from functools import cmp_to_key
-from flask import Flask, request, jsonify
+from routes.cache import cached
+from routes.codec import get_json, jsonify
 import re
 
 
@@ -143,10 +143,10 @@ def solve_part_two(str_list: list[str]) -> list[str]:
 
 # --- Flask Endpoint ---
 
-@app.route("/duolingo-sort", methods=["POST"])
+@cached
 def duolingo_sort_handler():
     """Main endpoint to handle sorting requests."""
-    data = request.get_json()
+    data = get_json()
     part = data.get("part")
     unsorted_list = data.get("challengeInput", {}).get("unsortedList", [])
     
@@ -158,6 +158,3 @@ def duolingo_sort_handler():
         return jsonify({"error": f"Part '{part}' is not supported"}), 400
         
     return jsonify({"sortedList": sorted_list})
-
-if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Warm process pool for CPU-bound solvers.
+
+Views hand a module-level solver function to `run` / `map_deadline`
+instead of calling it inline, so a long computation no longer holds the
+GIL of the worker that serves every other request. Each call has a
+deadline; when it passes, the pool is recycled (killing the runaway
+solver) and SolverTimeout is raised so the view can answer with a clean
+504.
+
+SOLVER_POOL_SIZE=0 runs solvers inline in the request thread (no deadline).
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from routes.codec import jsonify
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.environ.get("SOLVER_POOL_SIZE", min(4, os.cpu_count() or 1)))
+START_METHOD = os.environ.get("SOLVER_POOL_START_METHOD", "spawn")
+DEFAULT_DEADLINE = float(os.environ.get("SOLVER_DEADLINE", "30"))
+
+# Per-endpoint deadlines in seconds; SOLVER_DEADLINE_<ENDPOINT> overrides them
+DEADLINES = {
+    "the_ink_archive": 20.0,
+    "princess_diaries": 10.0,
+    "investigate": 10.0,
+    "slsm_solver": 5.0,
+}
+
+# Solver modules imported by every pool process while warming up
+WARM_MODULES = (
+    "routes.theinkarchive",
+    "routes.princessdiaries",
+    "routes.spy_network",
+    "routes.slsm",
+)
+
+_lock = threading.Lock()
+_pool = None
+
+
+class SolverTimeout(Exception):
+    """A solver did not finish before its deadline."""
+
+
+def deadline_for(endpoint):
+    env = os.environ.get(f"SOLVER_DEADLINE_{endpoint.upper()}")
+    if env:
+        return float(env)
+    return DEADLINES.get(endpoint, DEFAULT_DEADLINE)
+
+
+def _import_modules(names):
+    import importlib
+    for name in names:
+        importlib.import_module(name)
+    return os.getpid()
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            ctx = multiprocessing.get_context(START_METHOD)
+            _pool = ProcessPoolExecutor(max_workers=POOL_SIZE, mp_context=ctx)
+        return _pool
+
+
+def warm():
+    """Start every pool process and import the solver modules in it."""
+    if POOL_SIZE <= 0:
+        return
+    pool = _get_pool()
+    futures = [pool.submit(_import_modules, WARM_MODULES) for _ in range(POOL_SIZE)]
+    for f in futures:
+        f.result()
+    logger.info("Solver pool warm with %d processes", POOL_SIZE)
+
+
+def _recycle(pool):
+    """Kill `pool` (and whatever it is running) so the next call gets a fresh one."""
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    for proc in list((pool._processes or {}).values()):
+        proc.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+    logger.warning("Solver pool recycled after a deadline was missed")
+
+
+def map_deadline(fn, *iterables, deadline):
+    """
+    Like builtin map(fn, *iterables) but evaluated in the pool; all calls
+    together must finish within `deadline` seconds. Exceptions raised by
+    `fn` propagate to the caller.
+    """
+    if POOL_SIZE <= 0:
+        return [fn(*args) for args in zip(*iterables)]
+
+    end = time.monotonic() + deadline
+    # iterables may be one-shot (streamed request bodies): keep what was
+    # submitted so a retry can resubmit it
+    pending = zip(*iterables)
+    submitted = []
+    for attempt in (1, 2):
+        pool = _get_pool()
+        futures = [pool.submit(fn, *args) for args in submitted]
+        for args in pending:
+            submitted.append(args)
+            futures.append(pool.submit(fn, *args))
+        try:
+            return [f.result(timeout=max(0.0, end - time.monotonic())) for f in futures]
+        except FutureTimeout:
+            _recycle(pool)
+            raise SolverTimeout(f"{fn.__name__} exceeded its {deadline:g}s deadline")
+        except BrokenProcessPool:
+            # another request's timeout recycled the pool under us; retry once
+            if attempt == 2 or time.monotonic() >= end:
+                raise
+            _recycle(pool)
+
+
+def run(fn, *args, deadline):
+    """Call fn(*args) in the pool, raising SolverTimeout after `deadline` seconds."""
+    return map_deadline(fn, *([a] for a in args), deadline=deadline)[0]
+
+
+def timeout_response(exc):
+    logger.warning("%s", exc)
+    return jsonify({"error": "solver timed out"}), 504
@@ -1,24 +1,34 @@
-from flask import Flask, request, jsonify
+from routes.codec import get_json, jsonify
 import json
+import logging
 from typing import Dict, List, Tuple, Set, Optional
 import heapq
+import threading
 from collections import deque
 
-app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
 class FogOfWallSolver:
+    """
+    Games by id. Turns come from request threads (WSGI, /batch) and from the
+    ASGI turn pool, so the dict is guarded by `lock` and every GameState
+    carries its own lock, held for a whole turn by play_turn.
+    """
     def __init__(self):
         self.games: Dict[str, 'GameState'] = {}
+        self.lock = threading.Lock()
     
     def get_or_create_game(self, game_id: str, test_case: dict = None) -> 'GameState':
-        if game_id not in self.games:
-            if test_case is None:
-                raise ValueError(f"Game {game_id} not found and no test_case provided")
-            self.games[game_id] = GameState(test_case)
-        return self.games[game_id]
+        with self.lock:
+            if game_id not in self.games:
+                if test_case is None:
+                    raise ValueError(f"Game {game_id} not found and no test_case provided")
+                self.games[game_id] = GameState(test_case)
+            return self.games[game_id]
 
 class GameState:
     def __init__(self, test_case: dict):
+        self.lock = threading.Lock()
         self.game_id = test_case['game_id']
         self.length_of_grid = test_case['length_of_grid']
         self.num_of_walls = test_case['num_of_walls']
@@ -245,30 +255,31 @@ class GameState:
 
 solver = FogOfWallSolver()
 
-@app.route('/fog-of-wall', methods=['POST'])
-def fog_of_wall():
+def play_turn(data) -> Tuple[dict, int]:
+    """One round trip of the game protocol: returns (response body, status)."""
     try:
-        data = request.json
         challenger_id = data['challenger_id']
         game_id = data['game_id']
         
         # Handle initial request
         if 'test_case' in data:
             game = solver.get_or_create_game(game_id, data['test_case'])
-            action = game.get_next_action()
+            with game.lock:
+                action = game.get_next_action()
         else:
             # Handle subsequent requests with previous action results
             game = solver.get_or_create_game(game_id)
             
-            if 'previous_action' in data:
-                prev_action = data['previous_action']
+            with game.lock:
+                if 'previous_action' in data:
+                    prev_action = data['previous_action']
+                    
+                    if prev_action['your_action'] == 'move':
+                        game.update_crow_position(prev_action['crow_id'], prev_action['move_result'])
+                    elif prev_action['your_action'] == 'scan':
+                        game.process_scan_result(prev_action['crow_id'], prev_action['scan_result'])
                 
-                if prev_action['your_action'] == 'move':
-                    game.update_crow_position(prev_action['crow_id'], prev_action['move_result'])
-                elif prev_action['your_action'] == 'scan':
-                    game.process_scan_result(prev_action['crow_id'], prev_action['scan_result'])
-            
-            action = game.get_next_action()
+                action = game.get_next_action()
         
         # Prepare response
         response = {
@@ -277,8 +288,17 @@ def fog_of_wall():
             **action
         }
         
-        return jsonify(response)
+        return response, 200
     
     except Exception as e:
-        print(f"Error: {e}")
+        logger.exception("Fog of Wall turn failed")
+        return {'error': str(e)}, 500
+
+def fog_of_wall():
+    try:
+        data = get_json()
+    except Exception as e:
+        logger.exception("Could not read Fog of Wall request")
         return jsonify({'error': str(e)}), 500
+    body, status = play_turn(data)
+    return jsonify(body), status
@@ -0,0 +1,119 @@
+"""
+Vectorized gap filling for /blankety.
+
+`impute_rows` fills a whole matrix of series at once with NumPy and gives
+bit-for-bit the same floats as `blanketyblanks._impute_one`, which stays the
+reference: known values are kept, gaps are filled with
+`va + (j / span) * (vb - va)` evaluated in the same order, edges are
+extended from the nearest known value, all-null rows become zeros and any
+non-finite result becomes 0.0.
+
+NumPy is optional; without it `available` is False and callers use the
+reference implementation.
+"""
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # optional speedup
+    np = None
+
+logger = logging.getLogger(__name__)
+
+available = np is not None
+
+
+def _to_arrays(rows):
+    """(values, known) float/bool matrices for `rows`; raises if any value is not float()-able."""
+    obj = np.array(rows, dtype=object)
+    if obj.ndim != 2:
+        raise ValueError("rows must be flat lists of equal length")
+    known = np.not_equal(obj, None)
+    obj[~known] = 0.0
+    # object -> float64 calls float() on every element, like the reference
+    return obj.astype(np.float64), known
+
+
+def _fill(values, known):
+    n_rows, n = values.shape
+    idx = np.arange(n)
+    # nearest known index at or left of / at or right of each position
+    left = np.where(known, idx, -1)
+    np.maximum.accumulate(left, axis=1, out=left)
+    right = np.where(known, idx, n)[:, ::-1]
+    right = np.minimum.accumulate(right, axis=1)[:, ::-1]
+
+    # past an edge, both ends are the nearest known value (span 0); known
+    # positions are their own ends
+    lo = np.where(left >= 0, left, right)
+    hi = np.where(right < n, right, left)
+    empty = ~known.any(axis=1)
+    lo[empty] = hi[empty] = 0
+
+    base = (np.arange(n_rows) * n)[:, None]
+    flat = values.ravel()
+    va = flat[base + lo]
+    vb = flat[base + hi]
+    span = hi - lo
+    gap = span > 0
+    with np.errstate(invalid="ignore", over="ignore", divide="ignore"):
+        t = np.divide(idx - lo, span, out=np.zeros(values.shape), where=gap)
+        out = np.where(gap, va + t * (vb - va), va)
+
+    out[empty] = 0.0
+    out[~np.isfinite(out)] = 0.0
+    return out
+
+
+def impute_rows(rows):
+    """
+    Impute every row of `rows` (lists of float|None, any lengths).
+    Returns a list with one list of floats per row, or None in place of a
+    row whose values could not be converted to float.
+    """
+    if not rows:
+        return []
+    lengths = [len(row) for row in rows]
+    width = max(lengths)
+    if width == 0:
+        return [[] for _ in rows]
+    ragged = min(lengths) != width
+    if ragged:
+        # nulls padded on the right change nothing left of them
+        rows = [row + [None] * (width - len(row)) for row in rows]
+
+    try:
+        values, known = _to_arrays(rows)
+        out = _fill(values, known).tolist()
+    except (TypeError, ValueError, OverflowError):
+        out = _impute_convertible(rows)
+
+    if ragged:
+        out = [row if row is None else row[:n] for row, n in zip(out, lengths)]
+    return out
+
+
+def impute_array(values):
+    """
+    Impute a float64 matrix in which NaN marks a missing value; returns a
+    new matrix and leaves `values` untouched (it may be a read-only view).
+    """
+    return _fill(values, ~np.isnan(values))
+
+
+def _impute_convertible(rows):
+    # some row has a bad value: convert row by row and leave those out
+    out = [None] * len(rows)
+    good, arrays = [], []
+    for i, row in enumerate(rows):
+        try:
+            arrays.append(_to_arrays([row]))
+        except (TypeError, ValueError, OverflowError):
+            continue
+        good.append(i)
+    if good:
+        filled = _fill(np.concatenate([v for v, _ in arrays]),
+                       np.concatenate([k for _, k in arrays])).tolist()
+        for i, row in zip(good, filled):
+            out[i] = row
+    return out
@@ -0,0 +1,198 @@
+"""
+Incremental JSON ingestion for large request bodies.
+
+`load(key)` returns the parsed body like `get_json()`, except that for
+bodies over STREAM_THRESHOLD the array at the top level (or at body[key])
+comes back as a StreamedArray: a one-shot iterator that parses elements
+off the socket as they are consumed. Solvers can then start on the first
+test case before the last one has arrived, and the raw payload is never
+held in memory as a whole. Object keys that follow the streamed array are
+not read.
+
+MAX_BODY_BYTES              app-wide request body limit (default 64 MiB)
+MAX_BODY_BYTES_<ENDPOINT>   tighter limit for one endpoint
+INGEST_STREAM_THRESHOLD     bodies at least this large are streamed (default 1 MiB)
+"""
+import codecs
+import json
+import logging
+import os
+
+from flask import request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from routes.codec import _REQUEST_CACHE_KEY, get_json
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = int(os.environ.get("MAX_BODY_BYTES", str(64 << 20)))
+STREAM_THRESHOLD = int(os.environ.get("INGEST_STREAM_THRESHOLD", str(1 << 20)))
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class IngestError(ValueError):
+    """The body is not valid JSON (raised while a StreamedArray is consumed)."""
+
+
+def limit_for(endpoint):
+    env = os.environ.get(f"MAX_BODY_BYTES_{endpoint.upper()}")
+    return int(env) if env else MAX_BODY_BYTES
+
+
+class _Reader:
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.read_total = 0
+        self.eof = False
+
+    def fill(self, size=CHUNK_SIZE):
+        data = self.stream.read(size)
+        if not data:
+            self.eof = True
+            self.buf = self.buf[self.pos:] + self.decoder.decode(b"", final=True)
+        else:
+            self.read_total += len(data)
+            if self.read_total > self.limit:
+                raise RequestEntityTooLarge()
+            self.buf = self.buf[self.pos:] + self.decoder.decode(data)
+        self.pos = 0
+
+    def peek(self):
+        """Next non-whitespace character ('' at end of body)."""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if self.eof:
+                return ""
+            self.fill()
+
+    def expect(self, chars):
+        ch = self.peek()
+        if ch == "" or ch not in chars:
+            raise IngestError(f"expected one of {chars!r} at byte {self.read_total}")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise IngestError(str(e)) from None
+                # grow geometrically so one large element is not re-parsed per chunk
+                self.fill(max(CHUNK_SIZE, len(self.buf) - self.pos))
+                continue
+            if end == len(self.buf) and not self.eof:
+                # a number may continue in the next chunk
+                self.fill(max(CHUNK_SIZE, len(self.buf) - self.pos))
+                continue
+            self.pos = end
+            return obj
+
+
+class StreamedArray:
+    """Elements of a JSON array, parsed lazily from the request body."""
+
+    def __init__(self, reader):
+        self._reader = reader
+        self._consumed = False
+        self._read = 0
+        self._done = False
+
+    def __iter__(self):
+        if self._consumed:
+            raise RuntimeError("StreamedArray can only be iterated once")
+        self._consumed = True
+        reader = self._reader
+        if reader.peek() == "]":
+            reader.pos += 1
+            self._done = True
+            return
+        while True:
+            value = reader.value()
+            self._read += 1
+            yield value
+            if reader.expect(",]") == "]":
+                self._done = True
+                return
+
+    def __repr__(self):
+        if self._done:
+            return f"<StreamedArray of length {self._read}>"
+        if not self._consumed:
+            return "<StreamedArray, not read yet>"
+        return f"<StreamedArray, {self._read} read so far>"
+
+
+def is_array(value):
+    return isinstance(value, (list, StreamedArray))
+
+
+def _stream(key, limit):
+    reader = _Reader(request.stream, limit)
+    ch = reader.peek()
+    if ch == "[":
+        reader.pos += 1
+        return StreamedArray(reader)
+    if ch != "{":
+        return reader.value()
+
+    reader.pos += 1
+    out = {}
+    if reader.peek() == "}":
+        return out
+    while True:
+        name = reader.value()
+        if not isinstance(name, str):
+            raise IngestError("object keys must be strings")
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            reader.pos += 1
+            out[name] = StreamedArray(reader)
+            return out
+        out[name] = reader.value()
+        if reader.expect(",}") == "}":
+            return out
+
+
+def load(key=None, limit=None, silent=False, force=False):
+    """
+    Parse the request body, streaming the top-level array or body[key]
+    when the body is large. Invalid JSON returns None when `silent`, and
+    otherwise raises IngestError. Like get_json(), a body not sent as JSON
+    is rejected (None when `silent`, else 415) unless `force` is set.
+    """
+    if _REQUEST_CACHE_KEY in request.environ:
+        # already parsed whole (e.g. by the response cache)
+        return request.environ[_REQUEST_CACHE_KEY]
+    limit = limit or limit_for(request.endpoint or "")
+    length = request.content_length
+    if length is not None and length > limit:
+        raise RequestEntityTooLarge()
+    if not (force or request.is_json):
+        return None if silent else request.on_json_loading_failed(None)
+    if length is not None and length < STREAM_THRESHOLD:
+        data = get_json(force=True, silent=True)
+        if data is None and not silent:
+            raise IngestError("invalid JSON body")
+        return data
+
+    try:
+        return _stream(key, limit)
+    except IngestError:
+        if silent:
+            return None
+        raise
@@ -0,0 +1,145 @@
+"""
+Persistent Ink Archive markets: create a market once, push rate updates
+for single (u, v) pairs as they tick, and read its current best cycle.
+
+POST   /The-Ink-Archive/markets                   {"goods": [...], "ratios": [[u, v, rate], ...]}
+POST   /The-Ink-Archive/markets/<market_id>/rates {"ratios": [[u, v, rate], ...]}  (rate <= 0 removes the pair)
+GET    /The-Ink-Archive/markets/<market_id>
+DELETE /The-Ink-Archive/markets/<market_id>
+
+Each answers {"market_id": ..., "path": [...], "gain": ...} like one
+/The-Ink-Archive item. With NumPy, markets keep an arbitrage.Market, so
+an update only searches cycles through the pairs whose rate went up.
+Without it every update re-solves the market with best_arbitrage.
+Storage, ids and expiry are routes.registry's.
+
+INK_MARKETS_MAX   markets kept per process, least recently used dropped first (default 256)
+INK_MARKET_TTL    seconds a market lives after its last update (default 3600, 0 = forever)
+"""
+import logging
+import math
+import os
+
+from routes import arbitrage
+from routes.codec import get_json, jsonify
+from routes.registry import Registry
+from routes.theinkarchive import MAX_CYCLE_LEN, _bellman_ford_cycle, best_arbitrage, describe_cycle
+
+logger = logging.getLogger(__name__)
+
+MAX_MARKETS = int(os.environ.get("INK_MARKETS_MAX", "256"))
+MARKET_TTL = float(os.environ.get("INK_MARKET_TTL", "3600"))
+
+
+class _Market:
+    """
+    One market: its goods, current rates and (with NumPy) solver state.
+
+    When the max-plus search has no cycle, the Bellman-Ford fallback's
+    cycle is kept in `_fallback` until an update could change it: a rate
+    going up or a new pair (either can close a new cycle), or any change
+    to a pair of the kept cycle. Lower rates elsewhere leave it valid.
+    """
+
+    def __init__(self, goods, rate_map):
+        self.goods = goods
+        self.rate_map = rate_map
+        self.market = None
+        self._fallback = None
+        self._fallback_stale = True
+        if arbitrage.available:
+            self.market = arbitrage.Market(len(goods), rate_map, MAX_CYCLE_LEN)
+            self.rate_map = self.market.rate_map
+
+    def update(self, rates):
+        cycle = self._fallback or []
+        on_cycle = set(zip(cycle, cycle[1:] + cycle[:1]))
+        for pair, r in rates.items():
+            if r > self.rate_map.get(pair, 0.0) or pair in on_cycle:
+                self._fallback_stale = True
+                break
+
+        if self.market is not None:
+            if self.market.update(rates):
+                logger.debug("Market update touched the best cycle; re-solved in full")
+        else:
+            for pair, r in rates.items():
+                if r > 0.0:
+                    self.rate_map[pair] = r
+                else:
+                    self.rate_map.pop(pair, None)
+
+    def _fallback_cycle(self):
+        if self._fallback_stale:
+            edges = [(u, v, -math.log(r)) for (u, v), r in self.rate_map.items()]
+            self._fallback = _bellman_ford_cycle(len(self.goods), edges, self.rate_map)
+            self._fallback_stale = False
+        return self._fallback
+
+    def answer(self):
+        if self.market is None:
+            ratios = [(u, v, r) for (u, v), r in self.rate_map.items()]
+            return best_arbitrage(self.goods, ratios)
+        cycle = self.market.best
+        if cycle is None:
+            # nothing within MAX_CYCLE_LEN; Bellman-Ford also sees longer cycles
+            cycle = self._fallback_cycle()
+            if cycle is None or len(cycle) < 2:
+                return [], 0.0
+        return describe_cycle(self.goods, cycle, self.rate_map)
+
+
+_markets = Registry("market", "market_id", MAX_MARKETS, MARKET_TTL)
+
+
+def _parse_rates(ratios, n):
+    """{(u, v): rate} from [[u, v, rate], ...]; raises ValueError."""
+    if not isinstance(ratios, list):
+        raise ValueError("'ratios' must be a list")
+    rates = {}
+    for item in ratios:
+        u, v, r = item
+        u, v, r = int(u), int(v), float(r)
+        if not (0 <= u < n and 0 <= v < n):
+            raise ValueError(f"pair ({u}, {v}) is out of range for {n} goods")
+        rates[(u, v)] = r
+    return rates
+
+
+def _describe(state):
+    path, gain = state.answer()
+    return {"path": path, "gain": gain}
+
+
+def create_market():
+    data = get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("goods"), list):
+        return jsonify({"error": "Expected JSON with list 'goods' and 'ratios'"}), 400
+    goods = data["goods"]
+    try:
+        rates = _parse_rates(data.get("ratios", []), len(goods))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid 'ratios': {e}"}), 400
+
+    state = _Market(goods, {pair: r for pair, r in rates.items() if r > 0.0})
+    return _markets.create(state, _describe, f"with {len(goods)} goods")
+
+
+def market(market_id):
+    return _markets.show(market_id, _describe)
+
+
+def _apply_rates(state):
+    data = get_json(silent=True)
+    if not isinstance(data, dict):
+        raise ValueError("Expected JSON with list 'ratios'")
+    try:
+        rates = _parse_rates(data.get("ratios"), len(state.goods))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid 'ratios': {e}") from None
+    state.update(rates)
+    return _describe(state)
+
+
+def update_rates(market_id):
+    return _markets.update(market_id, _apply_rates)
@@ -0,0 +1,144 @@
+"""
+Batched interval sweeps for /sailing-club/submission.
+
+`solve_cases` packs the bookings of many test cases into flat int64 arrays
+(start, end, case index) and answers all of them with a few sorts:
+
+- merged slots: bookings sorted by (case, start); a running max of the
+  ends, shifted by case so one case cannot leak into the next, closes a
+  slot wherever the next start is past it
+- min boats: +1 / -1 events sorted by (case, time, ends first), packed
+  into one int64 key when the values allow it; every case's events sum
+  to zero, so the running total restarts at 0 on each case and the peak
+  is a maximum.reduceat over the case segments
+
+The answers match sailingclub.merge_slots and sailingclub.min_boats, which
+stay the reference. `to_array` validates a whole case at once and returns
+None for anything that is not a clean list of numeric pairs fitting int64;
+callers send those cases through the reference instead.
+
+NumPy is optional; without it `available` is False and callers use the
+reference implementation.
+"""
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # optional speedup
+    np = None
+
+logger = logging.getLogger(__name__)
+
+available = np is not None
+
+_NUMERIC = frozenset((int, float, bool))
+# widest (case count * value range) the shifted running max can hold
+_SHIFT_LIMIT = 1 << 62
+
+
+def to_array(raw):
+    """(k, 2) int64 array of the pairs in `raw`, or None if any item is not a numeric pair."""
+    if not isinstance(raw, list):
+        return None
+    if not raw:
+        return np.empty((0, 2), dtype=np.int64)
+    try:
+        obj = np.array(raw, dtype=object)
+    except ValueError:
+        return None
+    if obj.ndim != 2 or obj.shape[1] != 2:
+        return None
+    if not _NUMERIC.issuperset(map(type, obj.ravel())):
+        return None
+    try:
+        # int() on every element, like the reference
+        return obj.astype(np.int64)
+    except (OverflowError, ValueError):
+        return None
+
+
+def _case_key(case, values, n_cases, bits=0):
+    """
+    case * span + (values - min), shifted left by `bits`: one int64 that
+    sorts like (case, value); None when it would not fit.
+    """
+    lo = int(values.min())
+    span = int(values.max()) - lo + 1
+    if (span * n_cases) << bits >= _SHIFT_LIMIT:
+        return None
+    return (case * span + (values - lo)) << bits
+
+
+def _running_end(case, ends, n_cases):
+    """Running max of `ends` restarted at each case (rows sorted by case)."""
+    lo = int(ends.min())
+    span = int(ends.max()) - lo + 1
+    if span * n_cases < _SHIFT_LIMIT:
+        shift = case * span
+        return np.maximum.accumulate(ends - lo + shift) - shift + lo
+    run = np.empty_like(ends)
+    bounds = np.flatnonzero(np.diff(case)) + 1
+    for a, b in zip(np.r_[0, bounds], np.r_[bounds, len(ends)]):
+        np.maximum.accumulate(ends[a:b], out=run[a:b])
+    return run
+
+
+def _merge(case, starts, ends, n_cases):
+    """Merged slots per case as lists of [start, end]."""
+    if not len(case):
+        return [[] for _ in range(n_cases)]
+    key = _case_key(case, starts, n_cases)
+    order = np.lexsort((starts, case)) if key is None else np.argsort(key, kind="stable")
+    case, starts, ends = case[order], starts[order], ends[order]
+    run = _running_end(case, ends, n_cases)
+
+    opens = np.ones(len(case), dtype=bool)
+    opens[1:] = (case[1:] != case[:-1]) | (starts[1:] > run[:-1])
+    first = np.flatnonzero(opens)
+    last = np.r_[first[1:] - 1, len(case) - 1]
+    slots = np.stack([starts[first], run[last]], axis=1).tolist()
+
+    bounds = np.cumsum(np.bincount(case[first], minlength=n_cases)).tolist()
+    return [slots[a:b] for a, b in zip([0] + bounds, bounds)]
+
+
+def _peaks(case, starts, ends, n_cases):
+    """Max number of overlapping bookings per case."""
+    peaks = np.zeros(n_cases, dtype=np.int64)
+    if not len(case):
+        return peaks.tolist()
+    times = np.concatenate([starts, ends])
+    cases = np.concatenate([case, case])
+    # at equal times ends sort first: a boat freed at t can be taken at t
+    key = _case_key(cases, times, n_cases, bits=1)
+    if key is None:
+        delta = np.concatenate([np.ones(len(starts), dtype=np.int64),
+                                np.full(len(ends), -1, dtype=np.int64)])
+        level = np.cumsum(delta[np.lexsort((delta, times, cases))])
+    else:
+        key[:len(starts)] |= 1  # the low bit marks a start
+        key.sort()
+        level = np.cumsum((key & 1) * 2 - 1)
+
+    counts = np.bincount(case, minlength=n_cases)
+    busy = np.flatnonzero(counts)
+    offsets = np.r_[0, np.cumsum(2 * counts)[:-1]][busy]
+    peaks[busy] = np.maximum.reduceat(level, offsets)
+    return peaks.tolist()
+
+
+def solve_cases(cases):
+    """
+    [(merged slots, min boats), ...] for a list of (k, 2) int64 booking
+    arrays; bookings with end <= start are dropped, like the reference.
+    """
+    n_cases = len(cases)
+    if not n_cases:
+        return []
+    counts = [len(a) for a in cases]
+    flat = np.concatenate(cases) if sum(counts) else np.empty((0, 2), dtype=np.int64)
+    case = np.repeat(np.arange(n_cases), counts)
+    starts, ends = flat[:, 0], flat[:, 1]
+    keep = ends > starts
+    case, starts, ends = case[keep], starts[keep], ends[keep]
+    return list(zip(_merge(case, starts, ends, n_cases), _peaks(case, starts, ends, n_cases)))
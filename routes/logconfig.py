@@ -0,0 +1,120 @@
+"""
+Process-wide logging setup.
+
+Records are put on a queue by the request thread and formatted and written
+by a QueueListener thread, so log I/O and formatting stay off the hot path.
+Levels can be set per route module, and request bodies are logged through
+`payload()`, which is sampled and renders a size-bounded repr only if the
+record is actually emitted. That repr is taken on the request thread when
+the record is enqueued, so the listener never touches live request objects.
+
+LOG_LEVEL               root level (default INFO)
+LOG_LEVEL_<MODULE>      level for routes.<module>, e.g. LOG_LEVEL_THEMAGESGAMBIT=DEBUG
+LOG_PAYLOAD_CHARS       max characters of a logged payload (default 500)
+LOG_PAYLOAD_SAMPLE      fraction of payloads logged in full, 0..1 (default 1)
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import reprlib
+
+FORMAT = "%(asctime)s %(name)-12s %(levelname)-8s %(message)s"
+
+LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+PAYLOAD_CHARS = int(os.environ.get("LOG_PAYLOAD_CHARS", "500"))
+PAYLOAD_SAMPLE = float(os.environ.get("LOG_PAYLOAD_SAMPLE", "1"))
+
+_repr = reprlib.Repr()
+_repr.maxlevel = 3
+_repr.maxlist = _repr.maxtuple = _repr.maxdict = 8
+_repr.maxstring = _repr.maxother = 80
+
+_listener = None
+
+
+class _Payload:
+    __slots__ = ("obj", "text")
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.text = None
+
+    def __str__(self):
+        # rendered once; the object is dropped so later reads cannot see it change
+        if self.text is None:
+            if PAYLOAD_SAMPLE < 1 and random.random() >= PAYLOAD_SAMPLE:
+                text = "<payload not sampled>"
+            else:
+                text = _repr.repr(self.obj)
+                if len(text) > PAYLOAD_CHARS:
+                    text = text[:PAYLOAD_CHARS] + "...<truncated>"
+            self.text, self.obj = text, None
+        return self.text
+
+    __repr__ = __str__
+
+
+def payload(obj):
+    """Log argument for a request body: rendered (sampled, truncated) only if emitted."""
+    return _Payload(obj)
+
+
+def _snapshot(args):
+    if isinstance(args, tuple):
+        for arg in args:
+            if isinstance(arg, _Payload):
+                str(arg)
+    elif isinstance(args, dict):
+        _snapshot(tuple(args.values()))
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # The stock handler formats the message before enqueueing it; leave that
+    # to the listener thread, except for payloads: the request may still
+    # change (or finish reading) them, so they are rendered here. Only
+    # records that passed the logger and handler levels get this far.
+    # Records never leave the process, so they need not be made picklable.
+    def prepare(self, record):
+        _snapshot(record.args)
+        return record
+
+
+def _route_levels():
+    levels = {}
+    for key, value in os.environ.items():
+        if key.startswith("LOG_LEVEL_"):
+            levels[f"routes.{key[len('LOG_LEVEL_'):].lower()}"] = value.upper()
+    return levels
+
+
+def _start_listener(log_queue, handler):
+    global _listener
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def setup(level=None):
+    """
+    Install the queue handler on the root logger (idempotent). `level`
+    sets the root level instead of LOG_LEVEL; the first call wins.
+    """
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(FORMAT))
+    log_queue = queue.SimpleQueue()
+
+    root = logging.getLogger()
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    root.setLevel(LEVEL if level is None else level)
+    for name, route_level in _route_levels().items():
+        logging.getLogger(name).setLevel(route_level)
+
+    _start_listener(log_queue, handler)
+    # The listener thread does not survive fork (gunicorn --preload)
+    os.register_at_fork(after_in_child=lambda: _start_listener(log_queue, handler))
+    atexit.register(lambda: _listener.stop())
@@ -0,0 +1,180 @@
+"""
+Per-route request metrics, exposed in Prometheus text format at /metrics.
+
+Each request costs two perf_counter() calls, a bisect into the bucket
+bounds and a few integer increments under one lock. Latency is measured
+up to the point the view returns, so for streamed responses it is the time
+to first byte; their response size is added once the stream is drained.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+UNMATCHED = "<unmatched>"
+
+# Reentrant: a streamed response dropped without being closed finishes its
+# byte count from the garbage collector, which may run while this thread
+# already holds the lock.
+_lock = threading.RLock()
+_routes = {}
+_statuses = {}
+_collectors = []
+
+
+class _RouteStats:
+    __slots__ = ("count", "errors", "latency_sum", "buckets", "request_bytes", "response_bytes")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+def _stats_for(route):
+    stats = _routes.get(route)
+    if stats is None:
+        stats = _routes[route] = _RouteStats()
+    return stats
+
+
+def observe(route, status, seconds, request_bytes=0, response_bytes=0):
+    """Record one finished request. Also used by callers outside Flask."""
+    idx = bisect_left(BUCKETS, seconds)
+    key = (route, status)
+    with _lock:
+        stats = _stats_for(route)
+        stats.count += 1
+        if status >= 500:
+            stats.errors += 1
+        stats.latency_sum += seconds
+        stats.buckets[idx] += 1
+        stats.request_bytes += request_bytes
+        stats.response_bytes += response_bytes
+        _statuses[key] = _statuses.get(key, 0) + 1
+
+
+def _add_response_bytes(route, n):
+    with _lock:
+        _stats_for(route).response_bytes += n
+
+
+def _counting(iterable, route):
+    total = 0
+    try:
+        for chunk in iterable:
+            total += len(chunk)
+            yield chunk
+    finally:
+        close = getattr(iterable, "close", None)
+        if close is not None:
+            close()
+        _add_response_bytes(route, total)
+
+
+def _before_request():
+    g._metrics_start = time.perf_counter()
+
+
+def _after_request(response):
+    start = g.pop("_metrics_start", None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+
+    route = request.url_rule.rule if request.url_rule is not None else UNMATCHED
+    # calculate_content_length() would buffer a streamed body; count it as it is sent
+    response_bytes = None if response.is_streamed else response.calculate_content_length()
+    if response_bytes is None:
+        response_bytes = 0
+        response.response = _counting(response.response, route)
+
+    observe(route, response.status_code, elapsed,
+            request.content_length or 0, response_bytes)
+    return response
+
+
+def add_collector(fn):
+    """Register `fn() -> [lines]` whose output is appended to /metrics."""
+    _collectors.append(fn)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render():
+    """Return all metrics in Prometheus text exposition format."""
+    with _lock:
+        routes = [(r, s.count, s.errors, s.latency_sum, list(s.buckets),
+                   s.request_bytes, s.response_bytes) for r, s in _routes.items()]
+        statuses = list(_statuses.items())
+
+    routes.sort()
+    statuses.sort()
+    lines = [
+        "# HELP http_requests_total Requests handled, by route and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (route, status), n in statuses:
+        lines.append(f'http_requests_total{{route="{_label(route)}",status="{status}"}} {n}')
+
+    lines += [
+        "# HELP http_request_errors_total Requests that ended with a 5xx status.",
+        "# TYPE http_request_errors_total counter",
+    ]
+    for route, _, errors, _, _, _, _ in routes:
+        lines.append(f'http_request_errors_total{{route="{_label(route)}"}} {errors}')
+
+    lines += [
+        "# HELP http_request_duration_seconds Time spent in the view, by route.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for route, count, _, latency_sum, buckets, _, _ in routes:
+        label = _label(route)
+        cumulative = 0
+        for bound, n in zip(BUCKETS, buckets):
+            cumulative += n
+            lines.append(f'http_request_duration_seconds_bucket{{route="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'http_request_duration_seconds_bucket{{route="{label}",le="+Inf"}} {count}')
+        lines.append(f'http_request_duration_seconds_sum{{route="{label}"}} {latency_sum}')
+        lines.append(f'http_request_duration_seconds_count{{route="{label}"}} {count}')
+
+    lines += [
+        "# HELP http_request_bytes_total Request body bytes received, by route.",
+        "# TYPE http_request_bytes_total counter",
+    ]
+    for route, _, _, _, _, request_bytes, _ in routes:
+        lines.append(f'http_request_bytes_total{{route="{_label(route)}"}} {request_bytes}')
+
+    lines += [
+        "# HELP http_response_bytes_total Response body bytes sent, by route.",
+        "# TYPE http_response_bytes_total counter",
+    ]
+    for route, _, _, _, _, _, response_bytes in routes:
+        lines.append(f'http_response_bytes_total{{route="{_label(route)}"}} {response_bytes}')
+
+    for collect in _collectors:
+        lines += collect()
+
+    return "\n".join(lines) + "\n"
+
+
+def metrics():
+    return Response(render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule("/metrics", view_func=metrics, methods=["GET"])
@@ -0,0 +1,99 @@
+"""
+Binary NumPy `.npy` wire format for numeric endpoints.
+
+A request sent with `Content-Type: application/x-npy` carries one float
+array, NaN marking a missing value. `load_array()` parses the .npy header
+and returns a read-only view over the request body, so the numbers are
+never converted one by one. A client that lists `application/x-npy`
+ahead of JSON in `Accept` gets its answer back as .npy (see `respond`).
+
+NumPy is optional; without it `available` is False and .npy bodies are
+answered with 415.
+"""
+import io
+import logging
+
+from flask import Response, request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from routes import ingest
+from routes.codec import MIMETYPE as JSON_MIMETYPE, jsonify
+
+try:
+    import numpy as np
+except ImportError:  # optional speedup
+    np = None
+
+logger = logging.getLogger(__name__)
+
+available = np is not None
+
+MIMETYPE = "application/x-npy"
+
+
+class NpyError(ValueError):
+    """The body is not a .npy file holding a float array."""
+
+
+def is_request():
+    """True when the request body is .npy."""
+    return request.mimetype == MIMETYPE
+
+
+def wanted():
+    """True when the client prefers a .npy answer over JSON."""
+    return available and request.accept_mimetypes.best_match([JSON_MIMETYPE, MIMETYPE]) == MIMETYPE
+
+
+def unsupported():
+    return jsonify({"error": f"{MIMETYPE} bodies need NumPy on the server"}), 415
+
+
+def load_array(limit=None):
+    """
+    Float array in the .npy request body, as a read-only view of the body
+    bytes when the data is native float64 in C order (a converted copy
+    otherwise). Raises NpyError on a malformed body.
+    """
+    limit = limit or ingest.limit_for(request.endpoint or "")
+    length = request.content_length
+    if length is not None and length > limit:
+        raise RequestEntityTooLarge()
+    body = request.get_data(cache=False)
+    if len(body) > limit:
+        raise RequestEntityTooLarge()
+
+    fp = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(fp)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fp)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fp)
+    except ValueError as e:
+        raise NpyError(str(e)) from None
+    if dtype.kind != "f":
+        raise NpyError(f"expected a float array, got dtype {dtype}")
+
+    count = 1
+    for dim in shape:
+        count *= dim
+    offset = fp.tell()
+    if len(body) - offset != count * dtype.itemsize:
+        raise NpyError(f"body holds {len(body) - offset} data bytes, header says {count * dtype.itemsize}")
+
+    values = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+    values = values.reshape(shape, order="F" if fortran_order else "C")
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def dumps(values):
+    """Serialize `values` to .npy bytes."""
+    buf = io.BytesIO()
+    np.save(buf, np.asarray(values, dtype=np.float64), allow_pickle=False)
+    return buf.getvalue()
+
+
+def respond(values):
+    """Answer with `values` (an array or nested lists of floats) as .npy."""
+    return Response(dumps(values), mimetype=MIMETYPE)
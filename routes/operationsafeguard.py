@@ -1,8 +1,7 @@
 # routes/operationsafeguard.py
 import logging
 import re
-from flask import request, jsonify
-from routes import app
+from routes.codec import get_json, jsonify
 
 logger = logging.getLogger(__name__)
 
@@ -256,9 +255,8 @@ def final_synthesis(c1: str, c2: str, c3: str) -> str:
 # ----------------------------
 # Endpoint
 # ----------------------------
-@app.route("/operation-safeguard", methods=["POST"])
 def operation_safeguard():
-    data = request.get_json(force=True, silent=False)
+    data = get_json(force=True, silent=False)
 
     # Challenge 1
     c1_in = data.get("challenge_one", {}) or {}
@@ -1,37 +1,190 @@
 # routes/princess_diaries.py
 import logging
+import os
 from heapq import heappush, heappop
-from flask import request, jsonify
-from routes import app
+from routes import executor
+from routes.cache import LRUCache, cached, payload_key
+from routes.codec import get_json, jsonify
+
+try:
+    import numpy as np
+except ImportError:  # optional speedup
+    np = None
 
 logger = logging.getLogger(__name__)
 
-def build_graph(edges, id_of):
-    g = {i: [] for i in id_of.values()}
-    for e in edges:
-        u, v = id_of[e["connection"][0]], id_of[e["connection"][1]]
-        w = e["fee"]
-        g[u].append((v, w))
-        g[v].append((u, w))
-    return g
-
-def dijkstra(graph, src):
-    INF = 10**18
-    dist = {u: INF for u in graph}
-    dist[src] = 0
-    pq = [(0, src)]
-    while pq:
-        d, u = heappop(pq)
-        if d != dist[u]:
-            continue
-        for v, w in graph[u]:
-            nd = d + w
-            if nd < dist[v]:
-                dist[v] = nd
-                heappush(pq, (nd, v))
-    return dist  # dict node -> distance
-
-@app.route('/princess-diaries', methods=['POST'])
+INF = 10**18
+
+# compiled subway networks kept per process
+NETWORK_CACHE_SIZE = int(os.environ.get("PRINCESS_NETWORK_CACHE_SIZE", "32"))
+# networks up to this many stations get all distances at once (NumPy)
+ALL_PAIRS_MAX = int(os.environ.get("PRINCESS_ALL_PAIRS_MAX", "512"))
+# distances kept per compiled network, in row entries (default: all rows
+# of an ALL_PAIRS_MAX network); least recently used rows are dropped first
+ROW_CACHE_CELLS = int(os.environ.get("PRINCESS_ROW_CACHE_CELLS", str(512 * 512)))
+
+class SubwayNetwork:
+    """
+    A subway network compiled once: stations get dense ids and the edges go
+    into CSR arrays (neighbours of u are indices[indptr[u]:indptr[u + 1]]).
+    Distance rows are computed on first use and kept in an LRU of
+    ROW_CACHE_CELLS entries, so requests that send the same subway reuse
+    them while a huge network cannot grow toward n^2 entries. Networks of at most ALL_PAIRS_MAX stations
+    with non-negative integer fees get every row at once from a vectorized
+    Floyd-Warshall when NumPy is installed.
+    """
+
+    def __init__(self, edges):
+        stations = set()
+        for e in edges:
+            stations.add(e["connection"][0]); stations.add(e["connection"][1])
+        self.stations = sorted(stations)
+        self.id_of = {s: i for i, s in enumerate(self.stations)}
+        n = len(self.stations)
+
+        degree = [0] * (n + 1)
+        arcs = []
+        for e in edges:
+            u, v = self.id_of[e["connection"][0]], self.id_of[e["connection"][1]]
+            w = e["fee"]
+            arcs.append((u, v, w)); arcs.append((v, u, w))
+            degree[u + 1] += 1; degree[v + 1] += 1
+        self.indptr = degree
+        for i in range(n):
+            self.indptr[i + 1] += self.indptr[i]
+        fill = self.indptr[:n]
+        self.indices = [0] * len(arcs)
+        self.weights = [0] * len(arcs)
+        for u, v, w in arcs:
+            k = fill[u]
+            self.indices[k] = v
+            self.weights[k] = w
+            fill[u] = k + 1
+
+        # integer fees, and a bound on any finite distance (a shortest path
+        # uses each edge at most once)
+        self.integral = all(type(w) is int for w in self.weights)
+        self.max_fee = sum(abs(e["fee"]) for e in edges)
+
+        self.rows = LRUCache(max(1, ROW_CACHE_CELLS // max(n, 1)))
+        if (np is not None and 0 < n <= ALL_PAIRS_MAX and self.integral
+                and all(w >= 0 for w in self.weights) and self.max_fee < INF):
+            self._all_pairs()
+
+    def __len__(self):
+        return len(self.stations)
+
+    def _all_pairs(self):
+        n = len(self.stations)
+        dist = np.full((n, n), INF, dtype=np.int64)
+        for u in range(n):
+            for k in range(self.indptr[u], self.indptr[u + 1]):
+                v = self.indices[k]
+                dist[u, v] = min(dist[u, v], self.weights[k])
+        np.fill_diagonal(dist, 0)
+        for k in range(n):
+            np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+        np.minimum(dist, INF, out=dist)
+        for u, row in enumerate(dist.tolist()):
+            self.rows.set(u, row)
+
+    def _dijkstra(self, src):
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        dist = [INF] * len(self.stations)
+        dist[src] = 0
+        pq = [(0, src)]
+        while pq:
+            d, u = heappop(pq)
+            if d != dist[u]:
+                continue
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nd = d + weights[k]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    heappush(pq, (nd, v))
+        return dist
+
+    def row(self, u):
+        """Fees from station id u to every station id (INF if unreachable)."""
+        row = self.rows.get(u)
+        if row is None:
+            row = self._dijkstra(u)
+            self.rows.set(u, row)
+        return row
+
+_networks = LRUCache(NETWORK_CACHE_SIZE)
+
+def compile_network(subway):
+    """SubwayNetwork for `subway`, shared by requests sending the same edges."""
+    key = payload_key("subway", subway)
+    network = _networks.get(key)
+    if network is None:
+        network = SubwayNetwork(subway)
+        _networks.set(key, network)
+    return network
+
+def _better(score, fee, task, best_score, best_fee, best_task):
+    """Higher score, then lower fee, then the earlier task (-1 = none yet)."""
+    return (score > best_score or (score == best_score and (fee < best_fee
+            or (fee == best_fee and best_task != -1 and task < best_task))))
+
+class StationFrontier:
+    """
+    Best finished task (score, fee, task) per station. `best_into(b)` scans
+    the stations, adding the fee from each one to b.
+    """
+
+    def __init__(self, fee_from):
+        self.fee_from = fee_from
+        self.best = {}  # station -> (score, fee, task)
+
+    def add(self, a, score, fee, task):
+        cur = self.best.get(a)
+        if cur is None or _better(score, fee, task, *cur):
+            self.best[a] = (score, fee, task)
+
+    def best_into(self, b):
+        best_score, best_fee, best_task = -10**9, 10**18, -1
+        for a, (score, fee, task) in self.best.items():
+            move_fee = self.fee_from[a][b]
+            if move_fee == INF:
+                continue
+            if _better(score, fee + move_fee, task, best_score, best_fee, best_task):
+                best_score, best_fee, best_task = score, fee + move_fee, task
+        return best_score, best_fee, best_task
+
+class ArrayFrontier(StationFrontier):
+    """
+    StationFrontier that also keeps, in int64 columns, the best chain into
+    every station; each improvement is one vector update and `best_into`
+    is a lookup. Needs NumPy and integer scores/fees that fit in int64.
+    """
+
+    def __init__(self, fee_from, rows, n_ids):
+        super().__init__(fee_from)
+        self.rows = rows  # station -> fee_from[station] as an int64 array
+        self.score = np.full(n_ids, -10**9, dtype=np.int64)
+        self.fee = np.full(n_ids, 10**18, dtype=np.int64)
+        self.task = np.full(n_ids, -1, dtype=np.int64)
+
+    def add(self, a, score, fee, task):
+        cur = self.best.get(a)
+        if cur is not None and not _better(score, fee, task, *cur):
+            return  # its chains are no better than the station's best
+        self.best[a] = (score, fee, task)
+        row = self.rows[a]
+        cand_fee = fee + row
+        better = (row < INF) & ((score > self.score) | ((score == self.score) & (
+            (cand_fee < self.fee) | ((cand_fee == self.fee) & (task < self.task)))))
+        self.score[better] = score
+        self.fee[better] = cand_fee[better]
+        self.task[better] = task
+
+    def best_into(self, b):
+        return int(self.score[b]), int(self.fee[b]), int(self.task[b])
+
+@cached
 def princess_diaries():
     """
     Input JSON:
@@ -42,8 +195,12 @@ def princess_diaries():
     }
     Output JSON:
     { "max_score": int, "min_fee": int, "schedule": [names...] }
+
+    With "starting_stations": [int, ...] instead of "starting_station",
+    answers { "results": [{"starting_station": int, "max_score": ..., ...}, ...] }
+    in the same order, sharing one precompute across all origins.
     """
-    data = request.get_json(silent=True)
+    data = get_json(silent=True)
     if not isinstance(data, dict):
         return jsonify({"error": "JSON object required"}), 400
 
@@ -54,104 +211,247 @@ def princess_diaries():
     if not isinstance(tasks, list) or not isinstance(subway, list):
         return jsonify({"error": "tasks and subway must be lists"}), 400
 
+    if "starting_stations" in data:
+        return _princess_diaries_many(tasks, subway, data["starting_stations"])
+
     if not tasks:
         return jsonify({"max_score": 0, "min_fee": 0, "schedule": []})
 
-    # ---- Compact station IDs only for used stations ----
-    stations = {starting_station}
-    for t in tasks:
-        stations.add(t["station"])
-    for e in subway:
-        stations.add(e["connection"][0]); stations.add(e["connection"][1])
-
-    id_of = {s: i for i, s in enumerate(sorted(stations))}
-    rid_of = {i: s for s, i in id_of.items()}  # (only needed for debugging)
-
-    # Map tasks to compact ids
-    T = []
-    for t in tasks:
-        T.append({
-            "name": t["name"],
-            "start": int(t["start"]),
-            "end": int(t["end"]),
-            "station": id_of[t["station"]],
-            "score": int(t["score"])
-        })
-    T.sort(key=lambda x: x["start"])  # chronological
-
-    start_id = id_of[starting_station]
-
-    # ---- Build graph & run Dijkstra from only necessary sources ----
-    graph = build_graph(subway, id_of)
-
-    # Run Dijkstra from every station that’s an endpoint we need
-    # We’ll need distances:
-    # - start -> each task.station
-    # - task_i.station -> task_j.station (for j>i and time-feasible)
-    unique_sources = {start_id} | {t["station"] for t in T}
-    dist_from = {}
-    for s in unique_sources:
-        dist_from[s] = dijkstra(graph, s)
-
-    # Helper to get distance with INF fallback
-    INF = 10**18
-    def fee(a, b):
-        return dist_from[a].get(b, INF)
-
-    # ---- DP over tasks: maximize score, tie-break by min fee ----
-    n = len(T)
-    dp_score = [-10**9] * n
-    dp_fee   = [10**18] * n
-    parent   = [-1] * n
-
-    for i in range(n):
-        # option: start -> task i -> back to start later
-        base_fee = fee(start_id, T[i]["station"])
-        if base_fee < INF:
-            dp_score[i] = T[i]["score"]
-            dp_fee[i]   = base_fee
-
-        # try chaining from a previous task j
-        for j in range(i):
-            if T[j]["end"] <= T[i]["start"]:
-                # can move from j to i
-                move_fee = fee(T[j]["station"], T[i]["station"])
-                if move_fee == INF or dp_score[j] < 0:
+    try:
+        result = executor.run(solve, tasks, subway, starting_station,
+                              deadline=executor.deadline_for("princess_diaries"))
+    except executor.SolverTimeout as e:
+        return executor.timeout_response(e)
+    return jsonify(result)
+
+class TaskPlan:
+    """
+    Everything about a task list and subway that does not depend on the
+    starting station: task columns in start order, distance rows from the
+    task stations and `origins`, and which finished tasks join the frontier
+    before each task. `best_from` then runs the DP for one origin.
+    """
+
+    def __init__(self, tasks, subway, origins):
+        # ---- Compiled subway network; stations off the network get extra ids ----
+        network = compile_network(subway)
+        id_of = dict(network.id_of)
+        extra = set(origins)
+        for t in tasks:
+            extra.add(t["station"])
+        for st in sorted(extra - id_of.keys()):
+            id_of[st] = len(id_of)
+        self.id_of = id_of
+
+        # Map tasks to compact ids, as columns in chronological order
+        order = sorted(range(len(tasks)), key=lambda k: int(tasks[k]["start"]))
+        self.names = [tasks[k]["name"] for k in order]
+        starts = [int(tasks[k]["start"]) for k in order]
+        ends = [int(tasks[k]["end"]) for k in order]
+        self.stations_of = [id_of[tasks[k]["station"]] for k in order]
+        self.scores = [int(tasks[k]["score"]) for k in order]
+
+        # ---- Distance rows from every station a task or an origin is at ----
+        self.n_ids = n_ids = len(id_of)
+        n_net = len(network)
+        tail = [INF] * (n_ids - n_net)
+        self.fee_from = {}
+        for u in {id_of[o] for o in origins} | set(self.stations_of):
+            if u < n_net:
+                self.fee_from[u] = network.row(u) + tail
+            else:
+                self.fee_from[u] = [INF] * n_ids
+                self.fee_from[u][u] = 0
+
+        # Task i may chain from any earlier task j (in start order) with
+        # end_j <= start_i. Those j only ever join that set, so finished
+        # tasks wait in a heap by end time; released[i] lists the ones that
+        # leave it just before task i.
+        n = len(self.names)
+        self.released = []
+        finished = []
+        for i in range(n):
+            batch = []
+            while finished and finished[0][0] <= starts[i]:
+                batch.append(heappop(finished)[1])
+            self.released.append(batch)
+            heappush(finished, (ends[i], i))
+
+        self.rows = None
+        if (np is not None and network.integral
+                and sum(map(abs, self.scores)) < 2**62 and network.max_fee * (n + 1) < 2**62):
+            self.rows = {a: np.array(self.fee_from[a], dtype=np.int64) for a in set(self.stations_of)}
+
+    def best_from(self, starting_station):
+        """Best schedule starting and ending at `starting_station`; the response dict."""
+        start_id = self.id_of[starting_station]
+        names, stations_of, scores, fee_from = self.names, self.stations_of, self.scores, self.fee_from
+
+        # ---- DP over tasks: maximize score, tie-break by min fee ----
+        # Released tasks go into a frontier that keeps the best (score, fee)
+        # per station; ties go to the earliest task, exactly as a scan over
+        # j in order would pick.
+        n = len(names)
+        dp_score = [-10**9] * n
+        dp_fee   = [10**18] * n
+        parent   = [-1] * n
+
+        if self.rows is not None:
+            frontier = ArrayFrontier(fee_from, self.rows, self.n_ids)
+        else:
+            frontier = StationFrontier(fee_from)
+
+        start_fees = fee_from[start_id]
+        for i in range(n):
+            for j in self.released[i]:
+                if dp_score[j] >= 0:
+                    frontier.add(stations_of[j], dp_score[j], dp_fee[j], j)
+
+            # try chaining from the best finished task into this station
+            b = stations_of[i]
+            chain = frontier.best_into(b)
+
+            # option: start -> task i -> back to start later (wins ties)
+            if start_fees[b] < INF:
+                dp_score[i], dp_fee[i] = scores[i], start_fees[b]
+            if chain[2] != -1 and _better(chain[0] + scores[i], chain[1], chain[2], dp_score[i], dp_fee[i], -1):
+                dp_score[i], dp_fee[i], parent[i] = chain[0] + scores[i], chain[1], chain[2]
+
+        # pick best end task (include return-to-start fee)
+        best_i, best_score, best_total_fee = -1, -10**9, 10**18
+        for i in range(n):
+            if dp_score[i] < 0:
+                continue
+            ret_fee = fee_from[stations_of[i]][start_id]
+            if ret_fee == INF:
+                continue
+            total_fee = dp_fee[i] + ret_fee
+            if (dp_score[i] > best_score) or (dp_score[i] == best_score and total_fee < best_total_fee):
+                best_i, best_score, best_total_fee = i, dp_score[i], total_fee
+
+        if best_i == -1:
+            # no feasible path (disconnected)
+            return {"max_score": 0, "min_fee": 0, "schedule": []}
+
+        # reconstruct schedule
+        schedule = []
+        i = best_i
+        while i != -1:
+            schedule.append(names[i])
+            i = parent[i]
+        schedule.reverse()
+
+        return {
+            "max_score": int(best_score),
+            "min_fee": int(best_total_fee),
+            "schedule": schedule
+        }
+
+    def best_from_all(self, starting_stations):
+        """best_from() for every station in `starting_stations`, in order."""
+        if self.rows is None or len(starting_stations) < 2:
+            return [self.best_from(st) for st in starting_stations]
+
+        # The same DP as best_from, with one row per origin: every frontier
+        # update and choice below is done for all origins at once.
+        origins = np.array([self.id_of[st] for st in starting_stations])
+        n_orig, n, n_ids = len(origins), len(self.names), self.n_ids
+        stations = np.array(self.stations_of)
+        task_stations = sorted(set(self.stations_of))
+        fees = np.stack([self.rows[a] for a in task_stations])  # task station -> any station
+        slot = np.searchsorted(task_stations, stations)
+        out_fees = np.stack([np.array(self.fee_from[o], dtype=np.int64)[stations] for o in origins])
+        back_fees = fees[slot][:, origins].T
+        scores = np.array(self.scores, dtype=np.int64)
+
+        dp_score = np.full((n_orig, n), -10**9, dtype=np.int64)
+        dp_fee = np.full((n_orig, n), 10**18, dtype=np.int64)
+        parent = np.full((n_orig, n), -1, dtype=np.int64)
+        # best finished task per (origin, station), and best chain into it
+        at_score = np.full((n_orig, n_ids), -10**9, dtype=np.int64)
+        at_fee = np.full((n_orig, n_ids), 10**18, dtype=np.int64)
+        at_task = np.full((n_orig, n_ids), -1, dtype=np.int64)
+        into_score = at_score.copy()
+        into_fee = at_fee.copy()
+        into_task = at_task.copy()
+
+        for i in range(n):
+            for j in self.released[i]:
+                a = self.stations_of[j]
+                score, fee = dp_score[:, j], dp_fee[:, j]
+                improves = (score >= 0) & ((score > at_score[:, a]) | ((score == at_score[:, a]) & (
+                    (fee < at_fee[:, a]) | ((fee == at_fee[:, a]) & (at_task[:, a] != -1) & (j < at_task[:, a])))))
+                if not improves.any():
                     continue
-                cand_score = dp_score[j] + T[i]["score"]
-                cand_fee   = dp_fee[j] + move_fee
-
-                if (cand_score > dp_score[i]) or (cand_score == dp_score[i] and cand_fee < dp_fee[i]):
-                    dp_score[i] = cand_score
-                    dp_fee[i]   = cand_fee
-                    parent[i]   = j
-
-    # pick best end task (include return-to-start fee)
-    best_i, best_score, best_total_fee = -1, -10**9, 10**18
-    for i in range(n):
-        if dp_score[i] < 0:
-            continue
-        ret_fee = fee(T[i]["station"], start_id)
-        if ret_fee == INF:
-            continue
-        total_fee = dp_fee[i] + ret_fee
-        if (dp_score[i] > best_score) or (dp_score[i] == best_score and total_fee < best_total_fee):
-            best_i, best_score, best_total_fee = i, dp_score[i], total_fee
-
-    if best_i == -1:
-        # no feasible path (disconnected)
-        return jsonify({"max_score": 0, "min_fee": 0, "schedule": []})
+                o = np.flatnonzero(improves)
+                at_score[o, a], at_fee[o, a], at_task[o, a] = score[o], fee[o], j
+                row = self.rows[a]
+                score, cand_fee = score[o, None], fee[o, None] + row
+                cur_score, cur_fee, cur_task = into_score[o], into_fee[o], into_task[o]
+                better = (row < INF) & ((score > cur_score) | ((score == cur_score) & (
+                    (cand_fee < cur_fee) | ((cand_fee == cur_fee) & (j < cur_task)))))
+                into_score[o] = np.where(better, score, cur_score)
+                into_fee[o] = np.where(better, cand_fee, cur_fee)
+                into_task[o] = np.where(better, j, cur_task)
+
+            b = self.stations_of[i]
+            reachable = out_fees[:, i] < INF
+            base_score = np.where(reachable, scores[i], -10**9)
+            base_fee = np.where(reachable, out_fees[:, i], 10**18)
+            chain_score = into_score[:, b] + scores[i]
+            chain_fee = into_fee[:, b]
+            take = (into_task[:, b] != -1) & ((chain_score > base_score) | (
+                (chain_score == base_score) & (chain_fee < base_fee)))
+            dp_score[:, i] = np.where(take, chain_score, base_score)
+            dp_fee[:, i] = np.where(take, chain_fee, base_fee)
+            parent[:, i] = np.where(take, into_task[:, b], -1)
+
+        # pick best end task per origin: highest score, then lowest total fee, then first
+        valid = (dp_score >= 0) & (back_fees < INF)
+        total = dp_fee + back_fees
+        best_score = np.where(valid, dp_score, -1).max(axis=1)
+        tied = valid & (dp_score == best_score[:, None])
+        best_total = np.where(tied, total, INF).min(axis=1)
+        best_i = (tied & (total == best_total[:, None])).argmax(axis=1)
+
+        results = []
+        for o in range(n_orig):
+            if best_score[o] < 0:
+                results.append({"max_score": 0, "min_fee": 0, "schedule": []})
+                continue
+            schedule = []
+            i = int(best_i[o])
+            while i != -1:
+                schedule.append(self.names[i])
+                i = int(parent[o, i])
+            schedule.reverse()
+            results.append({
+                "max_score": int(best_score[o]),
+                "min_fee": int(best_total[o]),
+                "schedule": schedule
+            })
+        return results
+
+def _princess_diaries_many(tasks, subway, starting_stations):
+    if (not isinstance(starting_stations, list)
+            or not all(isinstance(st, (int, str)) for st in starting_stations)):
+        return jsonify({"error": "starting_stations must be a list of stations"}), 400
+
+    if not tasks or not starting_stations:
+        results = [{"max_score": 0, "min_fee": 0, "schedule": []} for _ in starting_stations]
+    else:
+        try:
+            results = executor.run(solve_many, tasks, subway, starting_stations,
+                                   deadline=executor.deadline_for("princess_diaries"))
+        except executor.SolverTimeout as e:
+            return executor.timeout_response(e)
+    return jsonify({"results": [{"starting_station": st, **result}
+                                for st, result in zip(starting_stations, results)]})
+
+def solve(tasks, subway, starting_station):
+    """Best schedule for a non-empty task list; returns the response dict."""
+    return TaskPlan(tasks, subway, [starting_station]).best_from(starting_station)
 
-    # reconstruct schedule
-    schedule = []
-    i = best_i
-    while i != -1:
-        schedule.append(T[i]["name"])
-        i = parent[i]
-    schedule.reverse()
-
-    return jsonify({
-        "max_score": int(best_score),
-        "min_fee": int(best_total_fee),
-        "schedule": schedule
-    })
+def solve_many(tasks, subway, starting_stations):
+    """solve() for each starting station, sharing everything origin-independent."""
+    return TaskPlan(tasks, subway, starting_stations).best_from_all(starting_stations)
@@ -0,0 +1,94 @@
+"""
+In-process store behind the stateful endpoints (Ink Archive markets, spy
+networks, sailing club calendars).
+
+A Registry hands out uuid ids, keeps each entry's state in an LRUCache
+whose TTL restarts on every update, answers 404 for unknown ids and
+DELETE for the resource, and serializes the reads and updates of one
+entry with its own lock. A route module only parses its payloads, changes
+its state and describes it:
+
+    networks = Registry("network", "networkId", MAX_NETWORKS, NETWORK_TTL)
+
+    def create_network():  ... return networks.create(DynamicNetwork(edges), _describe)
+    def network(network_id):    return networks.show(network_id, _describe)  # GET / DELETE
+    def update(network_id):     return networks.update(network_id, apply)
+
+`apply(state)` runs under the entry's lock and returns the answer body.
+It rejects a request by raising ValueError (answered with 400), and must
+do so before it changes anything, so a bad request leaves the entry as
+it was.
+
+Entries live in process memory, so either run one worker or pin each id
+to one worker.
+"""
+import logging
+import threading
+import uuid
+
+from flask import request
+
+from routes.cache import LRUCache
+from routes.codec import jsonify
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    """One stored state and the lock serializing its reads and updates."""
+
+    def __init__(self, state):
+        self.state = state
+        self.lock = threading.Lock()
+
+
+class Registry:
+    """Stored states of one kind, answered as {id_field: id, **body}."""
+
+    def __init__(self, kind, id_field, maxsize, ttl):
+        self.kind = kind
+        self.id_field = id_field
+        self._entries = LRUCache(maxsize, ttl)
+
+    def _answer(self, entry_id, body):
+        return jsonify({self.id_field: entry_id, **body})
+
+    def _unknown(self, entry_id):
+        return jsonify({"error": f"Unknown {self.kind} {entry_id}"}), 404
+
+    def create(self, state, describe, summary=""):
+        """Store `state` under a new id and answer with describe(state)."""
+        entry = _Entry(state)
+        entry_id = uuid.uuid4().hex
+        self._entries.set(entry_id, entry)
+        logger.info("Created %s %s %s", self.kind, entry_id, summary)
+        with entry.lock:
+            return self._answer(entry_id, describe(state))
+
+    def show(self, entry_id, describe):
+        """GET: describe(state); DELETE: drop the entry."""
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            return self._unknown(entry_id)
+        if request.method == "DELETE":
+            self._entries.pop(entry_id)
+            return self._answer(entry_id, {"deleted": True})
+        with entry.lock:
+            try:
+                body = describe(entry.state)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            return self._answer(entry_id, body)
+
+    def update(self, entry_id, apply):
+        """Run apply(state) under the entry's lock and restart its TTL."""
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            return self._unknown(entry_id)
+        with entry.lock:
+            try:
+                body = apply(entry.state)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            self._entries.set(entry_id, entry)
+            return self._answer(entry_id, body)
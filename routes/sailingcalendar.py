@@ -0,0 +1,118 @@
+"""
+Live sailing club calendars: keep the bookings between requests, add and
+cancel them one at a time, and read the merged slots and boats needed
+without replaying the whole history.
+
+POST   /sailing-club/calendars                            {"bookings": [[start, end], ...]}
+POST   /sailing-club/calendars/<calendar_id>/bookings     {"add": [[start, end], ...], "cancel": [bookingId, ...]}
+GET    /sailing-club/calendars/<calendar_id>?start=&end=
+DELETE /sailing-club/calendars/<calendar_id>
+
+The POSTs answer {"calendarId", "bookingIds" (of the bookings just added),
+"minBoatsNeeded"}; the GET answers {"calendarId", "busySlots",
+"freeSlots", "minBoatsNeeded"} with the slots limited to the optional
+[start, end) window. Calendars are a sailingclub.BookingIndex, so each
+booking costs O(log span of hours) instead of a re-sort. Storage, ids and
+expiry are routes.registry's.
+
+SAILING_CALENDARS_MAX   calendars kept per process, least recently used dropped first (default 256)
+SAILING_CALENDAR_TTL    seconds a calendar lives after its last update (default 3600, 0 = forever)
+"""
+import logging
+import os
+
+from flask import request
+
+from routes.codec import get_json, jsonify
+from routes.registry import Registry
+from routes.sailingclub import BookingIndex
+
+logger = logging.getLogger(__name__)
+
+MAX_CALENDARS = int(os.environ.get("SAILING_CALENDARS_MAX", "256"))
+CALENDAR_TTL = float(os.environ.get("SAILING_CALENDAR_TTL", "3600"))
+
+
+_calendars = Registry("calendar", "calendarId", MAX_CALENDARS, CALENDAR_TTL)
+
+
+def _parse_bookings(items, field):
+    """[(start, end), ...] from [[start, end], ...]; raises ValueError."""
+    if not isinstance(items, list):
+        raise ValueError(f"'{field}' must be a list")
+    bookings = []
+    for it in items:
+        if not (isinstance(it, list) and len(it) == 2 and all(isinstance(x, (int, float)) for x in it)):
+            raise ValueError(f"each '{field}' booking must be [start, end], got {it!r}")
+        try:
+            start, end = int(it[0]), int(it[1])
+        except (OverflowError, ValueError):
+            raise ValueError(f"booking {it!r} is not a pair of finite numbers") from None
+        if not (-BookingIndex.LIMIT < start < end < BookingIndex.LIMIT):
+            raise ValueError(f"booking [{start}, {end}] must have start < end within +-2^62")
+        bookings.append((start, end))
+    return bookings
+
+
+def _boats(index, added):
+    return {"bookingIds": added, "minBoatsNeeded": index.min_boats()}
+
+
+def create_calendar():
+    data = get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected JSON with list 'bookings'"}), 400
+    try:
+        bookings = _parse_bookings(data.get("bookings", []), "bookings")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    index = BookingIndex()
+    added = [index.insert(start, end) for start, end in bookings]
+    return _calendars.create(index, lambda index: _boats(index, added), f"with {len(bookings)} bookings")
+
+
+def _describe_window(index):
+    """Busy and free slots in the ?start=&end= window; raises ValueError."""
+    window = []
+    for name in ("start", "end"):
+        value = request.args.get(name)
+        try:
+            window.append(None if value is None else int(value))
+        except ValueError:
+            raise ValueError(f"'{name}' must be an integer") from None
+    start, end = window
+    if start is not None and end is not None and end < start:
+        raise ValueError("'end' must not be before 'start'")
+    return {
+        "busySlots": index.busy(start, end),
+        "freeSlots": index.free(start, end),
+        "minBoatsNeeded": index.min_boats(),
+    }
+
+
+def calendar(calendar_id):
+    return _calendars.show(calendar_id, _describe_window)
+
+
+def _apply_bookings(index):
+    data = get_json(silent=True)
+    if not isinstance(data, dict):
+        raise ValueError("Expected JSON with lists 'add' and/or 'cancel'")
+    added = _parse_bookings(data.get("add", []), "add")
+    cancelled = data.get("cancel", [])
+    if not isinstance(cancelled, list) or not all(isinstance(b, int) and not isinstance(b, bool) for b in cancelled):
+        raise ValueError("'cancel' must be a list of booking ids")
+    unknown = [b for b in cancelled if b not in index.bookings]
+    if unknown:
+        raise ValueError(f"Unknown booking ids: {unknown}")
+    if len(set(cancelled)) != len(cancelled):
+        raise ValueError("Booking ids in 'cancel' must be unique")
+
+    for bid in cancelled:
+        index.cancel(bid)
+    return _boats(index, [index.insert(start, end) for start, end in added])
+
+
+def update_bookings(calendar_id):
+    return _calendars.update(calendar_id, _apply_bookings)
@@ -1,9 +1,18 @@
 import logging
-from flask import request, jsonify
-from routes import app
+import os
+from werkzeug.exceptions import RequestEntityTooLarge
+from routes import ingest, intervals
+from routes.cache import cached
+from routes.codec import jsonify
 
 logger = logging.getLogger(__name__)
 
+# "numpy" (batched sweeps over many cases, default when NumPy is installed)
+# or "python" (merge_slots / min_boats per case)
+ENGINE = os.environ.get("SAILING_CLUB_ENGINE", "numpy" if intervals.available else "python")
+# test cases parsed before a batch is solved
+BATCH_CASES = int(os.environ.get("SAILING_CLUB_BATCH_CASES", "512"))
+
 def merge_slots(bookings):
     if not bookings:
         return []
@@ -35,15 +44,196 @@ def min_boats(bookings):
             j += 1
     return peak  # Max overlap = min boats. 
 
-@app.route("/sailing-club/submission", methods=["POST"], strict_slashes=False)
+def parse_bookings(raw):
+    """Valid [start, end] bookings of one case's input (reference)."""
+    bookings = []
+    for it in raw if isinstance(raw, list) else []:
+        if isinstance(it, (list, tuple)) and len(it) == 2 and all(isinstance(x, (int, float)) for x in it):
+            s, e = int(it[0]), int(it[1])
+            if e > s:  # duration >= 1hr; max 48hrs constraint comes from input, we just trust data. 
+                bookings.append([s, e])
+    return bookings
+
+def solve_batch(raws):
+    """[(merged slots, min boats), ...] for a list of case inputs."""
+    if ENGINE != "numpy" or not intervals.available:
+        answers = []
+        for raw in raws:
+            bookings = parse_bookings(raw)
+            answers.append((merge_slots(bookings), min_boats(bookings)))
+        return answers
+
+    answers = [None] * len(raws)
+    packed, slots = [], []
+    for i, raw in enumerate(raws):
+        arr = intervals.to_array(raw)
+        if arr is None:
+            # mixed or odd items: the reference filter decides what is kept
+            bookings = parse_bookings(raw)
+            answers[i] = (merge_slots(bookings), min_boats(bookings))
+        else:
+            packed.append(arr)
+            slots.append(i)
+    for i, answer in zip(slots, intervals.solve_cases(packed)):
+        answers[i] = answer
+    return answers
+
+class BookingIndex:
+    """
+    Live set of bookings with the number of boats in use at every hour.
+
+    Counts live in a sparse segment tree over [lo, lo + size) with a range
+    add and the min/max count per node (adds stay on their node and are
+    never pushed down). The range doubles toward a booking that falls
+    outside it, so the depth is log2 of the span of hours in use:
+
+    - add / cancel / min_boats: O(log span)
+    - busy / free over a window: O((k + 1) log span) for k slots
+
+    Busy slots are the maximal runs of hours with a boat out, so touching
+    bookings merge like in merge_slots.
+    """
+
+    LIMIT = 1 << 62  # bookings must fit in (-LIMIT, LIMIT)
+
+    def __init__(self):
+        self.bookings = {}  # booking id -> (start, end)
+        self._next_id = 0
+        self.lo = None
+        self.size = 1
+        self.left, self.right = [], []
+        self.add, self.mx, self.mn = [], [], []
+        self.root = self._new()
+
+    def _new(self):
+        self.left.append(-1); self.right.append(-1)
+        self.add.append(0); self.mx.append(0); self.mn.append(0)
+        return len(self.add) - 1
+
+    def _grow(self, start, end):
+        if self.lo is None:
+            self.lo = start
+        while start < self.lo or end > self.lo + self.size:
+            root = self._new()
+            if start < self.lo:
+                self.right[root] = self.root
+                self.lo -= self.size
+            else:
+                self.left[root] = self.root
+            self.size *= 2
+            self.mx[root] = max(self.mx[self.root], 0)
+            self.mn[root] = min(self.mn[self.root], 0)
+            self.root = root
+
+    def _update(self, node, lo, size, a, b, d):
+        if a <= lo and lo + size <= b:
+            self.add[node] += d; self.mx[node] += d; self.mn[node] += d
+            return
+        half = size >> 1
+        mid = lo + half
+        if a < mid:
+            if self.left[node] < 0:
+                self.left[node] = self._new()
+            self._update(self.left[node], lo, half, a, b, d)
+        if b > mid:
+            if self.right[node] < 0:
+                self.right[node] = self._new()
+            self._update(self.right[node], mid, half, a, b, d)
+        lc, rc = self.left[node], self.right[node]
+        self.mx[node] = self.add[node] + max(self.mx[lc] if lc >= 0 else 0, self.mx[rc] if rc >= 0 else 0)
+        self.mn[node] = self.add[node] + min(self.mn[lc] if lc >= 0 else 0, self.mn[rc] if rc >= 0 else 0)
+
+    def insert(self, start, end):
+        """Add a booking of hours [start, end); returns its id."""
+        if not (-self.LIMIT < start < end < self.LIMIT):
+            raise ValueError(f"booking [{start}, {end}] must have start < end within +-2^62")
+        self._grow(start, end)
+        self._update(self.root, self.lo, self.size, start, end, 1)
+        bid = self._next_id
+        self._next_id += 1
+        self.bookings[bid] = (start, end)
+        return bid
+
+    def cancel(self, bid):
+        """Remove a booking by id; raises KeyError if there is none."""
+        start, end = self.bookings.pop(bid)
+        self._update(self.root, self.lo, self.size, start, end, -1)
+
+    def min_boats(self):
+        return self.mx[self.root]
+
+    def _busy(self, node, lo, size, acc, a, b, out):
+        a, b = max(a, lo), min(b, lo + size)
+        if a >= b:
+            return
+        # acc: adds of the ancestors; a missing node adds nothing more
+        if node < 0 or acc + self.mn[node] > 0:
+            if node >= 0 or acc > 0:
+                if out and out[-1][1] == a:
+                    out[-1][1] = b
+                else:
+                    out.append([a, b])
+            return
+        if acc + self.mx[node] <= 0:
+            return
+        acc += self.add[node]
+        half = size >> 1
+        self._busy(self.left[node], lo, half, acc, a, b, out)
+        self._busy(self.right[node], lo + half, half, acc, a, b, out)
+
+    def busy(self, start=None, end=None):
+        """Merged busy slots [[start, end], ...] within [start, end) (default: all)."""
+        if self.lo is None:
+            return []
+        out = []
+        lo = self.lo if start is None else start
+        hi = self.lo + self.size if end is None else end
+        self._busy(self.root, self.lo, self.size, 0, lo, hi, out)
+        return out
+
+    def free(self, start=None, end=None):
+        """
+        Gaps [[start, end], ...] with no boat out within [start, end)
+        (default: between the first and the last busy hour).
+        """
+        busy = self.busy(start, end)
+        if start is None:
+            start = busy[0][0] if busy else 0
+        if end is None:
+            end = busy[-1][1] if busy else start
+        gaps = []
+        at = start
+        for a, b in busy:
+            if a > at:
+                gaps.append([at, a])
+            at = b
+        if end > at:
+            gaps.append([at, end])
+        return gaps
+
+@cached
 def sailing_club_submission():
     try:
-        data = request.get_json(force=True, silent=False)
-        if not isinstance(data, dict) or "testCases" not in data or not isinstance(data["testCases"], list):
+        data = ingest.load("testCases", force=True)
+        if not isinstance(data, dict) or "testCases" not in data or not ingest.is_array(data["testCases"]):
             return jsonify({"error": "Body must be {\"testCases\": [...] }"}), 400
 
         solutions = []
+        n_cases = 0
+        batch = []  # (position in solutions, id, raw input)
+
+        def flush():
+            answers = solve_batch([raw for _, _, raw in batch])
+            for (pos, cid, _), (merged, boats) in zip(batch, answers):
+                solutions[pos] = {
+                    "id": str(cid),
+                    "sortedMergedSlots": merged,
+                    "minBoatsNeeded": boats
+                }
+            batch.clear()
+
         for case in data["testCases"]:
+            n_cases += 1
             # Robust per-case parsing so one bad case doesn't drop others
             cid = case.get("id") if isinstance(case, dict) else None
             raw = case.get("input", []) if isinstance(case, dict) else []
@@ -52,40 +242,21 @@ def sailing_club_submission():
                 solutions.append({"id": None, "sortedMergedSlots": [], "minBoatsNeeded": 0})
                 continue
 
-            # Normalize & validate intervals
-            bookings = []
-            for it in raw if isinstance(raw, list) else []:
-                if isinstance(it, (list, tuple)) and len(it) == 2 and all(isinstance(x, (int, float)) for x in it):
-                    s, e = int(it[0]), int(it[1])
-                    if e > s:  # duration >= 1hr; max 48hrs constraint comes from input, we just trust data. 
-                        bookings.append([s, e])
-
-            merged = merge_slots(bookings)
-            boats  = min_boats(bookings)
-
-            solutions.append({
-                "id": str(cid),
-                "sortedMergedSlots": merged,
-                "minBoatsNeeded": boats
-            })
+            solutions.append(None)
+            batch.append((len(solutions) - 1, cid, raw))
+            if len(batch) >= BATCH_CASES:
+                flush()
+        flush()
 
         # Sanity: number of solutions must match number of test cases
         # (helps avoid “missing or incomplete solutions”)
-        if len(solutions) != len(data["testCases"]):
+        if len(solutions) != n_cases:
             return jsonify({"error": "internal: solution count mismatch"}), 500
 
         return jsonify({"solutions": solutions})
 
+    except RequestEntityTooLarge:
+        raise
     except Exception:
         logger.exception("Error in /sailing-club/submission")
         return jsonify({"error": "internal error"}), 500
-
-# JSON-only error pages (avoid <!doctype html> issues)
-@app.errorhandler(404)
-def _nf(_e): return jsonify({"error": "not found"}), 404
-
-@app.errorhandler(405)
-def _nm(_e): return jsonify({"error": "method not allowed"}), 405
-
-@app.errorhandler(500)
-def _ie(_e): return jsonify({"error": "internal error"}), 500
@@ -2,9 +2,10 @@ import json
 import logging
 import heapq
 import math
-from flask import request, jsonify
-from flask import Flask
-from routes import app
+from routes import executor
+from routes.cache import cached
+from routes.codec import get_json, jsonify
+from routes.logconfig import payload
 
 
 logger = logging.getLogger(__name__)
@@ -144,19 +145,23 @@ def find_worst_move(pos, board_size, snakes, ladders, smokes, mirrors):
 
 # --- Flask Route ---
 
-@app.route("/slsm", methods=["POST"])
+@cached
 def slsm_solver():
     """Main endpoint to solve the Snakes & Ladders puzzle."""
     try:
-        data = request.get_json(force=True, silent=False)
-        logger.info(f"Received data: {data}")
+        data = get_json(force=True, silent=False)
+        logger.info("Received data: %s", payload(data))
 
         board_size = data['boardSize']
         num_players = data['players']
         snakes, ladders, smokes, mirrors = parse_jumps(data['jumps'])
 
         # 1. Find the optimal sequence of moves for the last player to win.
-        winning_moves = find_shortest_path(board_size, snakes, ladders, smokes, mirrors)
+        try:
+            winning_moves = executor.run(find_shortest_path, board_size, snakes, ladders, smokes, mirrors,
+                                         deadline=executor.deadline_for("slsm_solver"))
+        except executor.SolverTimeout as e:
+            return executor.timeout_response(e)
 
         if not winning_moves:
             logger.error("No winning path could be found.")
@@ -188,9 +193,9 @@ def slsm_solver():
             
             turn += 1
 
-        logger.info(f"Successful solution found with {len(final_rolls)} rolls.")
+        logger.info("Successful solution found with %d rolls.", len(final_rolls))
         return jsonify(final_rolls)
 
     except Exception as e:
-        logger.error(f"An error occurred: {e}", exc_info=True)
+        logger.error("An error occurred: %s", e, exc_info=True)
         return jsonify({"error": "An internal server error occurred."}), 500
\ No newline at end of file
@@ -1,92 +1,484 @@
 import json
 import logging
-from flask import request, jsonify
-from routes import app
+from werkzeug.exceptions import RequestEntityTooLarge
+from routes import ingest
+from routes import executor
+from routes.cache import cached
+from routes.codec import jsonify, jsonify_stream
 
 logger = logging.getLogger(__name__)
 
-@app.route("/investigate", methods=["POST"])
+def _csr(n, u, v):
+    """
+    CSR adjacency of the multigraph on nodes 0..n-1 with edges u[i] -- v[i]:
+    neighbours of x are nbr[indptr[x]:indptr[x + 1]], reached through edge
+    eid[k].
+    """
+    m = len(u)
+    indptr = [0] * (n + 1)
+    for a in u:
+        indptr[a + 1] += 1
+    for b in v:
+        indptr[b + 1] += 1
+    for x in range(n):
+        indptr[x + 1] += indptr[x]
+    nbr = [0] * (2 * m)
+    eid = [0] * (2 * m)
+    fill = indptr[:n]
+    for i in range(m):
+        a, b = u[i], v[i]
+        k = fill[a]; nbr[k] = b; eid[k] = i; fill[a] = k + 1
+        k = fill[b]; nbr[k] = a; eid[k] = i; fill[b] = k + 1
+    return indptr, nbr, eid
+
+def find_bridges(n, u, v):
+    """
+    Bridges of the multigraph on nodes 0..n-1 with edges u[i] -- v[i], as a
+    bytearray flag per edge. Iterative Tarjan over CSR arrays, so deep
+    networks cannot hit the recursion limit.
+    """
+    indptr, nbr, eid = _csr(n, u, v)
+    disc = [-1] * n
+    low = [0] * n
+    parent_edge = [-1] * n
+    pos = indptr[:n]  # next neighbour to look at, per node
+    bridges = bytearray(len(u))
+    time = 0
+    for s in range(n):
+        if disc[s] != -1:
+            continue
+        disc[s] = low[s] = time
+        time += 1
+        stack = [s]
+        while stack:
+            x = stack[-1]
+            k, end = pos[x], indptr[x + 1]
+            pe, low_x = parent_edge[x], low[x]
+            # scan neighbours until the first unvisited one
+            while k < end:
+                y = nbr[k]
+                if disc[y] == -1:
+                    break
+                if eid[k] != pe and disc[y] < low_x:
+                    low_x = disc[y]
+                k += 1
+            low[x] = low_x
+            if k < end:
+                pos[x] = k + 1
+                disc[y] = low[y] = time
+                time += 1
+                parent_edge[y] = eid[k]
+                stack.append(y)
+                continue
+            pos[x] = end
+            stack.pop()
+            if stack:
+                p = stack[-1]
+                if low_x < low[p]:
+                    low[p] = low_x
+                if low_x > disc[p]:
+                    bridges[pe] = 1
+    return bridges
+
+def connectivity(n, u, v):
+    """
+    Everything one Tarjan DFS gives on the multigraph of find_bridges:
+    (bridges, cut, comp, blocks) with
+
+    - bridges: bytearray flag per edge
+    - cut: bytearray flag per node, set on articulation points
+    - comp: 2-edge-connected component label per node (0, 1, ... in the
+      order the components close)
+    - blocks: biconnected blocks as lists of edge ids; a bridge is a block
+      of its own, self-loops are in no block
+
+    Nodes go on a stack when discovered and a component is popped off it
+    below each bridge; tree and back edges go on a second stack that is
+    popped into a block whenever low[child] >= disc[parent].
+    """
+    indptr, nbr, eid = _csr(n, u, v)
+    disc = [-1] * n
+    low = [0] * n
+    parent_edge = [-1] * n
+    pos = indptr[:n]
+    bridges = bytearray(len(u))
+    cut = bytearray(n)
+    comp = [-1] * n
+    blocks = []
+    node_stack, edge_stack = [], []
+    labels = 0
+    time = 0
+    for s in range(n):
+        if disc[s] != -1:
+            continue
+        disc[s] = low[s] = time
+        time += 1
+        stack = [s]
+        node_stack.append(s)
+        root_children = 0
+        while stack:
+            x = stack[-1]
+            k, end = pos[x], indptr[x + 1]
+            pe, low_x, disc_x = parent_edge[x], low[x], disc[x]
+            while k < end:
+                y = nbr[k]
+                d = disc[y]
+                if d == -1:
+                    break
+                if d < disc_x and eid[k] != pe:
+                    # back edge to an ancestor (seen again later from the
+                    # ancestor's side, where d > disc_x)
+                    edge_stack.append(eid[k])
+                    if d < low_x:
+                        low_x = d
+                k += 1
+            low[x] = low_x
+            if k < end:
+                pos[x] = k + 1
+                disc[y] = low[y] = time
+                time += 1
+                parent_edge[y] = eid[k]
+                edge_stack.append(eid[k])
+                node_stack.append(y)
+                stack.append(y)
+                if x == s:
+                    root_children += 1
+                continue
+            pos[x] = end
+            stack.pop()
+            if not stack:
+                break
+            p = stack[-1]
+            if low_x < low[p]:
+                low[p] = low_x
+            if low_x >= disc[p]:
+                if p != s:
+                    cut[p] = 1
+                block = []
+                while True:
+                    e = edge_stack.pop()
+                    block.append(e)
+                    if e == pe:
+                        break
+                blocks.append(block)
+            if low_x > disc[p]:
+                bridges[pe] = 1
+                while True:
+                    y = node_stack.pop()
+                    comp[y] = labels
+                    if y == x:
+                        break
+                labels += 1
+        # what is left above s is the root's component
+        while node_stack:
+            comp[node_stack.pop()] = labels
+        labels += 1
+        if root_children >= 2:
+            cut[s] = 1
+    return bridges, cut, comp, blocks
+
+def _index(edges):
+    """Spy name -> id (in order of first appearance) and the edge endpoint ids."""
+    idx = {}
+    u, v = [], []
+    for e in edges:
+        if not isinstance(e, dict) or "spy1" not in e or "spy2" not in e:
+            raise ValueError("edge must have spy1 and spy2")
+        u.append(idx.setdefault(e["spy1"], len(idx)))
+        v.append(idx.setdefault(e["spy2"], len(idx)))
+    return idx, u, v
+
+def extra_channels(edges):
+    """Edges of one network that are not bridges, in input order."""
+    idx, u, v = _index(edges)
+    bridges = find_bridges(len(idx), u, v)
+
+    extra = []
+    for i, e in enumerate(edges):
+        if not bridges[i]:
+            extra.append({"spy1": e["spy1"], "spy2": e["spy2"]})
+    return extra
+
+def connectivity_report(edges):
+    """
+    Full /investigate answer for one network ("report": "full"): extra
+    channels plus bridges, articulation points, 2-edge-connected
+    components and biconnected blocks, all from one DFS. Spies are listed
+    in order of first appearance; components and blocks are ordered by
+    their first spy and first channel.
+    """
+    idx, u, v = _index(edges)
+    bridges, cut, comp, blocks = connectivity(len(idx), u, v)
+    spies = list(idx)
+
+    extra, bridge_list = [], []
+    for i, e in enumerate(edges):
+        channel = {"spy1": e["spy1"], "spy2": e["spy2"]}
+        (bridge_list if bridges[i] else extra).append(channel)
+
+    relabel = {}
+    components = []
+    for x, label in enumerate(comp):
+        if label not in relabel:
+            relabel[label] = len(components)
+            components.append([])
+        components[relabel[label]].append(spies[x])
+
+    block_list = []
+    for block in sorted(blocks, key=min):
+        nodes = set()
+        for e in block:
+            nodes.add(u[e]); nodes.add(v[e])
+        block_list.append([spies[x] for x in sorted(nodes)])
+
+    return {
+        "extraChannels": extra,
+        "bridges": bridge_list,
+        "articulationPoints": [spies[x] for x in range(len(spies)) if cut[x]],
+        "components": components,
+        "blocks": block_list,
+    }
+
+def _answer(job):
+    edges, full = job
+    return connectivity_report(edges) if full else {"extraChannels": extra_channels(edges)}
+
+class DynamicNetwork:
+    """
+    Spy network that takes channel additions and removals one at a time
+    and keeps its bridges up to date, without a full Tarjan pass per change.
+
+    Nodes are grouped into 2-edge-connected components (`comp`, with
+    `members`); bridges join those components into a forest (`bridge_adj`:
+    component -> bridges touching it).
+
+    - adding a channel inside a component changes nothing; otherwise the
+      bridges on the forest path between its ends (if any) stop being
+      bridges and the components on that path merge, smaller into larger
+    - removing a bridge changes no other channel
+    - removing any other channel can only split its own component, so
+      Tarjan runs again on that component alone
+    """
+
+    def __init__(self, edges=()):
+        self.channels = {}    # channel id -> (spy1, spy2), in insertion order
+        self.adj = {}         # spy -> {channel id: other spy}
+        self.by_pair = {}     # frozenset({spy1, spy2}) -> [channel ids]
+        self.bridges = set()  # channel ids
+        self.comp = {}        # spy -> component label
+        self.members = {}     # label -> set of spies
+        self.bridge_adj = {}  # label -> set of bridge channel ids
+        self._next_id = 0
+        self._next_label = 0
+
+        # initial channels: a single Tarjan pass over all of them
+        for spy1, spy2 in edges:
+            self._connect(spy1, spy2)
+        if self.adj:
+            label = self._new_label()
+            for spy in self.adj:
+                self.comp[spy] = label
+            self.members[label] = set(self.adj)
+            self._split(label, connected=False)
+
+    def _new_label(self):
+        label = self._next_label
+        self._next_label += 1
+        self.members[label] = set()
+        self.bridge_adj[label] = set()
+        return label
+
+    def _add_spy(self, spy):
+        if spy not in self.adj:
+            label = self._new_label()
+            self.adj[spy] = {}
+            self.comp[spy] = label
+            self.members[label].add(spy)
+
+    def _drop_spy(self, spy):
+        label = self.comp.pop(spy)
+        del self.adj[spy]
+        del self.members[label]
+        del self.bridge_adj[label]
+
+    def _other_side(self, bridge, label):
+        a, b = self.channels[bridge]
+        return self.comp[b] if self.comp[a] == label else self.comp[a]
+
+    def _forest_path(self, src, dst):
+        """Bridges on the forest path between two components, or None."""
+        via = {src: None}
+        queue = [src]
+        for label in queue:
+            if label == dst:
+                path = []
+                while via[label] is not None:
+                    bridge, label = via[label]
+                    path.append(bridge)
+                return path
+            for bridge in self.bridge_adj[label]:
+                nxt = self._other_side(bridge, label)
+                if nxt not in via:
+                    via[nxt] = (bridge, label)
+                    queue.append(nxt)
+        return None
+
+    def _connect(self, spy1, spy2):
+        """Record a channel without classifying it; returns its id."""
+        self.adj.setdefault(spy1, {})
+        self.adj.setdefault(spy2, {})
+        cid = self._next_id
+        self._next_id += 1
+        self.channels[cid] = (spy1, spy2)
+        self.adj[spy1][cid] = spy2
+        self.adj[spy2][cid] = spy1
+        self.by_pair.setdefault(frozenset((spy1, spy2)), []).append(cid)
+        return cid
+
+    def add(self, spy1, spy2):
+        """Add a channel; returns its id."""
+        self._add_spy(spy1)
+        self._add_spy(spy2)
+        cid = self._connect(spy1, spy2)
+
+        ca, cb = self.comp[spy1], self.comp[spy2]
+        if ca == cb:
+            return cid
+        path = self._forest_path(ca, cb)
+        if path is None:
+            # joins two separate networks
+            self.bridges.add(cid)
+            self.bridge_adj[ca].add(cid)
+            self.bridge_adj[cb].add(cid)
+            return cid
+
+        # the new channel closes a cycle through these bridges
+        labels = {ca}
+        for bridge in path:
+            self.bridges.discard(bridge)
+            a, b = self.channels[bridge]
+            labels.add(self.comp[a]); labels.add(self.comp[b])
+        keep = max(labels, key=lambda label: len(self.members[label]))
+        for label in labels - {keep}:
+            for spy in self.members.pop(label):
+                self.comp[spy] = keep
+                self.members[keep].add(spy)
+            self.bridge_adj[keep] |= self.bridge_adj.pop(label)
+        self.bridge_adj[keep].difference_update(path)
+        return cid
+
+    def remove(self, spy1, spy2):
+        """Remove the oldest channel between spy1 and spy2; raises KeyError if none."""
+        pair = frozenset((spy1, spy2))
+        cids = self.by_pair[pair]
+        cid = cids.pop(0)
+        if not cids:
+            del self.by_pair[pair]
+        a, b = self.channels.pop(cid)
+        self.adj[a].pop(cid)
+        self.adj[b].pop(cid, None)  # gone already for a self-loop
+
+        if cid in self.bridges:
+            self.bridges.discard(cid)
+            self.bridge_adj[self.comp[a]].discard(cid)
+            self.bridge_adj[self.comp[b]].discard(cid)
+        elif a != b:
+            self._split(self.comp[a])
+        for spy in {a, b}:
+            if not self.adj[spy] and len(self.members[self.comp[spy]]) == 1:
+                self._drop_spy(spy)
+
+    def _split(self, label, connected=True):
+        """
+        Recompute bridges inside one component after losing a channel
+        (`connected`: it is still in one piece, so no new bridge means no
+        change).
+        """
+        spies = list(self.members[label])
+        local = {spy: i for i, spy in enumerate(spies)}
+        inner = [cid for spy in spies for cid, other in self.adj[spy].items()
+                 if other in local and cid not in self.bridges]
+        inner = list(dict.fromkeys(inner))
+        u = [local[self.channels[cid][0]] for cid in inner]
+        v = [local[self.channels[cid][1]] for cid in inner]
+        flags = find_bridges(len(spies), u, v)
+        new_bridges = [cid for cid, flag in zip(inner, flags) if flag]
+        if connected and not new_bridges:
+            return
+
+        # relabel: components of the inner channels that are not bridges
+        self.bridges.update(new_bridges)
+        del self.bridge_adj[label]
+        del self.members[label]
+        for spy in spies:
+            self.comp[spy] = None
+        for root in spies:
+            if self.comp[root] is not None:
+                continue
+            new = self._new_label()
+            stack = [root]
+            self.comp[root] = new
+            while stack:
+                x = stack.pop()
+                self.members[new].add(x)
+                for cid, y in self.adj[x].items():
+                    if cid in self.bridges:
+                        self.bridge_adj[new].add(cid)
+                    elif self.comp[y] is None:
+                        self.comp[y] = new
+                        stack.append(y)
+
+    def extra_channels(self):
+        """Channels that are not bridges, in the order they were added."""
+        return [{"spy1": a, "spy2": b} for cid, (a, b) in self.channels.items()
+                if cid not in self.bridges]
+
+@cached
 def investigate():
     try:
-        payload = request.get_json(force=True, silent=False)
+        payload = ingest.load("networks", force=True)
 
         # Accept both shapes:
         # 1) {"networks": [...]}  (spec)
         # 2) [...]                (top-level list, observed in logs)
         if isinstance(payload, dict):
             networks = payload.get("networks", [])
-            if not isinstance(networks, list):
+            if not ingest.is_array(networks):
                 return jsonify({"error": "'networks' must be a list"}), 400
-        elif isinstance(payload, list):
+        elif ingest.is_array(payload):
             networks = payload
         else:
             return jsonify({"error": "JSON must be an object with 'networks' or a list"}), 400
 
-        results = []
-
-        for item in networks:
-            if not isinstance(item, dict):
-                return jsonify({"error": "each network must be an object"}), 400
-
-            net_id = item.get("networkId")
-            edges = item.get("network", [])
-            if net_id is None or not isinstance(edges, list):
-                return jsonify({"error": "network requires 'networkId' and 'network' list"}), 400
-
-            # Map spy names to ids
-            idx = {}
-            def gid(name):
-                if name not in idx:
-                    idx[name] = len(idx)
-                return idx[name]
-
-            u, v = [], []
-            for e in edges:
-                if not isinstance(e, dict) or "spy1" not in e or "spy2" not in e:
-                    return jsonify({"error": "edge must have spy1 and spy2"}), 400
-                u.append(gid(e["spy1"]))
-                v.append(gid(e["spy2"]))
-
-            n = len(idx)
-            adj = [[] for _ in range(n)]
-            for i, (a, b) in enumerate(zip(u, v)):
-                adj[a].append((b, i))
-                adj[b].append((a, i))
-
-            # Tarjan bridges
-            disc = [-1]*n
-            low  = [0]*n
-            time = 0
-            bridges = set()
-
-            def dfs(x, pe):
-                nonlocal time
-                disc[x] = low[x] = time
-                time += 1
-                for y, ei in adj[x]:
-                    if ei == pe:
-                        continue
-                    if disc[y] == -1:
-                        dfs(y, ei)
-                        low[x] = min(low[x], low[y])
-                        if low[y] > disc[x]:
-                            bridges.add(ei)
-                    else:
-                        low[x] = min(low[x], disc[y])
-
-            for s in range(n):
-                if disc[s] == -1:
-                    dfs(s, -1)
-
-            extra = []
-            for i, e in enumerate(edges):
-                if i not in bridges:
-                    extra.append({"spy1": e["spy1"], "spy2": e["spy2"]})
-
-            results.append({"networkId": net_id, "extraChannels": extra})
-
-        return jsonify({"networks": results})
+        net_ids = []
+
+        def jobs():
+            # networks are handed to the pool as they are parsed
+            for item in networks:
+                if not isinstance(item, dict):
+                    raise ValueError("each network must be an object")
+
+                net_id = item.get("networkId")
+                edges = item.get("network", [])
+                if net_id is None or not isinstance(edges, list):
+                    raise ValueError("network requires 'networkId' and 'network' list")
+                net_ids.append(net_id)
+                yield edges, item.get("report") == "full"
+
+        try:
+            answers = executor.map_deadline(_answer, jobs(),
+                                           deadline=executor.deadline_for("investigate"))
+        except ValueError as ve:
+            return jsonify({"error": str(ve)}), 400
+        except executor.SolverTimeout as e:
+            return executor.timeout_response(e)
+
+        results = [{"networkId": net_id, **answer}
+                   for net_id, answer in zip(net_ids, answers)]
+        return jsonify_stream(results, key="networks")
 
+    except RequestEntityTooLarge:
+        raise
     except Exception:
         logger.exception("Error in /investigate")
         return jsonify({"error": "internal error"}), 500
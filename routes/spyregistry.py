@@ -0,0 +1,97 @@
+"""
+Stateful spy networks: register a network once, add or remove channels
+as they change, and read its current extra channels.
+
+POST   /investigate/networks                         {"network": [{"spy1": ..., "spy2": ...}, ...]}
+POST   /investigate/networks/<network_id>/channels   {"add": [{"spy1", "spy2"}, ...], "remove": [...]}
+GET    /investigate/networks/<network_id>
+DELETE /investigate/networks/<network_id>
+
+Each answers {"networkId": ..., "extraChannels": [...]} like one
+/investigate network. Networks are kept as a spy_network.DynamicNetwork,
+so an update only touches the 2-edge-connected components it changes
+instead of running Tarjan over the whole network again. Removals apply
+after additions; removing a channel takes out the oldest one between
+those two spies. Storage, ids and expiry are routes.registry's.
+
+SPY_NETWORKS_MAX   networks kept per process, least recently used dropped first (default 256)
+SPY_NETWORK_TTL    seconds a network lives after its last update (default 3600, 0 = forever)
+"""
+import logging
+import os
+
+from routes.codec import get_json, jsonify
+from routes.registry import Registry
+from routes.spy_network import DynamicNetwork
+
+logger = logging.getLogger(__name__)
+
+MAX_NETWORKS = int(os.environ.get("SPY_NETWORKS_MAX", "256"))
+NETWORK_TTL = float(os.environ.get("SPY_NETWORK_TTL", "3600"))
+
+_networks = Registry("network", "networkId", MAX_NETWORKS, NETWORK_TTL)
+
+
+def _parse_channels(channels, field):
+    """[(spy1, spy2), ...] from [{"spy1": ..., "spy2": ...}, ...]; raises ValueError."""
+    if not isinstance(channels, list):
+        raise ValueError(f"'{field}' must be a list")
+    pairs = []
+    for item in channels:
+        if not isinstance(item, dict) or "spy1" not in item or "spy2" not in item:
+            raise ValueError(f"each '{field}' channel needs 'spy1' and 'spy2'")
+        spy1, spy2 = item["spy1"], item["spy2"]
+        for spy in (spy1, spy2):
+            if isinstance(spy, bool) or not isinstance(spy, (str, int)):
+                raise ValueError(f"spy names must be strings or integers, got {spy!r}")
+        pairs.append((spy1, spy2))
+    return pairs
+
+
+def _describe(net):
+    return {"extraChannels": net.extra_channels()}
+
+
+def create_network():
+    data = get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected JSON with list 'network'"}), 400
+    try:
+        edges = _parse_channels(data.get("network", []), "network")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return _networks.create(DynamicNetwork(edges), _describe, f"with {len(edges)} channels")
+
+
+def network(network_id):
+    return _networks.show(network_id, _describe)
+
+
+def _apply_channels(net):
+    data = get_json(silent=True)
+    if not isinstance(data, dict):
+        raise ValueError("Expected JSON with lists 'add' and/or 'remove'")
+    added = _parse_channels(data.get("add", []), "add")
+    removed = _parse_channels(data.get("remove", []), "remove")
+
+    pending = {}
+    for spy1, spy2 in added + removed:
+        pair = frozenset((spy1, spy2))
+        pending.setdefault(pair, len(net.by_pair.get(pair, ())))
+    for spy1, spy2 in added:
+        pending[frozenset((spy1, spy2))] += 1
+    for spy1, spy2 in removed:
+        pair = frozenset((spy1, spy2))
+        if pending[pair] == 0:
+            raise ValueError(f"No channel between {spy1!r} and {spy2!r}")
+        pending[pair] -= 1
+
+    for spy1, spy2 in added:
+        net.add(spy1, spy2)
+    for spy1, spy2 in removed:
+        net.remove(spy1, spy2)
+    return _describe(net)
+
+
+def update_channels(network_id):
+    return _networks.update(network_id, _apply_channels)
@@ -1,18 +1,16 @@
-import json
 import logging
 
-from flask import request
+from routes.codec import get_json, jsonify
+from routes.logconfig import payload
 
-from routes import app
 
 logger = logging.getLogger(__name__)
 
 
-@app.route('/square', methods=['POST'])
 def evaluate():
-    data = request.get_json()
-    logging.info("data sent for evaluation {}".format(data))
+    data = get_json()
+    logger.info("data sent for evaluation %s", payload(data))
     input_value = data.get("input")
     result = input_value * input_value
-    logging.info("My result :{}".format(result))
-    return json.dumps(result)
+    logger.info("My result :%s", result)
+    return jsonify(result)
@@ -2,8 +2,16 @@
 import json
 import logging
 import math
-from flask import request, jsonify
-from routes import app
+import os
+from routes import arbitrage, executor
+from routes.cache import cached
+from routes.codec import get_json, jsonify, jsonify_stream
+
+# "maxplus" (max-gain cycle search, default when NumPy is installed) or
+# "bellman-ford" (first negative cycle found)
+ENGINE = os.environ.get("INK_ARCHIVE_ENGINE", "maxplus" if arbitrage.available else "bellman-ford")
+# longest cycle (in goods) the max-plus search looks for
+MAX_CYCLE_LEN = int(os.environ.get("INK_ARCHIVE_MAX_CYCLE_LEN", "8"))
 
 def build_graph(goods, ratios):
     n = len(goods)
@@ -66,73 +74,102 @@ def cycle_gain(cycle, rate_map):
         prod *= r
     return prod, True
 
+def _relax_all(n, edges):
+    """
+    Bellman-Ford from a virtual super-source (an edge of weight 0 into every
+    node, i.e. every dist starts at 0), so one pass finds a negative cycle
+    anywhere in the graph.
+    Returns (pred, v) with v on or behind a negative cycle, or (pred, -1).
+    """
+    dist = [0.0] * n
+    pred = [-1] * n
+
+    # Relax edges n-1 times
+    for _ in range(n - 1):
+        changed = False
+        for u, v, w in edges:
+            d = dist[u] + w
+            if d < dist[v] - 1e-18:
+                dist[v] = d
+                pred[v] = u
+                changed = True
+        if not changed:
+            return pred, -1
+
+    # Detect a negative cycle
+    for u, v, w in edges:
+        if dist[u] + w < dist[v] - 1e-18:
+            pred[v] = u
+            return pred, v
+    return pred, -1
+
+def describe_cycle(goods, cycle_nodes, rate_map):
+    """(good names along the canonically rotated cycle, closed; gain in %)"""
+    prod, ok = cycle_gain(cycle_nodes, rate_map)
+    if not ok or prod <= 1.0 + 1e-15:
+        return [], 0.0
+    cycle_nodes = rotate_cycle_canonical(cycle_nodes, goods, rate_map)
+    names = [goods[i] for i in cycle_nodes]
+    names.append(names[0])
+    gain_pct = (prod - 1.0) * 100.0
+    return names, gain_pct
+
+def _bellman_ford_cycle(n, edges, rate_map):
+    pred, changed_vertex = _relax_all(n, edges)
+    if changed_vertex == -1:
+        return None
+    return extract_cycle(changed_vertex, pred, n)
+
 def best_arbitrage(goods, ratios):
     n, edges, rate_map = build_graph(goods, ratios)
     if n == 0:
         return [], 0.0
 
+    candidates = []
+    if ENGINE == "maxplus" and arbitrage.available:
+        candidates.append(arbitrage.best_cycle(n, rate_map, MAX_CYCLE_LEN))
+    if not any(candidates):
+        # Every dist starts at 0, so a run "from" any one source is the same
+        # super-source run: one pass replaces the old loop over all n sources.
+        # This also finds cycles longer than MAX_CYCLE_LEN.
+        candidates.append(_bellman_ford_cycle(n, edges, rate_map))
+
     best_prod = 1.0
     best_cycle = None
-
-    for src in range(n):
-        dist = [0.0] * n
-        pred = [-1] * n
-
-        # Relax edges n-1 times
-        for _ in range(n - 1):
-            changed = False
-            for u, v, w in edges:
-                if dist[u] + w < dist[v] - 1e-18:
-                    dist[v] = dist[u] + w
-                    pred[v] = u
-                    changed = True
-            if not changed:
-                break
-
-        # Detect any negative cycle reachable from src
-        changed_vertex = -1
-        for u, v, w in edges:
-            if dist[u] + w < dist[v] - 1e-18:
-                pred[v] = u
-                changed_vertex = v
-                break
-
-        if changed_vertex == -1:
-            continue  # no cycle from this src
-
-        cycle_nodes = extract_cycle(changed_vertex, pred, n)
-        if len(cycle_nodes) >= 2:
-            prod, ok = cycle_gain(cycle_nodes, rate_map)
-            if ok and prod > best_prod + 1e-15:
-                best_prod = prod
-                best_cycle = cycle_nodes
+    for cycle_nodes in candidates:
+        if cycle_nodes is None or len(cycle_nodes) < 2:
+            continue
+        prod, ok = cycle_gain(cycle_nodes, rate_map)
+        if ok and prod > best_prod + 1e-15:
+            best_prod = prod
+            best_cycle = cycle_nodes
 
     if not best_cycle:
         return [], 0.0
+    return describe_cycle(goods, best_cycle, rate_map)
 
-    
-    best_cycle = rotate_cycle_canonical(best_cycle, goods, rate_map)
-
-    names = [goods[i] for i in best_cycle]
-    names.append(names[0])  
-    gain_pct = (best_prod - 1.0) * 100.0
-    return names, gain_pct
 
-
-@app.route("/The-Ink-Archive", methods=["POST"])
+@cached
 def the_ink_archive():
-    data = request.get_json(silent=True)
+    data = get_json(silent=True)
     if not isinstance(data, list) or not data:
         return jsonify({"error": "Expected a JSON array of challenge items"}), 400
 
-    results = []
+    goods_list, ratios_list = [], []
     for idx, item in enumerate(data):
         goods = item.get("goods", [])
         ratios = item.get("ratios", [])
         if not isinstance(goods, list) or not isinstance(ratios, list):
             return jsonify({"error": f"Item {idx}: invalid 'goods' or 'ratios'"}), 400
-        path, gain = best_arbitrage(goods, ratios)
-        results.append({"path": path, "gain": gain})
+        goods_list.append(goods)
+        ratios_list.append(ratios)
+
+    try:
+        solved = executor.map_deadline(best_arbitrage, goods_list, ratios_list,
+                                       deadline=executor.deadline_for("the_ink_archive"))
+    except executor.SolverTimeout as e:
+        return executor.timeout_response(e)
 
-    return jsonify(results)
+    results = [{"path": path, "gain": gain} for path, gain in solved]
+    return jsonify_stream(results)
 
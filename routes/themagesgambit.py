@@ -1,17 +1,15 @@
 import json
 import logging
-from flask import request, jsonify
-from routes import app
+from werkzeug.exceptions import RequestEntityTooLarge
+from routes import ingest
+from routes.codec import jsonify
+from routes.logconfig import payload
 
-# Logger setup
-name = __name__
-logger = logging.getLogger(name)
-
-# Set the logging level to DEBUG for more detailed information
-logging.basicConfig(level=logging.DEBUG)
+# Per-spell detail is logged at DEBUG; enable with LOG_LEVEL_THEMAGESGAMBIT=DEBUG
+logger = logging.getLogger(__name__)
 
 def _validate_payload(item):
-    logger.debug("Validating payload: %s", item)
+    logger.debug("Validating payload: %s", payload(item))
     # required keys
     for k in ("intel", "reserve", "fronts", "stamina"):
         if k not in item:
@@ -52,13 +50,16 @@ def _earliest_time_minutes(intel, reserve, stamina_max):
     prev_front = None
     previous_action_was_cast = False
 
+    debug = logger.isEnabledFor(logging.DEBUG)
     logger.debug("Starting time calculation")
     for idx, (front, cost) in enumerate(intel):
-        logger.debug("Casting spell %d: front=%d, cost=%d, mp=%d, stamina=%d", idx + 1, front, cost, mp, stamina)
+        if debug:
+            logger.debug("Casting spell %d: front=%d, cost=%d, mp=%d, stamina=%d", idx + 1, front, cost, mp, stamina)
 
         # If resources are exhausted (MP or stamina), cooldown is required
         if stamina == 0 or mp < cost:
-            logger.debug("Not enough resources, triggering cooldown")
+            if debug:
+                logger.debug("Not enough resources, triggering cooldown")
             time += 10  # cooldown
             mp = reserve
             stamina = stamina_max
@@ -73,18 +74,20 @@ def _earliest_time_minutes(intel, reserve, stamina_max):
         prev_front = front
         previous_action_was_cast = True
 
-        logger.debug("After casting: time=%d, mp=%d, stamina=%d", time, mp, stamina)
+        if debug:
+            logger.debug("After casting: time=%d, mp=%d, stamina=%d", time, mp, stamina)
 
     # Final cooldown after all undead are defeated
     time += 10
     logger.debug("Final cooldown added, total time: %d", time)
     return time
 
-@app.route("/the-mages-gambit", methods=["POST"])
 def the_mages_gambit():
     try:
-        data = request.get_json(force=True, silent=False)
-        logger.debug("Received data: %s", data)
+        data = ingest.load(force=True)
+        logger.debug("Received data: %s", payload(data))
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
         logger.exception("Invalid JSON payload")
         return jsonify({"error": "Invalid JSON"}), 400
@@ -92,7 +95,7 @@ def the_mages_gambit():
     # Accept either a single object or a list of objects
     if isinstance(data, dict):
         items = [data]
-    elif isinstance(data, list):
+    elif ingest.is_array(data):
         items = data
     else:
         return jsonify({"error": "Payload must be an object or an array of objects"}), 400
@@ -100,7 +103,7 @@ def the_mages_gambit():
     results = []
     try:
         for item in items:
-            logger.debug("Processing item: %s", item)
+            logger.debug("Processing item: %s", payload(item))
             _validate_payload(item)
             time_minutes = _earliest_time_minutes(
                 intel=item["intel"],
@@ -109,13 +112,18 @@ def the_mages_gambit():
             )
             results.append({"time": time_minutes})
             logger.debug("Calculated time for item: %d", time_minutes)
+    except ingest.IngestError:
+        logger.warning("Invalid JSON in streamed payload", exc_info=True)
+        return jsonify({"error": "Invalid JSON"}), 400
     except ValueError as ve:
         logger.warning("Validation error: %s", ve)
         return jsonify({"error": str(ve)}), 400
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
         logger.exception("Unexpected error")
         return jsonify({"error": "Internal server error"}), 500
 
     # Always return a JSON array as per the samples
-    logger.debug("Returning results: %s", results)
+    logger.debug("Returning results: %s", payload(results))
     return jsonify(results), 200
@@ -1,56 +1,265 @@
 import logging
 import json
-from flask import request, jsonify
-from routes import app
+import math
+import os
+from routes.codec import get_json, jsonify
+
+try:
+    import numpy as np
+except ImportError:  # optional speedup
+    np = None
 
 logger = logging.getLogger(__name__)
 
+# "numpy" (batched grid queries for integer locations, default when NumPy is
+# installed) or "python" (grid queries one customer at a time)
+ENGINE = os.environ.get("TICKETING_ENGINE", "numpy" if np is not None else "python")
+# grid cell edge for the concert index; the widest latency band is 10
+CELL = 10
+# integer coordinates below this keep squared distances exact in int64
+_INT_LIMIT = 1 << 26
+_CELL_OFFSET = 1 << 23  # > _INT_LIMIT // CELL + 1
+_CELL_WIDTH = 1 << 24
+# answer slot the index could not fill; the view scores those customers in full
+_UNSCORED = object()
+
 def euclidean_distance(p1, p2):
     return ((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2) ** 0.5
 
-@app.route("/ticketing-agent", methods=["POST"])
-def ticketing_agent():
-    data = request.get_json()
-    customers = data["customers"]
-    concerts = data["concerts"]
-    priority = data.get("priority", {})
+def _finite_point(p):
+    try:
+        return all(isinstance(x, (int, float)) and math.isfinite(x) for x in (p[0], p[1]))
+    except (TypeError, LookupError):
+        return False
 
-    results = {}
+def _small_int_point(p):
+    try:
+        x, y = p[0], p[1]
+    except (TypeError, LookupError):
+        return False
+    return type(x) is int and type(y) is int and -_INT_LIMIT < x < _INT_LIMIT and -_INT_LIMIT < y < _INT_LIMIT
 
-    for customer in customers:
-        name = customer["name"]
-        vip_status = customer["vip_status"]
-        location = customer["location"]
-        credit_card = customer["credit_card"]
+def reference_best(customer, concerts, priority):
+    """Best concert for one customer by scoring every concert (first max wins)."""
+    vip_status = customer["vip_status"]
+    location = customer["location"]
+    credit_card = customer["credit_card"]
+
+    best_concert = None
+    best_score = float("-inf")
+
+    for concert in concerts:
+        score = 0
+
+        # VIP points
+        if vip_status:
+            score += 100
+
+        # Credit card priority
+        if credit_card in priority and priority[credit_card] == concert["name"]:
+            score += 50
+
+        # Latency (closer = higher points, scale to 30)
+        dist = euclidean_distance(location, concert["booking_center_location"])
+        if dist == 0:
+            latency_points = 30
+        elif dist <= 10:
+            latency_points = 20
+        else:
+            latency_points = 0
+        score += latency_points
+
+        if score > best_score:
+            best_score = score
+            best_concert = concert["name"]
+
+    return best_concert
+
+class ConcertIndex:
+    """
+    Concerts bucketed on a CELL x CELL grid by booking_center_location, and
+    by name for the credit card bonus.
+
+    VIP points are the same for every concert, so a customer's best concert
+    is decided by the bonus (50) and latency (30 / 20) points alone: only
+    the priority concerts and the concerts within 10 can beat the first
+    concert, which wins when none of them scores. Concerts near a customer
+    come from the grid cells around it (with a margin of 1, so rounding in
+    the distance cannot hide one) and their bands are then decided by
+    euclidean_distance itself, so the answers match reference_best exactly.
 
-        best_concert = None
-        best_score = float("-inf")
+    With NumPy, customers and concerts on integer coordinates are matched
+    in one batch (best_many): squared distances are exact there, so the
+    bands are d2 == 0 and d2 <= 100, and every customer's 3 x 3 cells are
+    looked up with searchsorted on the sorted cell keys.
 
-        for concert in concerts:
-            score = 0
+    Raises TypeError, ValueError or KeyError when a concert cannot be
+    indexed (unhashable name, missing field, non-finite location); callers
+    use reference_best then.
+    """
 
-            # VIP points
-            if vip_status:
-                score += 100
+    def __init__(self, concerts):
+        self.names = []
+        self.locations = []
+        self.by_name = {}  # name -> positions, ascending
+        self.grid = {}     # (cell x, cell y) -> positions, ascending
+        for i, concert in enumerate(concerts):
+            name, location = concert["name"], concert["booking_center_location"]
+            if not _finite_point(location):
+                raise ValueError(f"concert {name!r} has no finite location")
+            self.names.append(name)
+            self.locations.append(location)
+            self.by_name.setdefault(name, []).append(i)
+            self.grid.setdefault((location[0] // CELL, location[1] // CELL), []).append(i)
 
-            # Credit card priority
-            if credit_card in priority and priority[credit_card] == concert["name"]:
-                score += 50
+        self.vector = (ENGINE == "numpy" and np is not None and bool(self.names)
+                       and all(_small_int_point(p) for p in self.locations))
+        if self.vector:
+            xy = np.array([(p[0], p[1]) for p in self.locations], dtype=np.int64)
+            self.cx, self.cy = xy[:, 0], xy[:, 1]
+            keys = self._cell_keys(self.cx // CELL, self.cy // CELL)
+            self.order = np.argsort(keys, kind="stable")
+            self.keys = keys[self.order]
 
-            # Latency (closer = higher points, scale to 30)
-            dist = euclidean_distance(location, concert["booking_center_location"])
+    @staticmethod
+    def _cell_keys(cx, cy):
+        return (cx + _CELL_OFFSET) * _CELL_WIDTH + (cy + _CELL_OFFSET)
+
+    def _near(self, location):
+        """Positions of every concert within 10 of `location`, and a few more."""
+        x, y = location[0], location[1]
+        grid = self.grid
+        near = []
+        for cx in range(int((x - CELL - 1) // CELL), int((x + CELL + 1) // CELL) + 1):
+            for cy in range(int((y - CELL - 1) // CELL), int((y + CELL + 1) // CELL) + 1):
+                cell = grid.get((cx, cy))
+                if cell:
+                    near.extend(cell)
+        return near
+
+    def best(self, customer, priority):
+        customer["vip_status"]  # same for every concert, but still required
+        location = customer["location"]
+        credit_card = customer["credit_card"]
+        if not self.names:
+            return None
+
+        scores = {}
+        if credit_card in priority:
+            for i in self.by_name.get(priority[credit_card], ()):
+                scores[i] = 50
+        locations = self.locations
+        for i in self._near(location):
+            dist = euclidean_distance(location, locations[i])
             if dist == 0:
-                latency_points = 30
+                scores[i] = scores.get(i, 0) + 30
             elif dist <= 10:
-                latency_points = 20
-            else:
-                latency_points = 0
-            score += latency_points
+                scores[i] = scores.get(i, 0) + 20
+        if not scores:
+            return self.names[0]
+        top = max(scores.values())
+        return self.names[min(i for i, score in scores.items() if score == top)]
+
+    def best_many(self, customers, priority):
+        """
+        best() for every customer, in order; _UNSCORED where the index
+        cannot answer (unhashable card or priority name).
+        """
+        answers = []
+        rows, xs, ys = [], [], []
+        bonus_rows, bonus_cols = [], []
+        for k, customer in enumerate(customers):
+            location = customer["location"]
+            if not (self.vector and _small_int_point(location)):
+                try:
+                    answers.append(self.best(customer, priority) if _finite_point(location) else _UNSCORED)
+                except TypeError:
+                    answers.append(_UNSCORED)
+                continue
+            customer["vip_status"]
+            credit_card = customer["credit_card"]
+            try:
+                cols = self.by_name.get(priority[credit_card], ()) if credit_card in priority else ()
+            except TypeError:
+                answers.append(_UNSCORED)
+                continue
+            row = len(rows)
+            rows.append(k); xs.append(location[0]); ys.append(location[1])
+            bonus_rows.extend([row] * len(cols)); bonus_cols.extend(cols)
+            answers.append(None)
+
+        if rows:
+            best = self._best_cols(np.array(xs, dtype=np.int64), np.array(ys, dtype=np.int64),
+                                   bonus_rows, bonus_cols)
+            names = self.names
+            for k, col in zip(rows, best.tolist()):
+                answers[k] = names[col]
+        return answers
+
+    def _best_cols(self, xs, ys, bonus_rows, bonus_cols):
+        """Position of the best concert for each of the customers at (xs, ys)."""
+        n = len(xs)
+        qx, qy = xs // CELL, ys // CELL
+        lo, hi = [], []
+        for ox in (-1, 0, 1):
+            # cells (x, y - 1) .. (x, y + 1) are adjacent in key order
+            lo.append(np.searchsorted(self.keys, self._cell_keys(qx + ox, qy - 1), "left"))
+            hi.append(np.searchsorted(self.keys, self._cell_keys(qx + ox, qy + 1), "right"))
+        lo, hi = np.concatenate(lo), np.concatenate(hi)
+        who = np.tile(np.arange(n), 3)
+        counts = hi - lo
+        # one (customer, concert) pair per concert in the 3 x 3 cells
+        pair_rows = np.repeat(who, counts)
+        first = np.cumsum(counts) - counts
+        pos = np.arange(int(counts.sum())) - np.repeat(first - lo, counts)
+        pair_cols = self.order[pos]
+        d2 = (xs[pair_rows] - self.cx[pair_cols]) ** 2 + (ys[pair_rows] - self.cy[pair_cols]) ** 2
+        points = np.where(d2 == 0, 30, np.where(d2 <= 100, 20, 0))
+        near = points > 0
+
+        pair_rows = np.concatenate([pair_rows[near], np.array(bonus_rows, dtype=np.int64)])
+        pair_cols = np.concatenate([pair_cols[near], np.array(bonus_cols, dtype=np.int64)])
+        points = np.concatenate([points[near], np.full(len(bonus_rows), 50)])
+        best = np.zeros(n, dtype=np.int64)  # nobody scores: the first concert
+        if not len(pair_rows):
+            return best
 
-            if score > best_score:
-                best_score = score
-                best_concert = concert["name"]
+        # add up the points of each (customer, concert), then per customer
+        # take the highest score and, among equals, the first concert
+        key = pair_rows * len(self.names) + pair_cols
+        order = np.argsort(key, kind="stable")
+        key, points = key[order], points[order]
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        score = np.add.reduceat(points, starts)
+        row, col = key[starts] // len(self.names), key[starts] % len(self.names)
+        order = np.lexsort((col, -score, row))
+        row, col = row[order], col[order]
+        head = np.r_[True, row[1:] != row[:-1]]
+        best[row[head]] = col[head]
+        return best
 
+def ticketing_agent():
+    data = get_json()
+    customers = data["customers"]
+    concerts = data["concerts"]
+    priority = data.get("priority", {})
+
+    try:
+        index = ConcertIndex(concerts)
+    except (TypeError, ValueError, KeyError):
+        logger.debug("Concerts cannot be indexed; scoring every pair")
+        index = None
+
+    results = {}
+
+    if index is not None:
+        answers = index.best_many(customers, priority)
+    else:
+        answers = [_UNSCORED] * len(customers)
+    for customer, best_concert in zip(customers, answers):
+        name = customer["name"]
+        if best_concert is _UNSCORED:
+            best_concert = reference_best(customer, concerts, priority)
         results[name] = best_concert
 
     return jsonify(results)
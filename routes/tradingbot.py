@@ -1,14 +1,10 @@
 import json
 import logging
 import random
-from flask import Flask, request, jsonify
-from routes import app
+from routes.codec import get_json, jsonify
 
-# Set up logging for the application
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@app.route("/trading-bot", methods=["POST"])
 def trading_bot():
     """
     This endpoint processes a list of news events and their associated candle
@@ -24,7 +20,7 @@ def trading_bot():
     
     try:
         # Get the JSON data from the POST request body
-        data = request.get_json(force=True, silent=False)
+        data = get_json(force=True, silent=False)
         
         # Check if the data is a list and if it's not empty
         if not isinstance(data, list) or not data:
@@ -57,11 +53,11 @@ def trading_bot():
             })
             
         # Log the number of decisions made
-        logger.info(f"Generated {len(decisions)} trading decisions.")
+        logger.info("Generated %d trading decisions.", len(decisions))
 
         # Return the list of decisions as a JSON response with a 200 OK status
         return jsonify(decisions), 200
         
     except Exception as e:
-        logger.error(f"An error occurred: {e}")
+        logger.error("An error occurred: %s", e)
         return jsonify({"error": "Internal Server Error"}), 500
@@ -3,8 +3,8 @@ import re
 import math
 import logging
 from decimal import Decimal, ROUND_HALF_UP
-from flask import request, jsonify
-from routes import app
+from routes.cache import cached
+from routes.codec import get_json, jsonify
 
 logger = logging.getLogger(__name__)
 
@@ -150,9 +150,9 @@ def compute_one(formula: str, variables: dict) -> float:
     return evaluate_expr(py_expr, variables)
 
 # ---------- Flask route ----------
-@app.route("/trading-formula", methods=["POST"])
+@cached
 def trading_formula():
-    data = request.get_json(silent=True)
+    data = get_json(silent=True)
     if not isinstance(data, list):
         return jsonify({"error": "Expected JSON array"}), 400
 
@@ -0,0 +1,12 @@
+import os
+import sys
+
+# make `app`, `routes` and `benchmarks` importable however pytest is started
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# solve inline and cache nothing, so tests can patch a module's ENGINE and
+# every request reaches its solver
+os.environ.setdefault("SOLVER_POOL_SIZE", "0")
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
@@ -0,0 +1,82 @@
+"""arbitrage.best_cycle: the highest-gain simple cycle of at most max_len goods."""
+import itertools
+import math
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app import app
+from routes import arbitrage, theinkarchive
+
+
+def _gain(cycle, rate_map):
+    return sum(math.log(rate_map[a, b]) for a, b in zip(cycle, cycle[1:] + cycle[:1]))
+
+
+def _best_gain(n, rate_map, max_len):
+    """Log-gain of the best simple cycle, trying every one."""
+    best = 0.0
+    for k in range(2, min(max_len, n) + 1):
+        for nodes in itertools.permutations(range(n), k):
+            if nodes[0] == min(nodes) and all(p in rate_map for p in zip(nodes, nodes[1:] + nodes[:1])):
+                best = max(best, _gain(list(nodes), rate_map))
+    return best
+
+
+def _rotation(cycle):
+    i = cycle.index(min(cycle))
+    return cycle[i:] + cycle[:i]
+
+
+def test_best_not_first_cycle():
+    # 0 <-> 1 gains 10%, 0 -> 2 -> 3 -> 0 gains 33%
+    rates = {(0, 1): 1.1, (1, 0): 1.0, (0, 2): 1.1, (2, 3): 1.1, (3, 0): 1.1}
+    assert _rotation(arbitrage.best_cycle(4, rates, 8)) == [0, 2, 3]
+
+
+def test_cycles_longer_than_max_len_are_ignored():
+    ring = {(i, (i + 1) % 4): 1.05 for i in range(4)}
+    assert arbitrage.best_cycle(4, ring, 3) is None
+    assert _rotation(arbitrage.best_cycle(4, ring, 4)) == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("n, rates", [
+    (0, {}),
+    (1, {(0, 0): 2.0}),
+    (2, {(0, 0): 2.0, (0, 1): 1.0, (1, 0): 1.0}),
+])
+def test_no_cycle(n, rates):
+    assert arbitrage.best_cycle(n, rates, 8) is None
+
+
+def test_exhausted_budget_keeps_the_best_cycle_so_far(monkeypatch):
+    monkeypatch.setattr(arbitrage, "SEARCH_BUDGET", 0)
+    rates = {(0, 1): 1.1, (1, 0): 1.1}
+    assert _rotation(arbitrage.best_cycle(2, rates, 8)) == [0, 1]
+
+
+def test_matches_every_simple_cycle():
+    rng = random.Random(15)
+    for _ in range(200):
+        n, max_len = rng.randint(2, 6), rng.randint(2, 6)
+        rates = {(u, v): rng.uniform(0.75, 1.2)
+                 for u in range(n) for v in range(n) if u != v and rng.random() < 0.7}
+        expected = _best_gain(n, rates, max_len)
+        cycle = arbitrage.best_cycle(n, rates, max_len)
+        if expected <= 1e-9:
+            assert cycle is None
+        else:
+            assert 2 <= len(cycle) <= max_len and len(set(cycle)) == len(cycle)
+            assert _gain(cycle, rates) == pytest.approx(expected, abs=1e-9)
+
+
+def test_endpoint_answers_the_best_cycle(monkeypatch):
+    monkeypatch.setattr(theinkarchive, "ENGINE", "maxplus")
+    goods = ["a", "b", "c", "d"]
+    ratios = [[0, 1, 1.1], [1, 0, 1.0], [0, 2, 1.1], [2, 3, 1.1], [3, 0, 1.1]]
+    resp = app.test_client().post("/The-Ink-Archive", json=[{"goods": goods, "ratios": ratios}])
+    (answer,) = resp.get_json()
+    assert sorted(answer["path"][:-1]) == ["a", "c", "d"]
+    assert answer["gain"] == pytest.approx(33.1)
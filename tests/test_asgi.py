@@ -0,0 +1,68 @@
+"""/fog-of-wall through the ASGI app: answered off the event loop."""
+import asyncio
+import json
+import time
+
+import asgi
+from routes import fogofwall
+
+
+def _call(body):
+    """(status, parsed body) of one POST /fog-of-wall through asgi.app."""
+    scope = {"type": "http", "method": "POST", "path": "/fog-of-wall", "headers": []}
+    messages = [{"type": "http.request", "body": json.dumps(body).encode(), "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    async def run():
+        await asgi.app(scope, receive, send)
+        return sent[0]["status"], json.loads(sent[1]["body"])
+
+    return run()
+
+
+def _start(game_id):
+    return {"challenger_id": "c", "game_id": game_id,
+            "test_case": {"game_id": game_id, "length_of_grid": 10, "num_of_walls": 5,
+                          "crows": [{"id": "1", "x": 4, "y": 4}]}}
+
+
+def test_first_turn():
+    status, body = asyncio.run(_call(_start("asgi-first")))
+    assert status == 200
+    assert body["game_id"] == "asgi-first" and body["action_type"] in ("move", "scan")
+
+
+def test_slow_turn_does_not_block_the_loop(monkeypatch):
+    play_turn = fogofwall.play_turn
+
+    def slow_turn(data):
+        time.sleep(0.3)
+        return play_turn(data)
+
+    monkeypatch.setattr(fogofwall, "play_turn", slow_turn)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        results = await asyncio.gather(_call(_start("asgi-slow-1")), _call(_start("asgi-slow-2")))
+        task.cancel()
+        return results, ticks
+
+    start = time.perf_counter()
+    results, ticks = asyncio.run(run())
+    assert [status for status, _ in results] == [200, 200]
+    assert time.perf_counter() - start < 0.55  # both turns ran at once
+    assert ticks >= 10
@@ -0,0 +1,47 @@
+"""/batch items are served, and counted, like standalone requests."""
+import pytest
+
+from app import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def _count(client, route, status):
+    prefix = f'http_requests_total{{route="{route}",status="{status}"}} '
+    for line in client.get("/metrics").get_data(as_text=True).splitlines():
+        if line.startswith(prefix):
+            return int(line[len(prefix):])
+    return 0
+
+
+def test_results_in_request_order(client):
+    items = [{"path": "/square", "body": {"input": n}} for n in range(5)]
+    resp = client.post("/batch", json={"requests": items})
+    assert resp.status_code == 200
+    assert resp.get_json() == {"results": [{"body": n * n, "status": 200} for n in range(5)]}
+
+
+def test_single_item_batch_is_counted(client):
+    before = _count(client, "/batch", 200)
+    for _ in range(3):
+        client.post("/batch", json=[{"path": "/square", "body": {"input": 3}}])
+    assert _count(client, "/batch", 200) == before + 3
+
+
+def test_failing_item_is_counted_like_a_standalone_request(client):
+    before = _count(client, "/square", 500)
+    alone = client.post("/square", json={"nope": 1})
+    resp = client.post("/batch", json=[{"path": "/square", "body": {"nope": 1}},
+                                       {"path": "/square", "body": {"input": 2}}])
+    results = resp.get_json()["results"]
+    assert [r["status"] for r in results] == [alone.status_code, 200]
+    assert results[0]["body"] == alone.get_json()
+    assert _count(client, "/square", 500) == before + 2
+
+
+def test_bad_items(client):
+    resp = client.post("/batch", json=[{"body": {}}, {"path": "/batch", "body": []}])
+    assert [r["status"] for r in resp.get_json()["results"]] == [400, 400]
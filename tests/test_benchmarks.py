@@ -0,0 +1,37 @@
+"""The benchmark CLI's baseline handling."""
+import json
+
+from benchmarks import harness
+from benchmarks.__main__ import main
+
+ARGS = ["--scale", "small", "--route", "/square", "--iterations", "3", "--no-import"]
+
+
+def _result(p50, p99, errors=0):
+    return {"iterations": 3, "errors": errors, "p50": p50, "p99": p99, "mean": p50, "throughput": 1 / p50}
+
+
+def test_missing_baseline_fails(tmp_path, capsys):
+    path = tmp_path / "baseline.json"
+    assert main(ARGS + ["--baseline", str(path)]) == 2
+    assert "no baseline" in capsys.readouterr().err
+
+    assert main(ARGS + ["--baseline", str(path), "--save-baseline"]) == 0
+    assert list(json.loads(path.read_text())) == ["/square@small"]
+
+
+def test_regressions_with_slack():
+    baseline = {"a": _result(0.001, 0.002)}
+    assert harness.regressions({"a": _result(0.0012, 0.0025)}, baseline) == []
+    assert len(harness.regressions({"a": _result(0.0013, 0.0026)}, baseline)) == 2
+    assert harness.regressions({"a": _result(0.0013, 0.0026)}, baseline, slack=0.001) == []
+    assert harness.regressions({"a": _result(0.001, 0.002, errors=1)}, baseline) == ["a: 1 error responses"]
+    # benchmarks without a baseline entry are not compared
+    assert harness.regressions({"b": _result(9.0, 9.0)}, baseline) == []
+
+
+def test_median_of_runs():
+    runs = [{"a": _result(0.001, 0.009)}, {"a": _result(0.003, 0.002, errors=1)}, {"a": _result(0.002, 0.004)}]
+    combined = harness.median_results(runs)["a"]
+    assert (combined["p50"], combined["p99"]) == (0.002, 0.004)
+    assert (combined["iterations"], combined["errors"]) == (9, 1)
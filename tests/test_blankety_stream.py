@@ -0,0 +1,36 @@
+"""/blankety/stream: any number of rows of any length, answered in chunks."""
+import pytest
+
+from app import app
+from routes import blanketyblanks, ingest
+
+
+@pytest.fixture(params=["whole", "streamed"])
+def client(request, monkeypatch):
+    if request.param == "streamed":
+        monkeypatch.setattr(ingest, "STREAM_THRESHOLD", 1)
+    # several chunks even for a small body
+    monkeypatch.setattr(blanketyblanks, "STREAM_CHUNK_VALUES", 4)
+    return app.test_client()
+
+
+def test_rows_of_any_length(client):
+    series = [[None, 1, None, 3], [], [None], [5], "not a row", [2, None, None, 8, None]]
+    resp = client.post("/blankety/stream", json={"series": series})
+    assert resp.status_code == 200
+    assert resp.get_json() == {"answer": [
+        [1.0, 1.0, 2.0, 3.0], [], [0.0], [5.0], None, [2.0, 4.0, 6.0, 8.0, 8.0],
+    ]}
+
+
+@pytest.mark.parametrize("engine", ["numpy", "python"])
+def test_matches_reference(client, monkeypatch, engine):
+    monkeypatch.setattr(blanketyblanks, "ENGINE", engine)
+    series = [[None if (i * j) % 3 == 0 else float(i - j) for j in range(i % 7)] for i in range(40)]
+    resp = client.post("/blankety/stream", json={"series": series})
+    assert resp.get_json()["answer"] == [blanketyblanks._impute_one(row) for row in series]
+
+
+def test_rejects_bodies_without_series(client):
+    assert client.post("/blankety/stream", json={"rows": []}).status_code == 400
+    assert client.post("/blankety/stream", json={"series": 3}).status_code == 400
@@ -0,0 +1,92 @@
+"""The "report": "full" answer of /investigate."""
+import random
+
+import pytest
+
+from app import app
+from routes.spy_network import connectivity_report
+
+
+def _net(*pairs):
+    return [{"spy1": a, "spy2": b} for a, b in pairs]
+
+
+@pytest.mark.parametrize("edges, bridges, cut, components, blocks", [
+    ([], [], [], [], []),
+    # a path: every channel a bridge, every inner spy a cut
+    (_net(("a", "b"), ("b", "c")), _net(("a", "b"), ("b", "c")), ["b"],
+     [["a"], ["b"], ["c"]], [["a", "b"], ["b", "c"]]),
+    # two triangles sharing c: no bridges, one component, two blocks
+    (_net(("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("d", "e"), ("e", "c")), [], ["c"],
+     [["a", "b", "c", "d", "e"]], [["a", "b", "c"], ["c", "d", "e"]]),
+    # a triangle with a tail, plus a separate pair
+    (_net(("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("x", "y")),
+     _net(("c", "d"), ("x", "y")), ["c"],
+     [["a", "b", "c"], ["d"], ["x"], ["y"]], [["a", "b", "c"], ["c", "d"], ["x", "y"]]),
+    # a 4-cycle with a chord: one block, no cuts
+    (_net(("a", "b"), ("b", "c"), ("c", "d"), ("d", "a"), ("a", "c")), [], [],
+     [["a", "b", "c", "d"]], [["a", "b", "c", "d"]]),
+])
+def test_known_reports(edges, bridges, cut, components, blocks):
+    report = connectivity_report(edges)
+    assert report["bridges"] == bridges
+    assert report["extraChannels"] == [e for e in edges if e not in bridges]
+    assert report["articulationPoints"] == cut
+    assert report["components"] == components
+    assert report["blocks"] == blocks
+
+
+def _pieces(spies, edges):
+    """Number of connected pieces among `spies` using `edges`."""
+    parent = {s: s for s in spies}
+
+    def find(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    for a, b in edges:
+        parent[find(a)] = find(b)
+    return len({find(s) for s in spies})
+
+
+def test_matches_brute_force():
+    rng = random.Random(22)
+    for _ in range(150):
+        n = rng.randint(1, 8)
+        pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(rng.randint(1, 12))]
+        spies = list(dict.fromkeys(s for pair in pairs for s in pair))
+        report = connectivity_report(_net(*pairs))
+        base = _pieces(spies, pairs)
+
+        bridges = [pairs[i] for i in range(len(pairs))
+                   if _pieces(spies, pairs[:i] + pairs[i + 1:]) > base]
+        assert report["bridges"] == _net(*bridges)
+
+        cut = [s for s in spies
+               if _pieces([t for t in spies if t != s],
+                          [p for p in pairs if s not in p]) > base]
+        assert report["articulationPoints"] == cut
+
+        rest = [p for p in pairs if p not in bridges]
+        assert len(report["components"]) == _pieces(spies, rest)
+        assert sorted(s for comp in report["components"] for s in comp) == sorted(spies)
+
+
+def test_full_report_over_http():
+    networks = [
+        {"networkId": "plain", "network": _net(("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"))},
+        {"networkId": "full", "report": "full", "network": _net(("a", "b"), ("b", "c"))},
+    ]
+    resp = app.test_client().post("/investigate", json={"networks": networks})
+    assert resp.status_code == 200
+    plain, full = resp.get_json()["networks"]
+    assert plain == {"networkId": "plain", "extraChannels": _net(("a", "b"), ("b", "c"), ("c", "a"))}
+    assert full == {
+        "networkId": "full",
+        "extraChannels": [],
+        "bridges": _net(("a", "b"), ("b", "c")),
+        "articulationPoints": ["b"],
+        "components": [["a"], ["b"], ["c"]],
+        "blocks": [["a", "b"], ["b", "c"]],
+    }
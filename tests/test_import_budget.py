@@ -0,0 +1,28 @@
+"""
+`import app` must stay cheap: route modules load on their first request.
+
+IMPORT_BUDGET_SECONDS   allowed time for `import app` (default 2.0)
+"""
+import os
+
+from benchmarks.harness import probe_import
+from routes import ROUTES
+
+BUDGET = float(os.environ.get("IMPORT_BUDGET_SECONDS", "2.0"))
+
+
+def _fresh_env():
+    env = dict(os.environ)
+    env.pop("PRELOAD_ROUTES", None)
+    return env
+
+
+def test_import_loads_no_solver_module():
+    solvers = {import_name.rsplit(".", 1)[0] for _, import_name, _ in ROUTES}
+    _, modules = probe_import(_fresh_env())
+    assert sorted(solvers.intersection(modules)) == []
+
+
+def test_import_within_budget():
+    seconds, _ = probe_import(_fresh_env())
+    assert seconds < BUDGET, f"import app took {seconds:.2f}s, budget is {BUDGET:.2f}s"
@@ -0,0 +1,80 @@
+"""imputation.impute_rows against blanketyblanks._impute_one, bit for bit."""
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from routes import imputation
+from routes.blanketyblanks import _impute_one
+
+VALUES = [0.0, -0.0, 1, -3, 2.5, 1e308, -1e308, 5e-324, float("inf"), float("nan"), True, "1.5"]
+
+
+@pytest.mark.parametrize("rows, expected", [
+    ([[None, 1, None, 3, None]], [[1.0, 1.0, 2.0, 3.0, 3.0]]),
+    ([[1, None, None, None, 5]], [[1.0, 2.0, 3.0, 4.0, 5.0]]),
+    ([[None, None, None]], [[0.0, 0.0, 0.0]]),
+    ([[]], [[]]),
+    # inf is kept as a known value, then every non-finite result becomes 0.0
+    ([[float("inf"), None, 1]], [[0.0, 0.0, 1.0]]),
+    ([["2", None, 4]], [[2.0, 3.0, 4.0]]),
+    # a row that cannot be converted is left out; ragged rows keep their lengths
+    ([[1, "abc"], [1, None, 3], [None]], [None, [1.0, 2.0, 3.0], [0.0]]),
+])
+def test_known_answers(rows, expected):
+    assert imputation.impute_rows(rows) == expected
+
+
+def test_impute_array_leaves_input_untouched():
+    np = pytest.importorskip("numpy")
+    values = np.array([[np.nan, 2.0, np.nan, 6.0]])
+    values.flags.writeable = False
+    assert imputation.impute_array(values).tolist() == [[2.0, 2.0, 4.0, 6.0]]
+
+
+def _value(rng):
+    roll = rng.random()
+    if roll < 0.4:
+        return None
+    if roll < 0.5:
+        return rng.choice(VALUES)
+    return rng.uniform(-1e6, 1e6)
+
+
+def _reference(row):
+    try:
+        return _impute_one(row)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _bits(rows):
+    return [row if row is None else [v.hex() for v in row] for row in rows]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_reference(seed):
+    rng = random.Random(seed)
+    width = rng.randint(0, 30)
+    rows = [[_value(rng) for _ in range(width if rng.random() < 0.7 else rng.randint(0, 30))]
+            for _ in range(rng.randint(1, 40))]
+    if rng.random() < 0.3:
+        rows[rng.randrange(len(rows))].append("not a number")
+    assert _bits(imputation.impute_rows(rows)) == _bits([_reference(row) for row in rows])
+
+
+def test_blankety_engines_agree(monkeypatch):
+    from app import app
+    from routes import blanketyblanks
+
+    rng = random.Random(7)
+    body = {"series": [[None if rng.random() < 0.3 else rng.uniform(-50, 50) for _ in range(1000)]
+                       for _ in range(100)]}
+    answers = []
+    for engine in ("numpy", "python"):
+        monkeypatch.setattr(blanketyblanks, "ENGINE", engine)
+        resp = app.test_client().post("/blankety", json=body)
+        assert resp.status_code == 200
+        answers.append(resp.get_json()["answer"])
+    assert answers[0] == answers[1]
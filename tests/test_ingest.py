@@ -0,0 +1,34 @@
+"""Content-Type handling of ingest.load, for whole and streamed bodies."""
+import pytest
+
+from app import app
+from routes import ingest
+from routes.codec import dumps
+
+BLANKETY = dumps({"series": [[1.0, None, 3.0] * 333 + [None]] * 100})
+SAILING = dumps({"testCases": [{"id": "a", "input": [[1, 8], [8, 10], [12, 13]]}]})
+
+
+@pytest.fixture(params=["whole", "streamed"])
+def client(request, monkeypatch):
+    if request.param == "streamed":
+        monkeypatch.setattr(ingest, "STREAM_THRESHOLD", 1)
+    return app.test_client()
+
+
+def test_blankety_needs_a_json_content_type(client):
+    assert client.post("/blankety", data=BLANKETY, content_type="application/json").status_code == 200
+    assert client.post("/blankety", data=BLANKETY, content_type="text/plain").status_code == 400
+    assert client.post("/blankety/stream", data=BLANKETY, content_type="text/plain").status_code == 400
+
+
+def test_forced_views_accept_any_content_type(client):
+    resp = client.post("/sailing-club/submission", data=SAILING, content_type="text/plain")
+    assert resp.status_code == 200
+    assert resp.get_json()["solutions"][0]["sortedMergedSlots"] == [[1, 10], [12, 13]]
+
+
+def test_body_over_the_limit(client, monkeypatch):
+    monkeypatch.setenv("MAX_BODY_BYTES_BLANKETY", "100")
+    resp = client.post("/blankety", data=BLANKETY, content_type="application/json")
+    assert resp.status_code == 413
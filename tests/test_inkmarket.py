@@ -0,0 +1,101 @@
+"""Persistent Ink Archive markets under /The-Ink-Archive/markets."""
+import random
+
+import pytest
+
+from app import app
+from routes import inkmarket, theinkarchive
+
+GOODS = ["Blue", "Red", "Gold", "Ink"]
+# Blue -> Red -> Gold -> Blue gains 8%; Gold -> Ink is a dead end
+RATIOS = [[0, 1, 2.0], [1, 2, 0.6], [2, 0, 0.9], [2, 3, 0.5]]
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def _create(client, goods=GOODS, ratios=RATIOS):
+    resp = client.post("/The-Ink-Archive/markets", json={"goods": goods, "ratios": ratios})
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def _update(client, market_id, ratios):
+    return client.post(f"/The-Ink-Archive/markets/{market_id}/rates", json={"ratios": ratios})
+
+
+def test_lifecycle(client):
+    created = _create(client)
+    market_id = created["market_id"]
+    assert created["path"] == ["Red", "Gold", "Blue", "Red"]
+    assert created["gain"] == pytest.approx(8.0)
+
+    # Gold -> Ink -> Gold now gains 25%
+    body = _update(client, market_id, [[3, 2, 2.5]]).get_json()
+    assert body["path"] == ["Gold", "Ink", "Gold"] and body["gain"] == pytest.approx(25.0)
+
+    # a rejected update changes nothing
+    resp = _update(client, market_id, [[0, 1, 3.0], [0, 9, 1.0]])
+    assert resp.status_code == 400 and "out of range" in resp.get_json()["error"]
+    assert client.get(f"/The-Ink-Archive/markets/{market_id}").get_json() == body
+
+    # rate <= 0 removes the pair
+    body = _update(client, market_id, [[3, 2, 0]]).get_json()
+    assert body["path"] == ["Red", "Gold", "Blue", "Red"]
+
+    assert client.delete(f"/The-Ink-Archive/markets/{market_id}").get_json() == \
+        {"market_id": market_id, "deleted": True}
+    assert client.get(f"/The-Ink-Archive/markets/{market_id}").status_code == 404
+    assert _update(client, market_id, []).status_code == 404
+
+
+def test_bad_market(client):
+    resp = client.post("/The-Ink-Archive/markets", json={"goods": "abc"})
+    assert resp.status_code == 400
+
+
+def test_updates_match_a_fresh_solve(client):
+    rng = random.Random(16)
+    goods = [f"g{i}" for i in range(6)]
+    rates = {(u, v): rng.uniform(0.8, 1.15) for u in range(6) for v in range(6) if u != v and rng.random() < 0.6}
+    market_id = _create(client, goods, [[u, v, r] for (u, v), r in rates.items()])["market_id"]
+    for _ in range(60):
+        ratios = [[rng.randrange(6), rng.randrange(6), rng.uniform(0.8, 1.15) if rng.random() < 0.8 else 0]
+                  for _ in range(rng.randint(1, 3))]
+        body = _update(client, market_id, ratios).get_json()
+        for u, v, r in ratios:
+            if r > 0:
+                rates[u, v] = r
+            else:
+                rates.pop((u, v), None)
+        path, gain = theinkarchive.best_arbitrage(goods, [[u, v, r] for (u, v), r in rates.items()])
+        assert body["gain"] == pytest.approx(gain, abs=1e-9)
+        assert bool(body["path"]) == bool(path)
+
+
+def test_fallback_cycle_is_kept_until_it_may_change(monkeypatch):
+    pytest.importorskip("numpy")
+    # the max-plus search only sees 2-cycles, so the 3-cycle comes from Bellman-Ford
+    monkeypatch.setattr(inkmarket, "MAX_CYCLE_LEN", 2)
+    calls = []
+    bellman_ford = inkmarket._bellman_ford_cycle
+    monkeypatch.setattr(inkmarket, "_bellman_ford_cycle", lambda *a: calls.append(1) or bellman_ford(*a))
+
+    state = inkmarket._Market(GOODS, {(u, v): r for u, v, r in RATIOS})
+    assert state.answer()[0] == ["Red", "Gold", "Blue", "Red"]
+    state.answer()
+    assert len(calls) == 1
+
+    state.update({(2, 3): 0.4})  # lower, off the cycle
+    state.answer()
+    assert len(calls) == 1
+
+    state.update({(2, 3): 0.45})  # higher: may close a new cycle
+    state.answer()
+    assert len(calls) == 2
+
+    state.update({(1, 2): 0.5})  # lower, on the cycle: 2.0 * 0.5 * 0.9 < 1
+    assert state.answer() == ([], 0.0)
+    assert len(calls) == 3
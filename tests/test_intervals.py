@@ -0,0 +1,81 @@
+"""/sailing-club/submission: the batched sweeps against merge_slots / min_boats."""
+import random
+
+import pytest
+
+from app import app
+from routes import intervals, sailingclub
+
+ENGINES = ["python", pytest.param("numpy", marks=pytest.mark.skipif(
+    not intervals.available, reason="needs NumPy"))]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("raw, merged, boats", [
+    ([], [], 0),
+    ("not a list", [], 0),
+    # touching bookings merge, but one boat covers both
+    ([[1, 8], [8, 10]], [[1, 10]], 1),
+    ([[1, 5], [2, 6], [3, 7]], [[1, 7]], 3),
+    ([[10, 12], [1, 3], [5, 6]], [[1, 3], [5, 6], [10, 12]], 1),
+    # end <= start is dropped
+    ([[4, 4], [6, 2], [1, 2]], [[1, 2]], 1),
+    # floats are truncated, bools count as integers, anything else is dropped
+    ([[1.9, 4.2], [True, 3], [1], [1, 2, 3], "x", None, [1, "2"]], [[1, 4]], 2),
+    ([[-5, -1], [-3, 2]], [[-5, 2]], 2),
+])
+def test_known_answers(engine, raw, merged, boats, monkeypatch):
+    monkeypatch.setattr(sailingclub, "ENGINE", engine)
+    assert sailingclub.solve_batch([raw]) == [(merged, boats)]
+
+
+def _item(rng):
+    roll = rng.random()
+    if roll < 0.85:
+        s = rng.randint(-5, 40)
+        return [s, s + rng.randint(-2, 12)]
+    if roll < 0.9:
+        return [rng.uniform(0, 30), rng.uniform(0, 40)]
+    if roll < 0.95:
+        return [True, 3]
+    return rng.choice([[1], [1, 2, 3], "x", None, [1, "2"], [2**70, 2**71]])
+
+
+def _reference(raw):
+    bookings = sailingclub.parse_bookings(raw)
+    return sailingclub.merge_slots(bookings), sailingclub.min_boats(bookings)
+
+
+def test_solve_batch_matches_reference(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(sailingclub, "ENGINE", "numpy")
+    rng = random.Random(23)
+    for _ in range(30):
+        raws = [[_item(rng) for _ in range(rng.randint(0, 25))] for _ in range(rng.randint(1, 30))]
+        if rng.random() < 0.2:
+            raws.append("not a list")
+        assert sailingclub.solve_batch(raws) == [_reference(raw) for raw in raws]
+
+
+def test_submission_over_http(monkeypatch):
+    # several flushes, with the id-less case in the middle of a batch
+    monkeypatch.setattr(sailingclub, "BATCH_CASES", 2)
+    cases = [
+        {"id": "a", "input": [[1, 8], [8, 10]]},
+        {"input": [[1, 2]]},
+        {"id": 7, "input": [[1, 5], [2, 6], [3, 7]]},
+        {"id": "c", "input": []},
+        {"id": "d"},
+    ]
+    resp = app.test_client().post("/sailing-club/submission", json={"testCases": cases})
+    assert resp.status_code == 200
+    assert resp.get_json() == {"solutions": [
+        {"id": "a", "sortedMergedSlots": [[1, 10]], "minBoatsNeeded": 1},
+        {"id": None, "sortedMergedSlots": [], "minBoatsNeeded": 0},
+        {"id": "7", "sortedMergedSlots": [[1, 7]], "minBoatsNeeded": 3},
+        {"id": "c", "sortedMergedSlots": [], "minBoatsNeeded": 0},
+        {"id": "d", "sortedMergedSlots": [], "minBoatsNeeded": 0},
+    ]}
+
+    resp = app.test_client().post("/sailing-club/submission", json={"cases": []})
+    assert resp.status_code == 400
@@ -0,0 +1,64 @@
+"""Payloads are rendered when their record is enqueued, not by the listener."""
+import logging
+import queue
+
+import pytest
+
+from app import app
+from routes import ingest, logconfig
+
+
+@pytest.fixture
+def log():
+    records = queue.SimpleQueue()
+    logger = logging.getLogger("tests.logconfig")
+    handler = logconfig._DeferredQueueHandler(records)
+    logger.addHandler(handler)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield logger, records
+    logger.removeHandler(handler)
+    logger.propagate = True
+
+
+def _messages(records):
+    out = []
+    while not records.empty():
+        out.append(records.get().getMessage())
+    return out
+
+
+def test_payload_is_snapshot_when_enqueued(log):
+    logger, records = log
+    body = {"items": [1, 2]}
+    logger.info("got %s and %r", logconfig.payload(body), logconfig.payload([3]))
+    logger.info("named %(body)s", {"body": logconfig.payload(body)})
+    body["items"].append("changed later")
+    assert _messages(records) == ["got {'items': [1, 2]} and [3]", "named {'items': [1, 2]}"]
+
+
+def test_filtered_payload_is_never_rendered(log):
+    logger, records = log
+    p = logconfig.payload({"big": "body"})
+    logger.debug("skipped %s", p)
+    assert records.empty()
+    assert p.text is None and p.obj == {"big": "body"}
+
+
+def test_streamed_array_repr(log, monkeypatch):
+    logger, records = log
+    monkeypatch.setattr(ingest, "STREAM_THRESHOLD", 1)
+    with app.test_request_context(data=b"[1, 2, 3]", content_type="application/json"):
+        items = ingest.load(force=True)
+        assert isinstance(items, ingest.StreamedArray)
+        logger.info("%s", logconfig.payload(items))
+        it = iter(items)
+        next(it)
+        logger.info("%s", logconfig.payload(items))
+        list(it)
+        logger.info("%s", logconfig.payload(items))
+    assert _messages(records) == [
+        "<StreamedArray, not read yet>",
+        "<StreamedArray, 1 read so far>",
+        "<StreamedArray of length 3>",
+    ]
@@ -0,0 +1,75 @@
+"""/metrics counters and histograms, read back over HTTP."""
+import gc
+import re
+
+from app import app
+from routes import metrics
+
+
+def _scrape(client):
+    resp = client.get("/metrics")
+    assert resp.status_code == 200 and resp.mimetype == "text/plain"
+    samples = {}
+    for line in resp.get_data(as_text=True).splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def _delta(before, after, name):
+    return after.get(name, 0) - before.get(name, 0)
+
+
+def test_requests_are_counted_per_route_and_status():
+    client = app.test_client()
+    before = _scrape(client)
+    for n in (3, 4):
+        resp = client.post("/square", json={"input": n})
+        assert resp.get_json() == n * n
+    assert client.post("/square", data="nope", content_type="application/json").status_code == 400
+    assert client.get("/no-such-route").status_code == 404
+    after = _scrape(client)
+
+    square = 'route="/square"'
+    assert _delta(before, after, f'http_requests_total{{{square},status="200"}}') == 2
+    assert _delta(before, after, f'http_requests_total{{{square},status="400"}}') == 1
+    assert _delta(before, after, f'http_request_errors_total{{{square}}}') == 0
+    assert _delta(before, after, f'http_request_duration_seconds_count{{{square}}}') == 3
+    assert _delta(before, after, f'http_request_duration_seconds_bucket{{{square},le="+Inf"}}') == 3
+    assert _delta(before, after, f'http_request_bytes_total{{{square}}}') == \
+        len(b'{"input": 3}') * 2 + len(b"nope")
+    assert _delta(before, after, f'http_response_bytes_total{{{square}}}') > 0
+    assert _delta(before, after,
+                  f'http_requests_total{{route="{metrics.UNMATCHED}",status="404"}}') == 1
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics.observe("/test-histogram", 200, 0.003)
+    metrics.observe("/test-histogram", 200, 0.2)
+    metrics.observe("/test-histogram", 503, 60.0)
+    text = metrics.render()
+    buckets = re.findall(r'http_request_duration_seconds_bucket\{route="/test-histogram",le="([^"]+)"\} (\d+)', text)
+    counts = {le: int(n) for le, n in buckets}
+    assert counts["0.0025"] == 0
+    assert counts["0.005"] == 1
+    assert counts["0.25"] == 2
+    assert counts["30.0"] == 2
+    assert counts["+Inf"] == 3
+    assert 'http_request_errors_total{route="/test-histogram"} 1' in text
+
+
+def test_labels_are_escaped():
+    metrics.observe('/odd"route\\', 200, 0.0)
+    assert 'route="/odd\\"route\\\\"' in metrics.render()
+
+
+def test_unclosed_stream_collected_under_the_lock():
+    stream = metrics._counting(iter([b"ab", b"c"]), "/test-collected")
+    next(stream)
+    cycle = [stream]
+    cycle.append(cycle)  # only the collector can free it
+    del stream, cycle
+    with metrics._lock:
+        gc.collect()
+    assert 'http_response_bytes_total{route="/test-collected"} 2' in metrics.render()
@@ -0,0 +1,48 @@
+"""/blankety with .npy request and response bodies."""
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app import app
+from routes import npy
+
+
+def _npy(array):
+    buf = io.BytesIO()
+    np.save(buf, array)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(100, 1000))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    values[3] = np.nan
+    return values
+
+
+def test_npy_in_json_out(values):
+    resp = app.test_client().post("/blankety", data=_npy(values), content_type=npy.MIMETYPE)
+    assert resp.status_code == 200
+    json_body = {"series": [[None if np.isnan(v) else v for v in row] for row in values.tolist()]}
+    expected = app.test_client().post("/blankety", json=json_body).get_json()
+    assert resp.get_json() == expected
+    assert expected["answer"][3] == [0.0] * 1000
+
+
+def test_npy_in_npy_out(values):
+    resp = app.test_client().post("/blankety", data=_npy(values), content_type=npy.MIMETYPE,
+                                  headers={"Accept": npy.MIMETYPE})
+    assert resp.status_code == 200 and resp.mimetype == npy.MIMETYPE
+    answer = np.load(io.BytesIO(resp.get_data()))
+    assert answer.shape == (100, 1000) and not np.isnan(answer).any()
+
+
+@pytest.mark.parametrize("body", [b"not npy", None])
+def test_bad_arrays(body):
+    data = body if body is not None else _npy(np.zeros((10, 10)))
+    resp = app.test_client().post("/blankety", data=data, content_type=npy.MIMETYPE)
+    assert resp.status_code == 400
@@ -0,0 +1,116 @@
+"""/princess-diaries: best schedule by score, then by total subway fee."""
+import itertools
+import random
+
+import pytest
+
+from app import app
+from routes import princessdiaries
+
+# 0 -2- 1 -3- 2, and a direct 0 -10- 2
+SUBWAY = [{"connection": [0, 1], "fee": 2}, {"connection": [1, 2], "fee": 3},
+          {"connection": [0, 2], "fee": 10}]
+
+
+def _task(name, start, end, station, score):
+    return {"name": name, "start": start, "end": end, "station": station, "score": score}
+
+
+@pytest.mark.parametrize("tasks, start, expected", [
+    # a task may start when the previous one ends; 0 -> 1 -> 2 -> 1 -> 0
+    ([_task("A", 0, 5, 1, 5), _task("B", 5, 10, 2, 5)], 0,
+     {"max_score": 10, "min_fee": 10, "schedule": ["A", "B"]}),
+    # overlapping tasks of equal score: the cheaper round trip wins
+    ([_task("far", 0, 6, 2, 4), _task("near", 5, 10, 1, 4)], 0,
+     {"max_score": 4, "min_fee": 4, "schedule": ["near"]}),
+    # a higher score wins whatever it costs
+    ([_task("far", 0, 6, 2, 5), _task("near", 5, 10, 1, 4)], 0,
+     {"max_score": 5, "min_fee": 10, "schedule": ["far"]}),
+    # a station off the subway is reachable only when it is the start
+    ([_task("off", 0, 1, 7, 9), _task("A", 2, 3, 1, 1)], 0,
+     {"max_score": 1, "min_fee": 4, "schedule": ["A"]}),
+    ([_task("off", 0, 1, 7, 9)], 7, {"max_score": 9, "min_fee": 0, "schedule": ["off"]}),
+])
+def test_known_answers(tasks, start, expected):
+    assert princessdiaries.solve(tasks, SUBWAY, start) == expected
+
+
+def _distances(subway, stations):
+    dist = {(a, b): 0 if a == b else float("inf") for a in stations for b in stations}
+    for e in subway:
+        u, v = e["connection"]
+        dist[u, v] = dist[v, u] = min(dist[u, v], e["fee"])
+    for k in stations:
+        for a in stations:
+            for b in stations:
+                dist[a, b] = min(dist[a, b], dist[a, k] + dist[k, b])
+    return dist
+
+
+def _fee(schedule, tasks, dist, start):
+    stops = [start] + [tasks[name]["station"] for name in schedule] + [start]
+    return sum(dist[a, b] for a, b in zip(stops, stops[1:]))
+
+
+def _brute(tasks, subway, start):
+    """(max score, min fee) over every chain of compatible tasks."""
+    stations = {start} | {t["station"] for t in tasks} | {s for e in subway for s in e["connection"]}
+    dist = _distances(subway, stations)
+    by_name = {t["name"]: t for t in tasks}
+    ordered = sorted(tasks, key=lambda t: t["start"])
+    best = None
+    for k in range(1, len(tasks) + 1):
+        for chain in itertools.combinations(ordered, k):
+            if any(a["end"] > b["start"] for a, b in zip(chain, chain[1:])):
+                continue
+            fee = _fee([t["name"] for t in chain], by_name, dist, start)
+            if fee == float("inf"):
+                continue
+            key = (sum(t["score"] for t in chain), -fee)
+            best = key if best is None or key > best else best
+    return (0, 0) if best is None else (best[0], -best[1])
+
+
+@pytest.mark.parametrize("frontier", ["array", "station"])
+def test_matches_every_chain(frontier):
+    rng = random.Random(17)
+    for _ in range(150):
+        n_stations = rng.randint(2, 6)
+        subway = [{"connection": [rng.randrange(n_stations), rng.randrange(n_stations)],
+                   "fee": rng.randint(0, 9)} for _ in range(rng.randint(0, 7))]
+        tasks = []
+        for i in range(rng.randint(1, 8)):
+            start = rng.randint(0, 20)
+            tasks.append(_task(f"t{i}", start, start + rng.randint(1, 6), rng.randrange(n_stations), rng.randint(0, 5)))
+        origin = rng.randrange(n_stations)
+
+        plan = princessdiaries.TaskPlan(tasks, subway, [origin])
+        if frontier == "station":
+            plan.rows = None
+        answer = plan.best_from(origin)
+        assert (answer["max_score"], answer["min_fee"]) == _brute(tasks, subway, origin)
+        if answer["schedule"]:
+            by_name = {t["name"]: t for t in tasks}
+            stations = {origin} | {t["station"] for t in tasks} | {s for e in subway for s in e["connection"]}
+            assert sum(by_name[name]["score"] for name in answer["schedule"]) == answer["max_score"]
+            assert _fee(answer["schedule"], by_name, _distances(subway, stations), origin) == answer["min_fee"]
+
+
+def test_endpoint():
+    body = {"tasks": [_task("A", 0, 5, 1, 5), _task("B", 5, 10, 2, 5)], "subway": SUBWAY,
+            "starting_station": 0}
+    resp = app.test_client().post("/princess-diaries", json=body)
+    assert resp.get_json() == {"max_score": 10, "min_fee": 10, "schedule": ["A", "B"]}
+    assert app.test_client().post("/princess-diaries", json={"tasks": 3}).status_code == 400
+
+
+def test_distance_rows_stay_within_their_budget(monkeypatch):
+    monkeypatch.setattr(princessdiaries, "ALL_PAIRS_MAX", 0)
+    monkeypatch.setattr(princessdiaries, "ROW_CACHE_CELLS", 10 * 50)
+    line = [{"connection": [i, i + 1], "fee": 1} for i in range(49)]
+    network = princessdiaries.SubwayNetwork(line)
+    for u in range(50):
+        assert network.row(u) == [abs(u - v) for v in range(50)]
+    assert len(network.rows) == 10
+    # evicted rows are computed again
+    assert network.row(0) == list(range(50))
@@ -0,0 +1,59 @@
+"""/princess-diaries with "starting_stations": one answer per origin."""
+import random
+
+import pytest
+
+from app import app
+from routes import princessdiaries
+
+SUBWAY = [{"connection": [0, 1], "fee": 2}, {"connection": [1, 2], "fee": 3}]
+TASKS = [{"name": "A", "start": 0, "end": 5, "station": 1, "score": 5},
+         {"name": "B", "start": 5, "end": 9, "station": 2, "score": 4},
+         {"name": "C", "start": 6, "end": 8, "station": 9, "score": 7}]
+
+
+def _post(body):
+    return app.test_client().post("/princess-diaries", json=body)
+
+
+def test_known_answers():
+    resp = _post({"tasks": TASKS, "subway": SUBWAY, "starting_stations": [0, 2, 9, 0]})
+    assert resp.status_code == 200
+    assert resp.get_json() == {"results": [
+        {"starting_station": 0, "max_score": 9, "min_fee": 10, "schedule": ["A", "B"]},
+        {"starting_station": 2, "max_score": 9, "min_fee": 6, "schedule": ["A", "B"]},
+        # station 9 is off the subway: only its own task is reachable
+        {"starting_station": 9, "max_score": 7, "min_fee": 0, "schedule": ["C"]},
+        {"starting_station": 0, "max_score": 9, "min_fee": 10, "schedule": ["A", "B"]},
+    ]}
+
+
+@pytest.mark.parametrize("body, status, expected", [
+    ({"tasks": TASKS, "subway": SUBWAY, "starting_stations": []}, 200, {"results": []}),
+    ({"tasks": [], "subway": SUBWAY, "starting_stations": [1]}, 200,
+     {"results": [{"starting_station": 1, "max_score": 0, "min_fee": 0, "schedule": []}]}),
+    ({"tasks": TASKS, "subway": SUBWAY, "starting_stations": 0}, 400, None),
+    ({"tasks": TASKS, "subway": SUBWAY, "starting_stations": [[0]]}, 400, None),
+])
+def test_edge_cases(body, status, expected):
+    resp = _post(body)
+    assert resp.status_code == status
+    if expected is not None:
+        assert resp.get_json() == expected
+
+
+def test_shared_precompute_matches_one_solve_per_origin():
+    pytest.importorskip("numpy")
+    rng = random.Random(19)
+    for _ in range(60):
+        n_stations = rng.randint(2, 8)
+        subway = [{"connection": [rng.randrange(n_stations), rng.randrange(n_stations)],
+                   "fee": rng.randint(0, 20)} for _ in range(rng.randint(1, 12))]
+        tasks = []
+        for i in range(rng.randint(1, 12)):
+            start = rng.randint(0, 40)
+            tasks.append({"name": f"t{i}", "start": start, "end": start + rng.randint(1, 10),
+                          "station": rng.randrange(n_stations + 1), "score": rng.randint(0, 9)})
+        origins = [rng.randrange(n_stations + 2) for _ in range(rng.randint(2, 6))]
+        expected = [princessdiaries.solve(tasks, subway, st) for st in origins]
+        assert princessdiaries.solve_many(tasks, subway, origins) == expected
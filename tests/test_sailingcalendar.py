@@ -0,0 +1,114 @@
+"""Live sailing club calendars under /sailing-club/calendars."""
+import random
+
+import pytest
+
+from app import app
+from routes.sailingclub import BookingIndex, merge_slots, min_boats
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_lifecycle(client):
+    resp = client.post("/sailing-club/calendars", json={"bookings": [[1, 8], [8, 10]]})
+    created = resp.get_json()
+    calendar_id = created["calendarId"]
+    assert created == {"calendarId": calendar_id, "bookingIds": [0, 1], "minBoatsNeeded": 1}
+    url = f"/sailing-club/calendars/{calendar_id}"
+
+    body = client.post(f"{url}/bookings", json={"add": [[2, 3]], "cancel": [0]}).get_json()
+    assert body == {"calendarId": calendar_id, "bookingIds": [2], "minBoatsNeeded": 1}
+    body = client.post(f"{url}/bookings", json={"add": [[9, 12], [9, 11]]}).get_json()
+    assert body["bookingIds"] == [3, 4] and body["minBoatsNeeded"] == 3
+
+    assert client.get(url).get_json() == {
+        "calendarId": calendar_id,
+        "busySlots": [[2, 3], [8, 12]],
+        "freeSlots": [[3, 8]],
+        "minBoatsNeeded": 3,
+    }
+    # the window clips slots on both sides
+    body = client.get(f"{url}?start=0&end=10").get_json()
+    assert body["busySlots"] == [[2, 3], [8, 10]]
+    assert body["freeSlots"] == [[0, 2], [3, 8]]
+
+    # a rejected update changes nothing
+    resp = client.post(f"{url}/bookings", json={"add": [[0, 100]], "cancel": [0]})
+    assert resp.status_code == 400 and resp.get_json()["error"] == "Unknown booking ids: [0]"
+    resp = client.post(f"{url}/bookings", json={"cancel": [3, 3]})
+    assert resp.status_code == 400
+    assert client.get(url).get_json()["busySlots"] == [[2, 3], [8, 12]]
+
+    assert client.get(f"{url}?start=x").status_code == 400
+    assert client.get(f"{url}?start=5&end=4").status_code == 400
+
+    assert client.delete(url).get_json() == {"calendarId": calendar_id, "deleted": True}
+    assert client.get(url).status_code == 404
+    assert client.post(f"{url}/bookings", json={}).status_code == 404
+
+
+@pytest.mark.parametrize("bookings", [
+    [[3, 3]],
+    [[5, 2]],
+    [[1]],
+    [[1, "2"]],
+    [[0, 2**62]],
+    "[[1, 2]]",
+])
+def test_bad_bookings(client, bookings):
+    assert client.post("/sailing-club/calendars", json={"bookings": bookings}).status_code == 400
+
+
+def test_empty_index():
+    index = BookingIndex()
+    assert (index.busy(), index.free(), index.min_boats()) == ([], [], 0)
+    assert index.free(0, 5) == [[0, 5]]
+
+
+def test_known_index():
+    index = BookingIndex()
+    ids = [index.insert(s, e) for s, e in [(10, 20), (15, 25), (-40, -30), (25, 26)]]
+    assert index.min_boats() == 2
+    # [15, 25) and [25, 26) touch, so they form one slot
+    assert index.busy() == [[-40, -30], [10, 26]]
+    assert index.free() == [[-30, 10]]
+    assert index.busy(12, 18) == [[12, 18]]
+    assert index.free(-50, -35) == [[-50, -40]]
+
+    index.cancel(ids[1])
+    assert index.min_boats() == 1
+    assert index.busy() == [[-40, -30], [10, 20], [25, 26]]
+    with pytest.raises(KeyError):
+        index.cancel(ids[1])
+
+    # bookings far apart only deepen the tree by log2 of the span
+    index.insert(2**61, 2**61 + 1)
+    assert index.busy(2**61 - 5, 2**61 + 5) == [[2**61, 2**61 + 1]]
+    assert len(index.add) < 1000
+
+
+def test_updates_match_a_fresh_solve():
+    rng = random.Random(24)
+    index = BookingIndex()
+    live = {}
+    for _ in range(500):
+        if live and rng.random() < 0.4:
+            bid = rng.choice(list(live))
+            del live[bid]
+            index.cancel(bid)
+        else:
+            start = rng.randint(-30, 60)
+            end = start + rng.randint(1, 15)
+            live[index.insert(start, end)] = [start, end]
+        bookings = list(live.values())
+        merged = merge_slots(bookings)
+        assert index.busy() == merged
+        assert index.min_boats() == min_boats(bookings)
+
+        lo = rng.randint(-40, 70)
+        hi = lo + rng.randint(0, 40)
+        clipped = [[max(s, lo), min(e, hi)] for s, e in merged if max(s, lo) < min(e, hi)]
+        assert index.busy(lo, hi) == clipped
@@ -0,0 +1,120 @@
+"""Persistent spy networks under /investigate/networks."""
+import random
+
+import pytest
+
+from app import app
+from routes.spy_network import DynamicNetwork, extra_channels
+
+# a-b-c is a triangle; c-d hangs off it
+TRIANGLE_TAIL = [{"spy1": "a", "spy2": "b"}, {"spy1": "b", "spy2": "c"},
+                 {"spy1": "c", "spy2": "a"}, {"spy1": "c", "spy2": "d"}]
+
+
+def _ch(spy1, spy2):
+    return {"spy1": spy1, "spy2": spy2}
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def _create(client, network):
+    resp = client.post("/investigate/networks", json={"network": network})
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def _update(client, network_id, add=(), remove=()):
+    return client.post(f"/investigate/networks/{network_id}/channels",
+                       json={"add": list(add), "remove": list(remove)})
+
+
+def test_lifecycle(client):
+    created = _create(client, TRIANGLE_TAIL)
+    network_id = created["networkId"]
+    assert created["extraChannels"] == TRIANGLE_TAIL[:3]
+
+    # without b-c nothing is on a cycle
+    body = _update(client, network_id, remove=[_ch("c", "b")]).get_json()
+    assert body == {"networkId": network_id, "extraChannels": []}
+
+    # b-d closes a-b-d-c-a
+    body = _update(client, network_id, add=[_ch("b", "d")]).get_json()
+    assert body["extraChannels"] == [_ch("a", "b"), _ch("c", "a"), _ch("c", "d"), _ch("b", "d")]
+
+    # a rejected update changes nothing
+    resp = _update(client, network_id, add=[_ch("a", "d")], remove=[_ch("b", "c")])
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == "No channel between 'b' and 'c'"
+    assert client.get(f"/investigate/networks/{network_id}").get_json() == body
+
+    # a channel added and removed in one update is fine
+    assert _update(client, network_id, add=[_ch("x", "y")], remove=[_ch("y", "x")]).get_json() == body
+
+    assert client.delete(f"/investigate/networks/{network_id}").get_json() == \
+        {"networkId": network_id, "deleted": True}
+    assert client.get(f"/investigate/networks/{network_id}").status_code == 404
+    assert _update(client, network_id).status_code == 404
+
+
+def test_bad_network(client):
+    assert client.post("/investigate/networks", json={"network": "ab"}).status_code == 400
+    assert client.post("/investigate/networks", json={"network": [{"spy1": "a"}]}).status_code == 400
+    resp = client.post("/investigate/networks", json={"network": [_ch("a", True)]})
+    assert resp.status_code == 400 and "spy names" in resp.get_json()["error"]
+
+
+@pytest.mark.parametrize("edges, extra", [
+    ([], []),
+    ([("a", "b")], []),
+    # parallel channels are never bridges
+    ([("a", "b"), ("b", "a")], [("a", "b"), ("b", "a")]),
+    # a self-loop is not a bridge
+    ([("a", "a"), ("a", "b")], [("a", "a")]),
+    # two triangles joined by a single channel
+    ([("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("d", "e"), ("e", "f"), ("f", "d")],
+     [("a", "b"), ("b", "c"), ("c", "a"), ("d", "e"), ("e", "f"), ("f", "d")]),
+    # two separate networks
+    ([("a", "b"), ("c", "d"), ("d", "e"), ("e", "c")], [("c", "d"), ("d", "e"), ("e", "c")]),
+])
+def test_known_bridges(edges, extra):
+    expected = [_ch(*e) for e in extra]
+    assert extra_channels([_ch(*e) for e in edges]) == expected
+    assert DynamicNetwork(edges).extra_channels() == expected
+
+    # the same network built one channel at a time
+    net = DynamicNetwork()
+    for e in edges:
+        net.add(*e)
+    assert net.extra_channels() == expected
+
+
+def test_long_cycle_opens_and_closes():
+    net = DynamicNetwork((i, i + 1) for i in range(50))
+    assert net.extra_channels() == []
+    net.add(50, 0)
+    assert len(net.extra_channels()) == 51
+    net.remove(25, 26)
+    assert net.extra_channels() == []
+
+
+def test_updates_match_a_fresh_solve():
+    rng = random.Random(21)
+    spies = list("abcdefghij")
+    edges = []
+    net = DynamicNetwork()
+    for _ in range(400):
+        if edges and rng.random() < 0.45:
+            e = rng.choice(edges)
+            spy1, spy2 = (e["spy1"], e["spy2"]) if rng.random() < 0.5 else (e["spy2"], e["spy1"])
+            # the oldest channel between the pair goes, in either direction
+            pair = {spy1, spy2}
+            edges.pop(next(i for i, f in enumerate(edges) if {f["spy1"], f["spy2"]} == pair))
+            net.remove(spy1, spy2)
+        else:
+            spy1, spy2 = rng.choice(spies), rng.choice(spies)
+            edges.append(_ch(spy1, spy2))
+            net.add(spy1, spy2)
+        assert net.extra_channels() == extra_channels(edges)
@@ -0,0 +1,74 @@
+"""/The-Ink-Archive with the single-pass Bellman-Ford engine."""
+import math
+import random
+
+import pytest
+
+from app import app
+from routes import theinkarchive
+
+GOODS = ["Blue", "Red", "Gold"]
+
+
+@pytest.fixture(autouse=True)
+def bellman_ford(monkeypatch):
+    monkeypatch.setattr(theinkarchive, "ENGINE", "bellman-ford")
+
+
+def _has_arbitrage(n, ratios):
+    """Floyd-Warshall over -log(rate): some node reaches itself below 0."""
+    dist = [[math.inf] * n for _ in range(n)]
+    for u, v, r in ratios:
+        if r > 0:
+            dist[u][v] = min(dist[u][v], -math.log(r))
+    for k in range(n):
+        for i in range(n):
+            for j in range(n):
+                dist[i][j] = min(dist[i][j], dist[i][k] + dist[k][j])
+    return any(dist[i][i] < -1e-12 for i in range(n))
+
+
+def test_three_good_cycle():
+    # Blue -> Red -> Gold -> Blue multiplies by 2.0 * 0.6 * 0.9 = 1.08;
+    # the path starts at the good with the best incoming rate (Red)
+    path, gain = theinkarchive.best_arbitrage(GOODS, [[0, 1, 2.0], [1, 2, 0.6], [2, 0, 0.9]])
+    assert path == ["Red", "Gold", "Blue", "Red"]
+    assert gain == pytest.approx(8.0)
+
+
+def test_no_arbitrage():
+    # Blue -> Red -> Blue breaks even; Blue -> Red -> Gold -> Blue loses
+    ratios = [[0, 1, 2.0], [1, 0, 0.5], [1, 2, 0.5], [2, 0, 0.9]]
+    assert theinkarchive.best_arbitrage(GOODS, ratios) == ([], 0.0)
+
+
+def test_cycle_unreachable_from_the_first_good():
+    # one pass from the virtual source sees the cycle between goods 3 and 4;
+    # it starts at e, whose incoming rate (1.25) is the larger
+    goods = ["a", "b", "c", "d", "e"]
+    ratios = [[0, 1, 0.9], [1, 2, 0.9], [3, 4, 1.25], [4, 3, 0.9]]
+    path, gain = theinkarchive.best_arbitrage(goods, ratios)
+    assert path == ["e", "d", "e"]
+    assert gain == pytest.approx(12.5)
+
+
+def test_finds_a_cycle_exactly_when_one_exists():
+    rng = random.Random(14)
+    for _ in range(300):
+        n = rng.randint(1, 7)
+        ratios = [[u, v, rng.uniform(0.7, 1.2)]
+                  for u in range(n) for v in range(n) if u != v and rng.random() < 0.5]
+        path, gain = theinkarchive.best_arbitrage([f"g{i}" for i in range(n)], ratios)
+        assert bool(path) == _has_arbitrage(n, ratios)
+        assert (gain > 0) == bool(path)
+
+
+def test_endpoint():
+    body = [{"goods": GOODS, "ratios": [[0, 1, 2.0], [1, 2, 0.6], [2, 0, 0.9]]},
+            {"goods": GOODS[:2], "ratios": [[0, 1, 2.0], [1, 0, 0.5]]}]
+    resp = app.test_client().post("/The-Ink-Archive", json=body)
+    assert resp.status_code == 200
+    first, second = resp.get_json()
+    assert first["path"] == ["Red", "Gold", "Blue", "Red"]
+    assert second == {"path": [], "gain": 0.0}
+    assert app.test_client().post("/The-Ink-Archive", json={"goods": []}).status_code == 400
@@ -0,0 +1,115 @@
+"""/ticketing-agent: ConcertIndex against reference_best, with both engines."""
+import random
+
+import pytest
+
+from app import app
+from routes import ticketingagent
+
+ENGINES = ["python", pytest.param("numpy", marks=pytest.mark.skipif(
+    ticketingagent.np is None, reason="needs NumPy"))]
+
+
+def _concerts(*places):
+    return [{"name": name, "booking_center_location": location} for name, location in places]
+
+
+def _customer(location, card="none", vip=False):
+    return {"name": "p", "vip_status": vip, "location": location, "credit_card": card}
+
+
+FAR = [100, 100]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("concerts, location, priority, expected", [
+    # exactly 0 (30 points) beats exactly 10 (20 points), in either order
+    (_concerts(("A", [10, 0]), ("B", [0, 0])), [0, 0], {}, "B"),
+    (_concerts(("B", [0, 0]), ("A", [10, 0])), [0, 0], {}, "B"),
+    # a tie at exactly 10, on an axis and on a 6-8-10 diagonal: first wins
+    (_concerts(("A", [10, 0]), ("B", [0, 10])), [0, 0], {}, "A"),
+    (_concerts(("B", [6, 8]), ("A", [10, 0])), [0, 0], {}, "B"),
+    (_concerts(("A", [-6, -8]), ("B", [0, -10])), [0, 0], {}, "A"),
+    # just past 10 scores nothing, so the first concert wins
+    (_concerts(("A", FAR), ("B", [7, 8])), [0, 0], {}, "A"),
+    (_concerts(("A", FAR), ("B", [6, 8])), [0, 0], {}, "B"),
+    # a tie at exactly 0
+    (_concerts(("A", FAR), ("B", [3, 4]), ("C", [3, 4])), [3, 4], {}, "B"),
+    # the priority bonus (50) beats distance 0 (30), even far away
+    (_concerts(("A", [0, 0]), ("B", FAR)), [0, 0], {"card": "B"}, "B"),
+    # bonus + 20 beats bonus alone; bonus + 30 beats bonus + 20
+    (_concerts(("B", FAR), ("B", [0, 10]), ("B", [0, 0])), [0, 0], {"card": "B"}, "B"),
+    (_concerts(("A", FAR), ("B", FAR), ("C", [0, 0])), [0, 0], {"card": "D"}, "C"),
+    # floats on the boundary
+    (_concerts(("A", FAR), ("B", [10.5, 0])), [0.5, 0], {}, "B"),
+    (_concerts(("A", FAR), ("B", [10.5, 0])), [0.25, 0], {}, "A"),
+])
+def test_known_answers(engine, concerts, location, priority, expected, monkeypatch):
+    monkeypatch.setattr(ticketingagent, "ENGINE", engine)
+    customer = _customer(location, card="card")
+    assert ticketingagent.reference_best(customer, concerts, priority) == expected
+    index = ticketingagent.ConcertIndex(concerts)
+    assert index.best(customer, priority) == expected
+    assert index.best_many([customer], priority) == [expected]
+
+
+def test_bonus_goes_to_the_first_concert_of_that_name():
+    concerts = _concerts(("A", FAR), ("B", [50, 50]), ("B", [0, 0]))
+    customer = _customer([0, 0], card="card")
+    # both "B" concerts get the bonus; the one at distance 0 scores 80
+    assert ticketingagent.ConcertIndex(concerts).best(customer, {"card": "B"}) == "B"
+    assert ticketingagent.ConcertIndex(_concerts(("A", FAR))).best(customer, {}) == "A"
+    assert ticketingagent.ConcertIndex([]).best(customer, {}) is None
+
+
+def _point(rng, ints):
+    if ints or rng.random() < 0.5:
+        return [rng.randint(-25, 25), rng.randint(-25, 25)]
+    return [rng.uniform(-25, 25), rng.randint(-25, 25) + rng.choice([0, 0.5, 1e-9])]
+
+
+def _payload(rng):
+    ints = rng.random() < 0.6
+    names = [f"c{i}" for i in range(rng.randint(1, 8))]
+    concerts = [{"name": rng.choice(names), "booking_center_location": _point(rng, ints)}
+                for _ in range(rng.randint(1, 40))]
+    priority = {f"card{i}": rng.choice(names + ["nowhere"]) for i in range(rng.randint(0, 4))}
+    customers = [{"name": f"p{k}", "vip_status": rng.random() < 0.5,
+                  "location": _point(rng, ints), "credit_card": f"card{rng.randint(0, 5)}"}
+                 for k in range(rng.randint(1, 60))]
+    return customers, concerts, priority
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_index_matches_reference(engine, monkeypatch):
+    monkeypatch.setattr(ticketingagent, "ENGINE", engine)
+    rng = random.Random(25)
+    for _ in range(25):
+        customers, concerts, priority = _payload(rng)
+        index = ticketingagent.ConcertIndex(concerts)
+        expected = [ticketingagent.reference_best(c, concerts, priority) for c in customers]
+        assert index.best_many(customers, priority) == expected
+        assert [index.best(c, priority) for c in customers] == expected
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_ticketing_agent_over_http(engine, monkeypatch):
+    monkeypatch.setattr(ticketingagent, "ENGINE", engine)
+    body = {
+        "customers": [
+            {"name": "near", "vip_status": True, "location": [1, 1], "credit_card": "x"},
+            {"name": "bonus", "vip_status": False, "location": [1, 1], "credit_card": "y"},
+            {"name": "float", "vip_status": False, "location": [20.5, 0], "credit_card": "x"},
+            {"name": "nobody", "vip_status": False, "location": [500, 500], "credit_card": "x"},
+        ],
+        "concerts": _concerts(("A", [-40, -40]), ("B", [1, 1]), ("C", [30.5, 0])),
+        "priority": {"y": "A"},
+    }
+    resp = app.test_client().post("/ticketing-agent", json=body)
+    assert resp.status_code == 200
+    assert resp.get_json() == {"near": "B", "bonus": "A", "float": "C", "nobody": "A"}
+
+    # a concert the index cannot take is scored in full
+    body["concerts"].append({"name": "D", "booking_center_location": [float("nan"), 0]})
+    resp = app.test_client().post("/ticketing-agent", json=body)
+    assert resp.get_json() == {"near": "B", "bonus": "A", "float": "C", "nobody": "A"}